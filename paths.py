@@ -1,9 +1,9 @@
 import os
-import sys
 
-# Ajouter le répertoire racine du projet au sys.path
+# L'import de ce module ne modifie pas sys.path : s'il est importable, la racine du
+# projet y est déjà, et les modules de src/ s'importent par leur chemin complet
+# (src.utils.storage, src.api.recommendation_service...)
 ROOT_DIR = os.path.dirname(os.path.abspath(__file__))  # Chemin vers la racine du projet
-sys.path.append(ROOT_DIR)
 
 # Définir les chemins des différents dossiers et fichiers
 DATA_DIR = os.path.join(ROOT_DIR, "data")  # Répertoire des données
@@ -12,6 +12,27 @@ PROCESSED_DATA_DIR = os.path.join(DATA_DIR, "processed")
 CLEANED_DATA_DIR = os.path.join(DATA_DIR, "clean")
 OUTPUT_DIR = os.path.join(DATA_DIR, "output")
 RECOMMENDATION_RESULTS_DIR = os.path.join(DATA_DIR, "recommendation")
+SCHEMA_DIR = os.path.join(DATA_DIR, "schemas")  # Schémas inférés (cache)
+# Base SQLite des avis Amazon (table Reviews, texte complet des avis)
+REVIEWS_DB_PATH = os.path.join(RAW_DATA_DIR, "database.sqlite")
+# Lexique de sentiment : un mot et sa note (-3 à 3) par ligne, séparés par une tabulation
+SENTIMENT_LEXICON_PATH = os.path.join(DATA_DIR, "lexicon", "sentiment_lexicon.txt")
+# Cache incrémental du pipeline (empreintes des entrées et du code de chaque étape)
+BUILD_CACHE_PATH = os.path.join(DATA_DIR, "cache", "build_cache.json")
+# Hash des fichiers mémorisés par (chemin, taille, mtime, inode)
+DIGEST_CACHE_PATH = os.path.join(DATA_DIR, "cache", "digests.json")
+# Scores de sentiment déjà calculés, par avis (id et hash du texte)
+SENTIMENT_CACHE_PATH = os.path.join(DATA_DIR, "cache", "sentiment_scores.sqlite")
+# Index TF-IDF des outils SaaS (vocabulaire, IDF, matrice des outils en .npy)
+TOOL_INDEX_DIR = os.path.join(DATA_DIR, "cache", "tool_index")
+# Historique de l'empreinte mémoire des datasets (avant/après compactage des types)
+MEMORY_LOG_PATH = os.path.join(DATA_DIR, "cache", "memory_usage.csv")
+
+# Stockage intermédiaire entre les étapes du pipeline : "parquet" (colonnaire, typé,
+# compressé) ou "csv". Un export CSV peut être ajouté à chaque écriture pour les humains.
+STORAGE_FORMAT = os.environ.get("PIPELINE_STORAGE_FORMAT", "parquet")
+STORAGE_COMPRESSION = os.environ.get("PIPELINE_STORAGE_COMPRESSION", "zstd")
+STORAGE_EXPORT_CSV = os.environ.get("PIPELINE_EXPORT_CSV", "0") == "1"
 
 # Configurer le chemin vers le dossier src et ses sous-dossiers
 SRC_DIR = os.path.join(ROOT_DIR, "src")
@@ -20,11 +41,6 @@ API_DIR = os.path.join(SRC_DIR, "api")
 UTILS_DIR = os.path.join(SRC_DIR, "utils")
 ANALYSIS_DIR = os.path.join(SRC_DIR, "analysis")
 
-# Ajouter ces chemins au sys.path pour pouvoir les importer directement
-sys.path.append(MODELS_DIR)
-sys.path.append(API_DIR)
-sys.path.append(UTILS_DIR)
-
 
 # Retourner les chemins pour une utilisation dans les scripts
 def get_paths():
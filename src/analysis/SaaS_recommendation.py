@@ -1,82 +1,257 @@
 import os
 import sys
+import time
+import threading
+from collections import OrderedDict
+import numpy as np
 import pandas as pd
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
 
 # Gestion dynamique des chemins
 ROOT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-sys.path.append(ROOT_DIR)
+if __package__ in (None, ""):
+    # Lancé comme script : la racine du projet n'est pas encore dans sys.path
+    sys.path.append(ROOT_DIR)
 
 # Import des chemins définis dans paths.py
-from paths import PROCESSED_DATA_DIR, CLEANED_DATA_DIR, OUTPUT_DIR
-
-# Chargement des datasets
-roles_path = os.path.join(
-    PROCESSED_DATA_DIR, "task_assignment_summary.csv"
-)  # Rôles et tâches
-tools_path = os.path.join(
-    PROCESSED_DATA_DIR, "project_tools_summary.csv"
-)  # Outils SaaS
-
-roles_df = pd.read_csv(roles_path)
-tools_df = pd.read_csv(tools_path)
-
-# Diagnostic des colonnes disponibles
-print("Colonnes disponibles dans tools_df :", tools_df.columns)
-print("Extrait des données tools_df :", tools_df.head())
-
-# Ajouter une colonne fictive 'tool_description' si elle est absente
-if "tool_description" not in tools_df.columns:
-    print("La colonne 'tool_description' est manquante. Ajout d'une colonne fictive.")
-    tools_df["tool_description"] = tools_df["tool_name"] + " - Description fictive"
-
-# Vérification et ajout de colonnes nécessaires pour roles_df
-if "role_description" not in roles_df.columns:
-    print("La colonne 'role_description' est manquante. Ajout d'une colonne fictive.")
-    roles_df["role_description"] = roles_df["skill"] + " - Description par défaut"
-
-# Vérification des colonnes nécessaires
-required_role_columns = ["skill", "role_description"]
-required_tool_columns = ["tool_name", "tool_description"]
-
-if not all(col in roles_df.columns for col in required_role_columns):
-    raise ValueError(
-        f"Les colonnes {required_role_columns} sont manquantes dans roles_df."
-    )
-if not all(col in tools_df.columns for col in required_tool_columns):
-    raise ValueError(
-        f"Les colonnes {required_tool_columns} sont manquantes dans tools_df."
-    )
+from paths import PROCESSED_DATA_DIR, OUTPUT_DIR
+from src.utils.storage import load_dataset, save_dataset
 
-# Vectorisation des descriptions d'outils avec TF-IDF
-tfidf_vectorizer = TfidfVectorizer(stop_words="english")
-tool_vectors = tfidf_vectorizer.fit_transform(tools_df["tool_description"])
+# --- Recommandation d'outils SaaS par rôle ---
+#
+# L'import du module ne lit aucun fichier : load() charge les rôles et l'index des
+# outils dans un SaaSRecommender. Les fonctions du module (recommend_tools_for_role,
+# recommend_roles, run...) utilisent un recommandeur chargé au premier appel.
 
+# Nombre maximal de résultats (rôle, top_n) gardés en mémoire
+RESULT_CACHE_SIZE = 1024
 
-def recommend_tools_for_role(role_name, top_n=10):
+# Quelques rôles sur un grand catalogue : recherche par listes inversées plutôt que
+# produit avec tous les outils (voir src/benchmarks/bench_tool_retrieval.py)
+INVERTED_SEARCH_MIN_TOOLS = 5_000
+INVERTED_SEARCH_MAX_ROLES = 8
+
+ROLES_DATASET = "task_assignment_summary"
+REQUIRED_ROLE_COLUMNS = ["skill", "role_description"]
+
+
+class LRUCache:
+    """
+    Dictionnaire borné : au-delà de `max_entries` entrées, la moins récemment utilisée
+    est retirée. Compte les lectures trouvées (hits) et manquées (misses).
+    """
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evicted = 0
+
+    def get(self, key):
+        if key not in self.entries:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.entries.move_to_end(key)
+        return self.entries[key]
+
+    def put(self, key, value):
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+            self.evicted += 1
+
+    def clear(self):
+        self.entries.clear()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "size": len(self.entries),
+            "evicted": self.evicted,
+        }
+
+
+def prepare_roles(roles_df):
+    """Ajoute une description par défaut aux rôles si besoin et vérifie les colonnes."""
+    if "role_description" not in roles_df.columns:
+        print(
+            "La colonne 'role_description' est manquante. Ajout d'une colonne fictive."
+        )
+        roles_df = roles_df.assign(
+            role_description=roles_df["skill"].astype(str) + " - Description par défaut"
+        )
+    if not all(col in roles_df.columns for col in REQUIRED_ROLE_COLUMNS):
+        raise ValueError(
+            f"Les colonnes {REQUIRED_ROLE_COLUMNS} sont manquantes dans roles_df."
+        )
+    return roles_df
+
+
+class SaaSRecommender:
+    """
+    Rôles et index des outils chargés, avec l'index des rôles (position de la première
+    ligne de chaque rôle, qui donne sa description) et des caches liés à la version de
+    l'index des outils : vecteurs TF-IDF de tous les rôles (calculés d'un bloc au
+    premier besoin) et résultats par (rôle, top_n).
+    """
+
+    def __init__(self, roles_df, tool_index, cache_size=RESULT_CACHE_SIZE):
+        self.roles_df = prepare_roles(roles_df)
+        first_roles = self.roles_df.dropna(subset=["skill"]).drop_duplicates("skill")
+        self.skill_index = dict(
+            zip(first_roles["skill"].astype(str), range(len(first_roles)))
+        )
+        self.role_descriptions = first_roles["role_description"].to_numpy()
+        self.result_cache = LRUCache(cache_size)
+        self._vectors = None
+        self._vectors_version = None
+        self.vector_builds = 0
+        self.vector_hits = 0
+        self.set_tool_index(tool_index)
+
+    def set_tool_index(self, tool_index):
+        self.tool_index = tool_index
+        self.tools_df = tool_index.tools
+        self._check_index_version()
+
+    def _check_index_version(self):
+        """Vide les caches s'ils ont été remplis avec une autre version de l'index."""
+        if self._vectors_version != self.tool_index.version:
+            self.result_cache.clear()
+            self._vectors = None
+            self._vectors_version = self.tool_index.version
+
+    def role_vectors(self):
+        """Vecteurs TF-IDF normés de tous les rôles (lignes dans l'ordre de skill_index)."""
+        self._check_index_version()
+        if self._vectors is None:
+            self._vectors = self.tool_index.transform(self.role_descriptions)
+            self.vector_builds += 1
+        else:
+            self.vector_hits += 1
+        return self._vectors
+
+    def reload_tool_index(self, force=False):
+        """
+        Relit l'index des outils (reconstruit si le résumé des outils a changé) ; les
+        caches sont invalidés si sa version change.
+        """
+        from src.utils.tool_index import load_tool_index
+
+        self.set_tool_index(load_tool_index(force=force))
+
+    def cache_stats(self):
+        """Statistiques des caches de recommandation."""
+        return {
+            "index_version": self.tool_index.version,
+            "results": self.result_cache.stats(),
+            "role_vectors": {
+                "builds": self.vector_builds,
+                "hits": self.vector_hits,
+                "roles": len(self.skill_index),
+            },
+        }
+
+    def recommend_tools_for_role(self, role_name, top_n=10):
+        """
+        Recommande des outils SaaS en fonction du rôle spécifié.
+        Les résultats sont gardés en cache par (rôle, top_n) (LRU borné).
+        """
+        self._check_index_version()
+        key = (role_name, top_n)
+        recommendations = self.result_cache.get(key)
+        if recommendations is None:
+            recommendations = self.recommend_roles([role_name], top_n=top_n)
+            recommendations = recommendations.drop(columns="role")
+            self.result_cache.put(key, recommendations)
+        return recommendations.copy()
+
+    def recommend_roles(self, role_names=None, top_n=10):
+        """
+        Recommandations de plusieurs rôles en un passage : les vecteurs des rôles sont
+        comparés aux outils par un produit creux rôles × outils traité par blocs, avec
+        sélection partielle des `top_n` meilleurs (ToolIndex.top_n).
+        :param role_names: Rôles (colonne "skill") ; tous les rôles par défaut.
+        :return: DataFrame (role, tool_name, tool_description, similarity_score), rôle
+            par rôle, par similarité décroissante.
+        """
+        if role_names is None:
+            role_names = list(self.skill_index)
+        role_names = np.asarray(role_names, dtype=object)
+        positions = []
+        for role_name in role_names:
+            if role_name not in self.skill_index:
+                raise ValueError(f"Le rôle '{role_name}' n'existe pas dans le dataset.")
+            positions.append(self.skill_index[role_name])
+
+        vectors = self.role_vectors()[positions]
+        if (
+            len(self.tools_df) >= INVERTED_SEARCH_MIN_TOOLS
+            and len(positions) <= INVERTED_SEARCH_MAX_ROLES
+        ):
+            rows, tools, scores = self.tool_index.search(vectors, top_n=top_n)
+        else:
+            rows, tools, scores = self.tool_index.top_n(vectors, top_n=top_n)
+        recommendations = self.tools_df.iloc[tools][["tool_name", "tool_description"]]
+        recommendations = recommendations.reset_index(drop=True)
+        recommendations.insert(0, "role", role_names[rows])
+        recommendations["similarity_score"] = scores
+        return recommendations
+
+
+def load(data_dir=PROCESSED_DATA_DIR):
     """
-    Recommande des outils SaaS en fonction du rôle spécifié.
+    Charge les rôles et l'index TF-IDF des outils (construit une fois, voir
+    utils/tool_index, et relu par projection mémoire).
     """
-    # Trouver la description du rôle spécifié
-    role_row = roles_df[
-        roles_df["skill"] == role_name
-    ]  # Utiliser "skill" comme nom de rôle
-    if role_row.empty:
-        raise ValueError(f"Le rôle '{role_name}' n'existe pas dans le dataset.")
+    from src.utils.tool_index import load_tool_index
+
+    roles_df = load_dataset(data_dir, ROLES_DATASET)
+    start = time.perf_counter()
+    tool_index = load_tool_index(tools_dir=data_dir)
+    print(
+        f"Index des outils chargé : {len(tool_index.tools)} outils "
+        f"({(time.perf_counter() - start) * 1000:.1f} ms)"
+    )
+    return SaaSRecommender(roles_df, tool_index)
+
+
+_recommender = None
+_recommender_lock = threading.Lock()
+
 
-    role_description = role_row.iloc[0]["role_description"]
-    role_vector = tfidf_vectorizer.transform([role_description])
+def get_recommender():
+    """Recommandeur partagé par les fonctions du module, chargé au premier appel."""
+    global _recommender
+    with _recommender_lock:
+        if _recommender is None:
+            _recommender = load()
+    return _recommender
 
-    # Calculer la similarité cosine entre le rôle et tous les outils
-    similarities = cosine_similarity(role_vector, tool_vectors).flatten()
 
-    # Trier les outils par similarité (ordre décroissant)
-    top_indices = similarities.argsort()[::-1][:top_n]
-    top_tools = tools_df.iloc[top_indices].copy()
-    top_tools["similarity_score"] = similarities[top_indices]
+def recommend_tools_for_role(role_name, top_n=10):
+    """Recommande des outils SaaS en fonction du rôle spécifié."""
+    return get_recommender().recommend_tools_for_role(role_name, top_n=top_n)
+
+
+def recommend_roles(role_names=None, top_n=10):
+    """Recommandations de plusieurs rôles en un passage (voir SaaSRecommender)."""
+    return get_recommender().recommend_roles(role_names, top_n=top_n)
+
+
+def reload_tool_index(force=False):
+    """Relit l'index des outils du recommandeur partagé (voir SaaSRecommender)."""
+    get_recommender().reload_tool_index(force=force)
+
 
-    return top_tools[["tool_name", "tool_description", "similarity_score"]]
+def cache_stats():
+    """Statistiques des caches de recommandation."""
+    return get_recommender().cache_stats()
 
 
 def save_recommendations(role_name, recommendations, output_file):
@@ -89,6 +264,25 @@ def save_recommendations(role_name, recommendations, output_file):
     print(f"Recommandations sauvegardées dans {file_path}")
 
 
+def recommend_all_roles(top_n=10):
+    """
+    Recommandations pour chaque rôle du dataset, enregistrées dans un seul fichier
+    (utilisé par le lanceur du pipeline, sans saisie interactive).
+    """
+    recommender = get_recommender()
+    if not recommender.skill_index:
+        raise ValueError("Aucun rôle dans task_assignment_summary.")
+    all_recommendations = recommender.recommend_roles(top_n=top_n)
+    output_file = save_dataset(all_recommendations, OUTPUT_DIR, "saas_recommendations")
+    print(f"Recommandations de tous les rôles sauvegardées dans {output_file}")
+    return all_recommendations
+
+
+def run(top_n=10):
+    """Point d'entrée du pipeline : recommandations de tous les rôles."""
+    return recommend_all_roles(top_n=top_n)
+
+
 # Exemple d'utilisation
 if __name__ == "__main__":
     role_input = input("Entrez un rôle professionnel (par exemple, ADTK) : ")
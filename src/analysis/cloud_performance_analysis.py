@@ -1,25 +1,24 @@
 import os
 import sys
+import argparse
+import numpy as np
 import pandas as pd
 
 # Gestion dynamique des chemins
 ROOT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-sys.path.append(ROOT_DIR)
+if __package__ in (None, ""):
+    # Lancé comme script : la racine du projet n'est pas encore dans sys.path
+    sys.path.append(ROOT_DIR)
 
 from paths import PROCESSED_DATA_DIR, RECOMMENDATION_RESULTS_DIR
-
-performance_data_path = os.path.join(PROCESSED_DATA_DIR, "vmCloud_enriched.csv")
-recommended_products_path = os.path.join(
-    RECOMMENDATION_RESULTS_DIR, "recommended_products.csv"
+from src.utils.storage import (
+    find_dataset,
+    read_columns,
+    read_table,
+    iter_table_chunks,
+    save_dataset,
 )
-
-if not os.path.exists(performance_data_path):
-    raise FileNotFoundError(f"Fichier introuvable : {performance_data_path}")
-if not os.path.exists(recommended_products_path):
-    raise FileNotFoundError(f"Fichier introuvable : {recommended_products_path}")
-
-performance_data = pd.read_csv(performance_data_path)
-recommendations = pd.read_csv(recommended_products_path)
+from src.utils.build_cache import run_cached
 
 required_columns_performance = [
     "cpu_usage",
@@ -29,62 +28,348 @@ required_columns_performance = [
     "execution_time",
 ]
 
-missing_columns_performance = [
-    col for col in required_columns_performance if col not in performance_data.columns
-]
-if missing_columns_performance:
-    raise ValueError(
-        f"Colonnes manquantes dans vmCloud_enriched.csv : {missing_columns_performance}"
-    )
+output_path = os.path.join(
+    RECOMMENDATION_RESULTS_DIR, "recommendations_with_performance.csv"
+)
 
-required_columns_recommendations = ["productid"]
-if "productid" not in recommendations.columns:
-    raise ValueError(
-        "La colonne 'productid' est manquante dans recommended_products.csv."
-    )
+
+# Profil du score de performance (voir performance_scores) : poids des colonnes
+# normalisées et constante ajoutée au score
+DEFAULT_PROFILE = {
+    "cpu_usage": -0.3,
+    "memory_usage": -0.3,
+    "network_traffic": -0.1,
+    "power_consumption": -0.1,
+    "execution_time": -0.2,
+    "offset": 0.8,
+}
+
+# Nombre de lignes du fichier des métriques lues à la fois par les scénarios
+SCORING_CHUNK_ROWS = 200_000
 
 
 def normalize(column):
+    # Calcul en float64 : les colonnes compactées (int8, float32...) déborderaient
+    column = column.astype("float64")
     if column.min() == column.max():
         return column - column.min()
     return (column - column.min()) / (column.max() - column.min())
 
 
-# Normalisation des colonnes
-for col in required_columns_performance:
-    performance_data[f"{col}_normalized"] = normalize(performance_data[col])
+def load():
+    """
+    Charge les métriques de performance (colonnes utilisées seulement) et les produits
+    recommandés, après vérification des colonnes.
+    :return: (performance_data, recommendations)
+    """
+    # Lève FileNotFoundError si un des fichiers est absent
+    performance_data_path = find_dataset(PROCESSED_DATA_DIR, "vmCloud_enriched")
+    recommended_products_path = find_dataset(
+        RECOMMENDATION_RESULTS_DIR, "recommended_products"
+    )
 
-# Calcul du score de performance
-performance_data["performance_score"] = (
-    0.3 * (1 - performance_data["cpu_usage_normalized"])
-    + 0.3 * (1 - performance_data["memory_usage_normalized"])
-    - 0.2 * performance_data["execution_time_normalized"]
-    + 0.1 * (1 - performance_data["power_consumption_normalized"])
-    + 0.1 * (1 - performance_data["network_traffic_normalized"])
-)
+    performance_columns = read_columns(performance_data_path)
+    missing_columns_performance = [
+        col for col in required_columns_performance if col not in performance_columns
+    ]
+    if missing_columns_performance:
+        raise ValueError(
+            f"Colonnes manquantes dans vmCloud_enriched.csv : {missing_columns_performance}"
+        )
 
-# Vérification des scores calculés
-print("Résumé des scores de performance :")
-print(performance_data["performance_score"].describe())
+    if "productid" not in read_columns(recommended_products_path):
+        raise ValueError(
+            "La colonne 'productid' est manquante dans recommended_products.csv."
+        )
 
-# Association des scores aux produits
-recommendations = recommendations.merge(
-    performance_data[["vm_id", "performance_score"]],
-    left_on="productid",
-    right_on="vm_id",
-    how="left",
-)
+    performance_data = read_table(
+        performance_data_path, columns=["vm_id"] + required_columns_performance
+    )
+    recommendations = read_table(recommended_products_path)
+    return performance_data, recommendations
 
-recommendations["performance_score"].fillna(0, inplace=True)
-print("Produits sans données de performance :")
-print(recommendations[recommendations["performance_score"] == 0])
 
-recommendations = recommendations.sort_values(by="performance_score", ascending=False)
+def metric_seconds(column):
+    """
+    Les colonnes converties en dates au nettoyage (ex. execution_time) sont ramenées
+    en secondes pour pouvoir être normalisées ; les autres sont renvoyées telles quelles.
+    """
+    if pd.api.types.is_object_dtype(column) or pd.api.types.is_string_dtype(column):
+        # Blocs lus sans le schéma des types (CSV) : dates encore sous forme de texte
+        column = pd.to_datetime(column)
+    if pd.api.types.is_datetime64_any_dtype(column):
+        return (column - pd.Timestamp(0)).dt.total_seconds()
+    return column
 
-output_path = os.path.join(
-    RECOMMENDATION_RESULTS_DIR, "recommendations_with_performance.csv"
-)
-os.makedirs(RECOMMENDATION_RESULTS_DIR, exist_ok=True)
-recommendations.to_csv(output_path, index=False)
 
-print(f"Analyse terminée. Résultats sauvegardés à : {output_path}")
+def performance_scores(performance_data):
+    """Ajoute les colonnes normalisées et le score de performance de chaque VM."""
+    for col in required_columns_performance:
+        performance_data[col] = metric_seconds(performance_data[col])
+
+    # Normalisation des colonnes
+    for col in required_columns_performance:
+        performance_data[f"{col}_normalized"] = normalize(performance_data[col])
+
+    # Calcul du score de performance : somme pondérée selon DEFAULT_PROFILE (les
+    # termes 0.3 * (1 - cpu)... donnent la constante "offset" et des poids négatifs)
+    score = DEFAULT_PROFILE.get("offset", 0.0)
+    for col in required_columns_performance:
+        score = score + DEFAULT_PROFILE[col] * performance_data[f"{col}_normalized"]
+    performance_data["performance_score"] = score
+    return performance_data
+
+
+def rank_products(recommendations, performance_data):
+    """Associe les scores aux produits recommandés, classés par score décroissant."""
+    recommendations = recommendations.merge(
+        performance_data[["vm_id", "performance_score"]],
+        left_on="productid",
+        right_on="vm_id",
+        how="left",
+    )
+    recommendations["performance_score"] = recommendations["performance_score"].fillna(
+        0
+    )
+    return recommendations.sort_values(by="performance_score", ascending=False)
+
+
+# --- Scénarios de pondération (what-if) ---
+#
+# Un profil donne un poids à chacune des colonnes normalisées de
+# required_columns_performance (et, en option, une constante "offset") : son score
+# est la somme pondérée, comme performance_scores pour DEFAULT_PROFILE. Les K profils
+# forment une matrice K × 5 ; les scores de N VM sous tous les profils sont un seul
+# produit matriciel avec le bloc N × 5 float32 contigu des métriques normalisées.
+# Le fichier des métriques est lu par blocs : un premier passage calcule les min/max
+# de normalisation, le second score chaque bloc et ne garde que les `top_n`
+# meilleures VM de chaque profil.
+
+
+def profile_matrix(profiles):
+    """
+    Profils sous forme de DataFrame (un profil par ligne, une colonne par métrique,
+    "offset" facultatif) ou de dictionnaire {nom: {métrique: poids}}.
+    :return: (noms, poids K × 5 float32, constantes K float32)
+    """
+    if not isinstance(profiles, pd.DataFrame):
+        profiles = pd.DataFrame.from_dict(profiles, orient="index")
+    unknown = set(profiles.columns) - set(required_columns_performance) - {"offset"}
+    if unknown:
+        raise ValueError(f"Métriques inconnues dans les profils : {sorted(unknown)}")
+    weights = profiles.reindex(columns=required_columns_performance).fillna(0.0)
+    offsets = profiles.get("offset", pd.Series(0.0, index=profiles.index))
+    return (
+        profiles.index.to_numpy(),
+        np.ascontiguousarray(weights.to_numpy(dtype="float32")),
+        offsets.fillna(0.0).to_numpy(dtype="float32"),
+    )
+
+
+def metric_block(chunk):
+    """Métriques d'un bloc en secondes/valeurs brutes : tableau N × 5 float64."""
+    return np.column_stack(
+        [
+            metric_seconds(chunk[col]).to_numpy(dtype="float64", na_value=np.nan)
+            for col in required_columns_performance
+        ]
+    )
+
+
+def metric_ranges(chunks):
+    """Min et max de chaque métrique sur tous les blocs (valeurs manquantes ignorées)."""
+    minimums = np.full(len(required_columns_performance), np.inf)
+    maximums = np.full(len(required_columns_performance), -np.inf)
+    for chunk in chunks:
+        block = metric_block(chunk)
+        present = ~np.isnan(block)
+        minimums = np.minimum(minimums, np.where(present, block, np.inf).min(axis=0))
+        maximums = np.maximum(maximums, np.where(present, block, -np.inf).max(axis=0))
+    return minimums, maximums
+
+
+def top_n_per_profile(scores, order_keys, top_n):
+    """
+    Positions des `top_n` meilleurs scores de chaque profil (ligne de `scores`), par
+    score décroissant ; à égalité, la plus petite clé de `order_keys` d'abord.
+    Sélection partielle : seuil de chaque profil par np.partition, puis tri des seules
+    valeurs au-dessus du seuil.
+    :return: Tableau K × min(top_n, nombre de colonnes) (K × 0 si top_n <= 0).
+    """
+    n_profiles, n_candidates = scores.shape
+    top_n = min(top_n, n_candidates)
+    if top_n <= 0:
+        return np.empty((n_profiles, 0), dtype=np.intp)
+    if top_n < n_candidates:
+        threshold = np.partition(scores, n_candidates - top_n, axis=1)
+        threshold = threshold[:, n_candidates - top_n]
+        profiles, cols = np.nonzero(scores >= threshold[:, None])
+    else:
+        profiles, cols = np.nonzero(np.ones(scores.shape, dtype=bool))
+    order = np.lexsort((order_keys[profiles, cols], -scores[profiles, cols], profiles))
+    profiles, cols = profiles[order], cols[order]
+    # Rang de chaque candidat dans son profil (les égalités au seuil peuvent en ajouter)
+    rank = np.arange(len(profiles)) - np.searchsorted(profiles, profiles)
+    return cols[rank < top_n].reshape(n_profiles, top_n)
+
+
+class ProfileScorer:
+    """
+    Meilleures VM sous plusieurs profils de pondération, mises à jour bloc par bloc.
+    Les min/max de normalisation doivent couvrir toutes les lignes (metric_ranges).
+    """
+
+    def __init__(self, profiles, minimums, maximums, top_n=10):
+        self.names, self.weights, self.offsets = profile_matrix(profiles)
+        self.top_n = top_n
+        self.minimums = minimums
+        # Colonne constante : normalisée à 0, comme normalize()
+        spans = maximums - minimums
+        self.scales = np.where(spans > 0, 1 / np.where(spans > 0, spans, 1), 1.0)
+        n_profiles = len(self.names)
+        self.best_scores = np.empty((n_profiles, 0), dtype="float32")
+        self.best_rows = np.empty((n_profiles, 0), dtype=np.int64)
+        self.best_ids = np.empty((n_profiles, 0), dtype=object)
+        self.rows_seen = 0
+
+    def features(self, chunk):
+        """Bloc N × 5 float32 contigu des métriques normalisées."""
+        block = (metric_block(chunk) - self.minimums) * self.scales
+        return np.ascontiguousarray(block, dtype="float32")
+
+    def update(self, chunk):
+        """Score un bloc sous tous les profils et fusionne ses meilleures VM."""
+        n_rows = len(chunk)
+        if n_rows == 0:
+            return
+        # Produit (N × 5) @ (5 × K) calculé transposé, (K × 5) @ (5 × N) : les scores
+        # de chaque profil sont contigus pour la sélection.
+        features = self.features(chunk)
+        missing = np.isnan(features)
+        if missing.any():
+            features[missing] = 0.0
+        scores = self.weights @ features.T
+        if missing.any():
+            # Une métrique manquante de poids non nul classe la VM en dernier
+            scores[(self.weights != 0) @ missing.T] = -np.inf
+        rows = np.broadcast_to(
+            np.arange(self.rows_seen, self.rows_seen + n_rows), scores.shape
+        )
+        ids = np.broadcast_to(chunk["vm_id"].to_numpy(dtype=object), scores.shape)
+        self.rows_seen += n_rows
+
+        keep = top_n_per_profile(scores, rows, self.top_n)
+        scores = np.hstack([self.best_scores, np.take_along_axis(scores, keep, 1)])
+        rows = np.hstack([self.best_rows, np.take_along_axis(rows, keep, 1)])
+        ids = np.hstack([self.best_ids, np.take_along_axis(ids, keep, 1)])
+        keep = top_n_per_profile(scores, rows, self.top_n)
+        self.best_scores = np.take_along_axis(scores, keep, 1)
+        self.best_rows = np.take_along_axis(rows, keep, 1)
+        self.best_ids = np.take_along_axis(ids, keep, 1)
+
+    def result(self):
+        """DataFrame (profile, rank, vm_id, performance_score), profil par profil."""
+        n_profiles, top_n = self.best_scores.shape
+        scores = self.best_scores + self.offsets[:, None]
+        return pd.DataFrame(
+            {
+                "profile": np.repeat(self.names, top_n),
+                "rank": np.tile(np.arange(1, top_n + 1), n_profiles),
+                "vm_id": self.best_ids.ravel(),
+                "performance_score": scores.ravel(),
+            }
+        )
+
+
+def score_profiles(performance_data, profiles, top_n=10):
+    """Meilleures VM de chaque profil pour des métriques déjà chargées."""
+    minimums, maximums = metric_ranges([performance_data])
+    scorer = ProfileScorer(profiles, minimums, maximums, top_n=top_n)
+    for start in range(0, len(performance_data), SCORING_CHUNK_ROWS):
+        scorer.update(performance_data.iloc[start : start + SCORING_CHUNK_ROWS])
+    return scorer.result()
+
+
+def score_profiles_file(path, profiles, top_n=10, chunksize=SCORING_CHUNK_ROWS):
+    """
+    Meilleures VM de chaque profil, le fichier des métriques étant lu par blocs de
+    `chunksize` lignes (deux passages) : la mémoire ne dépend pas du nombre de VM.
+    """
+    columns = ["vm_id"] + required_columns_performance
+    minimums, maximums = metric_ranges(
+        iter_table_chunks(path, columns=columns, chunksize=chunksize)
+    )
+    scorer = ProfileScorer(profiles, minimums, maximums, top_n=top_n)
+    for chunk in iter_table_chunks(path, columns=columns, chunksize=chunksize):
+        scorer.update(chunk)
+    return scorer.result()
+
+
+def what_if(profiles_path, top_n=10):
+    """
+    Classe les VM de vmCloud_enriched sous les profils d'un CSV (colonne "profile" puis
+    une colonne par métrique) et sauvegarde les `top_n` meilleures de chaque profil.
+    """
+    profiles = pd.read_csv(profiles_path, index_col="profile")
+    performance_data_path = find_dataset(PROCESSED_DATA_DIR, "vmCloud_enriched")
+    ranking = score_profiles_file(performance_data_path, profiles, top_n=top_n)
+    output_file = save_dataset(
+        ranking, RECOMMENDATION_RESULTS_DIR, "performance_what_if"
+    )
+    print(f"{len(profiles)} profils classés. Résultats sauvegardés à : {output_file}")
+    return ranking
+
+
+def main():
+    performance_data, recommendations = load()
+    performance_data = performance_scores(performance_data)
+
+    # Vérification des scores calculés
+    print("Résumé des scores de performance :")
+    print(performance_data["performance_score"].describe())
+
+    recommendations = rank_products(recommendations, performance_data)
+    print("Produits sans données de performance :")
+    print(recommendations[recommendations["performance_score"] == 0])
+
+    os.makedirs(RECOMMENDATION_RESULTS_DIR, exist_ok=True)
+    recommendations.to_csv(output_path, index=False)
+
+    print(f"Analyse terminée. Résultats sauvegardés à : {output_path}")
+
+
+def run(force=False):
+    """Analyse incrémentale : sautée si les données de performance, les produits
+    recommandés et le code n'ont pas changé (voir build_cache)."""
+    return run_cached(
+        "performance",
+        main,
+        inputs=[
+            find_dataset(PROCESSED_DATA_DIR, "vmCloud_enriched"),
+            find_dataset(RECOMMENDATION_RESULTS_DIR, "recommended_products"),
+        ],
+        outputs=[output_path],
+        code_files=[os.path.abspath(__file__)],
+        force=force,
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Analyse des performances des VM.")
+    parser.add_argument(
+        "--force", action="store_true", help="Ignorer le cache incrémental"
+    )
+    parser.add_argument(
+        "--profiles",
+        help="CSV de profils de pondération : classe les VM sous chaque profil",
+    )
+    parser.add_argument(
+        "--top-n", type=int, default=10, help="Nombre de VM gardées par profil"
+    )
+    args = parser.parse_args()
+    if args.top_n < 1:
+        parser.error("--top-n doit être au moins 1")
+    if args.profiles:
+        what_if(args.profiles, top_n=args.top_n)
+    else:
+        run(force=args.force)
@@ -1,25 +1,124 @@
 import os
 import sys
+import numpy as np
 import pandas as pd
 
 # Gestion dynamique des chemins
 ROOT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-sys.path.append(ROOT_DIR)
+if __package__ in (None, ""):
+    # Lancé comme script : la racine du projet n'est pas encore dans sys.path
+    sys.path.append(ROOT_DIR)
 
 # Import des chemins définis dans paths.py
 from paths import OUTPUT_DIR, RECOMMENDATION_RESULTS_DIR
+from src.utils.storage import load_dataset, save_dataset, find_dataset, dataset_path
+from src.utils.build_cache import run_cached
 
-# Chargement du dataset enrichi avec les sentiments
-sentiments_path = os.path.join(OUTPUT_DIR, "amazon_reviews_sentiments.csv")
-sentiments_df = pd.read_csv(sentiments_path)
+RECOMMENDATION_COLUMNS = ["productid", "total_reviews", "avg_score"]
 
-# Vérification des colonnes nécessaires
-required_columns = ["productid", "avg_score", "num_reviews", "sentiment"]
-for col in required_columns:
-    if col not in sentiments_df.columns:
-        raise ValueError(
-            f"La colonne '{col}' est manquante dans amazon_reviews_sentiments.csv."
+
+def summarize_by_sentiment(df, column="sentiment"):
+    """
+    Agrège les critiques par (sentiment, produit) en un seul regroupement. Le sentiment
+    est ramené en minuscules une fois par catégorie (colonne catégorielle), et non
+    ligne par ligne ; les lignes sans sentiment sont ignorées.
+    :return: DataFrame (sentiment, productid, total_reviews, avg_score), trié par
+        sentiment puis produit.
+    """
+    sentiments = df[column].astype("category")
+    lowered = sentiments.cat.categories.astype(str).str.lower()
+    categories = pd.Index(lowered.unique())
+    codes = sentiments.cat.codes.to_numpy()
+    codes = np.where(codes >= 0, categories.get_indexer(lowered)[codes], -1)
+    sentiment = pd.Categorical.from_codes(codes, categories=categories)
+
+    return (
+        df.assign(sentiment=sentiment)
+        .groupby(["sentiment", "productid"], observed=True)
+        .agg(
+            total_reviews=("num_reviews", "sum"),
+            avg_score=("avg_score", "mean"),
         )
+        .reset_index()
+    )
+
+
+def rank_positions(avg_score, total_reviews, top_k=None):
+    """
+    Positions des lignes par avg_score puis total_reviews décroissants (avg_score
+    manquant en dernier, ordre d'origine à égalité), limitées aux `top_k` premières.
+    Sélection partielle : seuil du k-ième score par np.partition, puis tri des seules
+    lignes au-dessus du seuil.
+    """
+    missing = np.isnan(avg_score)
+    score = np.where(missing, -np.inf, avg_score)
+    candidates = np.arange(len(score))
+    if top_k is not None and top_k < len(score):
+        if top_k <= 0:
+            return candidates[:0]
+        threshold = np.partition(score, len(score) - top_k)[len(score) - top_k]
+        candidates = np.flatnonzero(score >= threshold)
+    order = np.lexsort(
+        (
+            candidates,
+            -total_reviews[candidates],
+            -score[candidates],
+            missing[candidates],
+        )
+    )
+    return candidates[order][:top_k]
+
+
+def rank_recommendations(summary, sentiments, min_reviews, top_k=None):
+    """
+    Classements des produits pour chaque combinaison (sentiment, seuil de critiques),
+    à partir du résumé de summarize_by_sentiment.
+    :param sentiments: Sentiments demandés (casse indifférente).
+    :param min_reviews: Seuils de nombre minimal de critiques.
+    :param top_k: Nombre de produits gardés par combinaison ; tous par défaut (un seul
+        tri par sentiment, filtré ensuite pour chaque seuil).
+    :return: {(sentiment, seuil): DataFrame (productid, total_reviews, avg_score)}.
+    """
+    categories = summary["sentiment"].cat.categories
+    codes = summary["sentiment"].cat.codes.to_numpy()
+    bounds = np.searchsorted(codes, np.arange(len(categories) + 1))
+    avg_score = summary["avg_score"].to_numpy(dtype="float64")
+    total_reviews = summary["total_reviews"].to_numpy(dtype="float64")
+    columns = summary[RECOMMENDATION_COLUMNS]
+
+    results = {}
+    for sentiment in sentiments:
+        code = categories.get_indexer([sentiment.lower()])[0]
+        if code < 0:
+            start = stop = 0
+        else:
+            start, stop = bounds[code], bounds[code + 1]
+        scores, totals = avg_score[start:stop], total_reviews[start:stop]
+        if top_k is None:
+            ranked = rank_positions(scores, totals)
+        for threshold in min_reviews:
+            if top_k is None:
+                positions = ranked[totals[ranked] >= threshold]
+            else:
+                eligible = np.flatnonzero(totals >= threshold)
+                positions = eligible[
+                    rank_positions(scores[eligible], totals[eligible], top_k)
+                ]
+            results[sentiment, threshold] = columns.iloc[start + positions].reset_index(
+                drop=True
+            )
+    return results
+
+
+def generate_recommendation_sets(df, sentiments, min_reviews, top_k=None):
+    """
+    Recommandations pour plusieurs sentiments et seuils de critiques en un passage :
+    un seul regroupement par (sentiment, produit), puis un classement par combinaison
+    (voir rank_recommendations).
+    """
+    return rank_recommendations(
+        summarize_by_sentiment(df), sentiments, min_reviews, top_k=top_k
+    )
 
 
 # Fonction de recommandation
@@ -31,42 +130,55 @@ def generate_recommendations(df, min_reviews=5, sentiment_filter="positive"):
     :param sentiment_filter: Sentiment à utiliser pour filtrer les critiques.
     :return: DataFrame avec les produits recommandés.
     """
-    # Filtrer les produits avec un sentiment donné
-    filtered_reviews = df[df["sentiment"].str.lower() == sentiment_filter.lower()]
+    results = generate_recommendation_sets(df, [sentiment_filter], [min_reviews])
+    return results[sentiment_filter, min_reviews]
 
-    # Agréger les critiques par produit
-    product_summary = (
-        filtered_reviews.groupby("productid")
-        .agg(
-            total_reviews=("num_reviews", "sum"),
-            avg_score=("avg_score", "mean"),
-        )
-        .reset_index()
-    )
 
-    # Filtrer les produits ayant un nombre minimal de critiques
-    recommended_products = product_summary[
-        product_summary["total_reviews"] >= min_reviews
-    ]
-    recommended_products = recommended_products.sort_values(
-        by=["avg_score", "total_reviews"], ascending=False
+def load(output_dir=OUTPUT_DIR):
+    """Charge les sentiments par produit et vérifie les colonnes nécessaires."""
+    sentiments_df = load_dataset(output_dir, "amazon_reviews_sentiments")
+
+    # Vérification des colonnes nécessaires
+    required_columns = ["productid", "avg_score", "num_reviews", "sentiment"]
+    for col in required_columns:
+        if col not in sentiments_df.columns:
+            raise ValueError(
+                f"La colonne '{col}' est manquante dans amazon_reviews_sentiments.csv."
+            )
+    return sentiments_df
+
+
+def main():
+    # Chargement du dataset enrichi avec les sentiments
+    sentiments_df = load()
+
+    # Générer les recommandations
+    print("Génération des recommandations en cours...")
+    recommended_products_df = generate_recommendations(sentiments_df)
+
+    # Sauvegarder les recommandations
+    recommendations_file = save_dataset(
+        recommended_products_df, RECOMMENDATION_RESULTS_DIR, "recommended_products"
     )
+    print(f"Recommandations générées et sauvegardées dans {recommendations_file}.")
 
-    return recommended_products
+    # Afficher un aperçu des recommandations
+    print("Aperçu des produits recommandés :")
+    print(recommended_products_df.head(10))
 
 
-# Générer les recommandations
-print("Génération des recommandations en cours...")
-recommended_products_df = generate_recommendations(sentiments_df)
+def run(force=False):
+    """Recommandations incrémentales : sautées si les sentiments et le code n'ont pas
+    changé depuis la dernière exécution (voir build_cache)."""
+    return run_cached(
+        "recommendations",
+        main,
+        inputs=[find_dataset(OUTPUT_DIR, "amazon_reviews_sentiments")],
+        outputs=[dataset_path(RECOMMENDATION_RESULTS_DIR, "recommended_products")],
+        code_files=[os.path.abspath(__file__)],
+        force=force,
+    )
 
-# Sauvegarder les recommandations
-os.makedirs(RECOMMENDATION_RESULTS_DIR, exist_ok=True)
-recommendations_file = os.path.join(
-    RECOMMENDATION_RESULTS_DIR, "recommended_products.csv"
-)
-recommended_products_df.to_csv(recommendations_file, index=False)
-print(f"Recommandations générées et sauvegardées dans {recommendations_file}.")
 
-# Afficher un aperçu des recommandations
-print("Aperçu des produits recommandés :")
-print(recommended_products_df.head(10))
+if __name__ == "__main__":
+    run(force="--force" in sys.argv[1:])
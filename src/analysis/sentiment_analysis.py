@@ -1,37 +1,143 @@
 import os
 import sys
+import argparse
+import numpy as np
 import pandas as pd
 
 # Gestion dynamique des chemins
 ROOT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-sys.path.append(ROOT_DIR)
+if __package__ in (None, ""):
+    # Lancé comme script : la racine du projet n'est pas encore dans sys.path
+    sys.path.append(ROOT_DIR)
 
 # Import des chemins définis dans paths.py
-from paths import PROCESSED_DATA_DIR, OUTPUT_DIR
+from paths import (
+    PROCESSED_DATA_DIR,
+    OUTPUT_DIR,
+    REVIEWS_DB_PATH,
+    SENTIMENT_LEXICON_PATH,
+)
+from src.utils.storage import load_dataset, save_dataset, find_dataset, dataset_path
+from src.utils.build_cache import run_cached
+from src.utils.aggregates import state_mean, state_column, lookup
+from src.utils.lexicon_sentiment import (
+    iter_review_batches,
+    score_reviews,
+    scorer_version,
+    label_scores,
+)
+from src.utils.sentiment_cache import SentimentCache
 
-# Chargement du dataset
-reviews_path = os.path.join(PROCESSED_DATA_DIR, "amazon_reviews_summary.csv")
-reviews_df = pd.read_csv(reviews_path)
 
-# Affichage des colonnes disponibles pour validation
-print("Colonnes disponibles dans le fichier :")
-print(reviews_df.columns)
+def bucket_scores(avg_score):
+    """Sentiment d'après la note moyenne : >= 4 positif, [3, 4[ neutre, sinon négatif."""
+    labels = np.select(
+        [avg_score >= 4, avg_score >= 3], ["positive", "neutral"], default="negative"
+    )
+    return pd.Series(labels, index=avg_score.index)
 
-# Vérification des colonnes nécessaires
-required_columns = ["productid", "avg_score", "num_reviews"]
-if not all(col in reviews_df.columns for col in required_columns):
-    raise ValueError(
-        f"Les colonnes nécessaires {required_columns} sont manquantes dans amazon_reviews_summary.csv."
+
+def add_text_sentiments(reviews_df, workers=1, db_path=REVIEWS_DB_PATH, cache=True):
+    """
+    Ajoute le sentiment des textes d'avis (base SQLite) par produit : score moyen,
+    nombre d'avis notés et classe du score moyen.
+    :param cache: Réutilise les scores des exécutions précédentes (SentimentCache) ;
+        seuls les avis nouveaux ou modifiés sont scorés.
+    """
+    print("Analyse des textes d'avis en cours...")
+    score_cache = SentimentCache(scorer_version()) if cache else None
+    try:
+        state = score_reviews(
+            iter_review_batches(db_path), workers=workers, cache=score_cache
+        )
+    finally:
+        if score_cache is not None:
+            score_cache.close()
+    keys = reviews_df["productid"]
+    reviews_df["text_sentiment"] = lookup(state_mean(state, "text_sentiment"), keys)
+    reviews_df["text_reviews"] = (
+        lookup(state[state_column("text_sentiment", "count")], keys)
+        .fillna(0)
+        .astype("int64")
     )
+    reviews_df["text_sentiment_label"] = label_scores(reviews_df["text_sentiment"])
+    return reviews_df
 
-# Analyse des scores moyens (avg_score)
-print("Analyse des scores moyens en cours...")
-reviews_df["sentiment"] = reviews_df["avg_score"].apply(
-    lambda x: "positive" if x >= 4 else ("neutral" if 3 <= x < 4 else "negative")
-)
 
-# Sauvegarde des résultats enrichis
-os.makedirs(OUTPUT_DIR, exist_ok=True)
-output_file = os.path.join(OUTPUT_DIR, "amazon_reviews_sentiments.csv")
-reviews_df.to_csv(output_file, index=False)
-print(f"Analyse des sentiments terminée. Résultats sauvegardés dans {output_file}.")
+def load(data_dir=PROCESSED_DATA_DIR):
+    """Charge le résumé des avis et vérifie les colonnes nécessaires."""
+    reviews_df = load_dataset(data_dir, "amazon_reviews_summary")
+
+    # Affichage des colonnes disponibles pour validation
+    print("Colonnes disponibles dans le fichier :")
+    print(reviews_df.columns)
+
+    # Vérification des colonnes nécessaires
+    required_columns = ["productid", "avg_score", "num_reviews"]
+    if not all(col in reviews_df.columns for col in required_columns):
+        raise ValueError(
+            f"Les colonnes nécessaires {required_columns} sont manquantes dans amazon_reviews_summary.csv."
+        )
+    return reviews_df
+
+
+def analyze_sentiments(workers=1, cache=True):
+    reviews_df = load()
+
+    # Analyse des scores moyens (avg_score)
+    print("Analyse des scores moyens en cours...")
+    reviews_df["sentiment"] = bucket_scores(reviews_df["avg_score"])
+
+    # Sentiment des textes, si la base des avis est disponible
+    if os.path.exists(REVIEWS_DB_PATH):
+        reviews_df = add_text_sentiments(reviews_df, workers=workers, cache=cache)
+    else:
+        print(f"Base des avis introuvable ({REVIEWS_DB_PATH}) : textes ignorés.")
+
+    # Sauvegarde des résultats enrichis
+    output_file = save_dataset(reviews_df, OUTPUT_DIR, "amazon_reviews_sentiments")
+    print(f"Analyse des sentiments terminée. Résultats sauvegardés dans {output_file}.")
+
+
+def run(force=False, workers=1, cache=True):
+    """Analyse incrémentale : sautée si le résumé des avis, la base des textes, le
+    lexique et le code n'ont pas changé depuis la dernière exécution (voir
+    build_cache)."""
+    inputs = [find_dataset(PROCESSED_DATA_DIR, "amazon_reviews_summary")]
+    inputs += [
+        path
+        for path in (REVIEWS_DB_PATH, SENTIMENT_LEXICON_PATH)
+        if os.path.exists(path)
+    ]
+    return run_cached(
+        "sentiments",
+        lambda: analyze_sentiments(workers=workers, cache=cache),
+        inputs=inputs,
+        outputs=[dataset_path(OUTPUT_DIR, "amazon_reviews_sentiments")],
+        code_files=[
+            os.path.abspath(__file__),
+            os.path.join(ROOT_DIR, "src", "utils", "lexicon_sentiment.py"),
+            os.path.join(ROOT_DIR, "src", "utils", "sentiment_cache.py"),
+        ],
+        force=force,
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Analyse des sentiments des avis.")
+    parser.add_argument(
+        "--force", action="store_true", help="Ignorer le cache incrémental"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Nombre de processus pour l'analyse des textes",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Rescorer tous les textes sans utiliser le cache des scores",
+    )
+    args = parser.parse_args()
+    run(force=args.force, workers=args.workers, cache=not args.no_cache)
@@ -0,0 +1,119 @@
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import numpy as np
+
+# Gestion dynamique des chemins : ROOT_DIR = racine du projet
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if __package__ in (None, ""):
+    # Lancé comme script : la racine du projet n'est pas encore dans sys.path
+    sys.path.append(ROOT_DIR)
+
+from src.api.recommendation_service import DEFAULT_HOST, DEFAULT_PORT
+
+# --- Client de test de charge du service de recommandations ---
+#
+# `concurrency` connexions persistantes (keep-alive) envoient chacune leurs requêtes
+# l'une après l'autre, jusqu'à `requests` requêtes au total, réparties entre les
+# routes /tools (rôles tirés parmi /roles), /products et /performance. Affiche le
+# débit, les latences vues du client et celles mesurées par le service (/stats).
+#
+#   python src/api/recommendation_service.py &
+#   python src/api/load_test.py --requests 5000 --concurrency 64
+
+# Part de chaque route dans les requêtes envoyées
+ROUTE_MIX = {"tools": 0.8, "products": 0.15, "performance": 0.05}
+
+
+async def fetch(reader, writer, host, path):
+    """Envoie une requête GET sur une connexion ouverte ; renvoie (statut, JSON)."""
+    writer.write(
+        f"GET {path} HTTP/1.1\r\nHost: {host}\r\nConnection: keep-alive\r\n\r\n".encode()
+    )
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        if name.strip().lower() == "content-length":
+            length = int(value)
+    return status, json.loads(await reader.readexactly(length))
+
+
+async def get(host, port, path):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        return await fetch(reader, writer, host, path)
+    finally:
+        writer.close()
+
+
+def make_paths(count, roles, rng):
+    """Chemins des requêtes à envoyer, selon ROUTE_MIX."""
+    routes = rng.choice(list(ROUTE_MIX), size=count, p=list(ROUTE_MIX.values()))
+    paths = []
+    for route in routes:
+        if route == "tools" and roles:
+            paths.append(f"/tools?role={rng.choice(roles)}&top_n=10")
+        elif route == "products":
+            sentiment = rng.choice(["positive", "neutral", "negative"])
+            paths.append(f"/products?sentiment={sentiment}&min_reviews=1&limit=20")
+        else:
+            paths.append("/performance?limit=20")
+    return paths
+
+
+async def worker(host, port, paths, latencies, statuses):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        while paths:
+            path = paths.pop()
+            start = time.perf_counter()
+            status, _ = await fetch(reader, writer, host, path)
+            latencies.append(time.perf_counter() - start)
+            statuses[status] = statuses.get(status, 0) + 1
+    finally:
+        writer.close()
+
+
+async def load_test(host, port, requests, concurrency, seed=0):
+    _, payload = await get(host, port, "/roles")
+    paths = make_paths(requests, payload["roles"], np.random.default_rng(seed))
+    latencies, statuses = [], {}
+
+    start = time.perf_counter()
+    await asyncio.gather(
+        *(worker(host, port, paths, latencies, statuses) for _ in range(concurrency))
+    )
+    elapsed = time.perf_counter() - start
+
+    values = np.array(latencies) * 1000
+    p50, p95, p99 = np.percentile(values, [50, 95, 99])
+    print(
+        f"Requêtes : {len(values)} en {elapsed:.2f} s ({len(values) / elapsed:.0f}/s)"
+    )
+    print(f"Statuts : {statuses}")
+    print(f"Latence client : p50 {p50:.2f} ms, p95 {p95:.2f} ms, p99 {p99:.2f} ms")
+
+    _, stats = await get(host, port, "/stats")
+    print("Latences du service :")
+    for route, route_stats in stats["latency"].items():
+        print(f"  {route}: {route_stats}")
+    print(f"Micro-lots : {stats['micro_batches']}")
+    return stats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Test de charge du service.")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    args = parser.parse_args()
+    asyncio.run(load_test(args.host, args.port, args.requests, args.concurrency))
@@ -0,0 +1,423 @@
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit, parse_qs
+import numpy as np
+
+# Gestion dynamique des chemins : ROOT_DIR = racine du projet
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if __package__ in (None, ""):
+    # Lancé comme script : la racine du projet n'est pas encore dans sys.path
+    sys.path.append(ROOT_DIR)
+
+# Import des chemins définis dans paths.py
+from paths import OUTPUT_DIR
+from src.utils.storage import load_dataset, read_table
+from src.analysis.SaaS_recommendation import LRUCache
+
+# --- Service HTTP local de recommandations ---
+#
+# Serveur asyncio de la bibliothèque standard (aucune dépendance réseau, aucun accès
+# extérieur). Les modèles et index sont chargés une fois au démarrage :
+#   GET /tools?role=ADTK&top_n=10              outils SaaS recommandés pour un rôle
+#   GET /roles                                 rôles connus
+#   GET /products?sentiment=positive&min_reviews=5&limit=20
+#                                              produits recommandés (recommendation_engine)
+#   GET /performance?limit=20                  produits classés par performance
+#   GET /stats                                 latences (p50, p95, p99), micro-lots, caches
+#   GET /health
+# Les requêtes arrivées en même temps sont regroupées en micro-lots (MicroBatcher) :
+# un seul appel aux fonctions vectorisées (recommend_roles, rank_recommendations)
+# sert tout le lot. Les calculs tournent dans un thread dédié, la boucle asyncio ne
+# fait que les entrées-sorties.
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+
+# Attente maximale avant de traiter un micro-lot, et taille maximale d'un lot
+BATCH_WINDOW = 0.002
+MAX_BATCH_SIZE = 256
+
+# Nombre de latences gardées par route pour les percentiles
+LATENCY_WINDOW = 10_000
+
+DEFAULT_TOP_N = 10
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 1000
+
+# Classements de produits gardés en mémoire, par filtre (sentiment, min_reviews)
+PRODUCT_CACHE_SIZE = 256
+
+REASONS = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    500: "Internal Server Error",
+    503: "Service Unavailable",
+}
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class MicroBatcher:
+    """
+    Regroupe les éléments soumis pendant `window` secondes (au plus `max_size`) et les
+    traite par un seul appel `process(items)`, exécuté dans `executor`, qui renvoie un
+    résultat par élément.
+    """
+
+    def __init__(self, process, executor, window=BATCH_WINDOW, max_size=MAX_BATCH_SIZE):
+        self.process = process
+        self.executor = executor
+        self.window = window
+        self.max_size = max_size
+        self.queue = asyncio.Queue()
+        self.batch_sizes = deque(maxlen=LATENCY_WINDOW)
+        self.task = None
+
+    def start(self):
+        self.task = asyncio.get_running_loop().create_task(self._run())
+
+    async def submit(self, item):
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((item, future))
+        return await future
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            pending = [await self.queue.get()]
+            deadline = loop.time() + self.window
+            while len(pending) < self.max_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    pending.append(await asyncio.wait_for(self.queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            self.batch_sizes.append(len(pending))
+            items = [item for item, _ in pending]
+            try:
+                results = await loop.run_in_executor(self.executor, self.process, items)
+            except Exception as e:
+                results = [e] * len(pending)
+            for (_, future), result in zip(pending, results):
+                if future.done():
+                    continue
+                if isinstance(result, Exception):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
+
+
+def _records(df):
+    return json.loads(df.to_json(orient="records", force_ascii=False))
+
+
+class RecommendationService:
+    """Modèles chargés une fois, micro-lots par route et latences des requêtes."""
+
+    def __init__(self, window=BATCH_WINDOW, max_batch=MAX_BATCH_SIZE):
+        self.window = window
+        self.max_batch = max_batch
+        self.latencies = {}
+        self.product_results = LRUCache(PRODUCT_CACHE_SIZE)
+        self.started = time.time()
+
+    def load(self):
+        """Charge les rôles, l'index des outils, les sentiments et les performances."""
+        start = time.perf_counter()
+        from src.analysis import SaaS_recommendation
+        from src.analysis.recommendation_engine import (
+            summarize_by_sentiment,
+            rank_recommendations,
+        )
+        from src.analysis.cloud_performance_analysis import output_path
+
+        self.saas = SaaS_recommendation.load()
+        self.rank_recommendations = rank_recommendations
+        # Premier appel : vecteurs des rôles calculés avant la première requête
+        if self.saas.skill_index:
+            self.saas.recommend_roles(list(self.saas.skill_index)[:1])
+
+        try:
+            sentiments = load_dataset(OUTPUT_DIR, "amazon_reviews_sentiments")
+            # Regroupement par (sentiment, produit) fait une fois pour tous les filtres
+            self.sentiments = summarize_by_sentiment(sentiments)
+        except FileNotFoundError as e:
+            print(f"Recommandations de produits indisponibles : {e}")
+            self.sentiments = None
+        if os.path.exists(output_path):
+            self.performance = read_table(output_path, compact=False)
+        else:
+            print(f"Classement par performance indisponible : {output_path} absent")
+            self.performance = None
+        print(f"Modèles chargés en {time.perf_counter() - start:.2f} s")
+
+    # --- Traitement des micro-lots (thread de calcul) ---
+
+    def tool_batch(self, items):
+        """items : (rôle, top_n) ; un appel recommend_roles par valeur de top_n."""
+        results = {}
+        for top_n in {top_n for _, top_n in items}:
+            roles = list(dict.fromkeys(role for role, n in items if n == top_n))
+            recommendations = self.saas.recommend_roles(roles, top_n=top_n)
+            for record in _records(recommendations):
+                role = record.pop("role")
+                results.setdefault((role, top_n), []).append(record)
+        return [results.get(item, []) for item in items]
+
+    def product_batch(self, items):
+        """
+        items : (sentiment, min_reviews, limit) ; les filtres absents du cache (LRU
+        borné à PRODUCT_CACHE_SIZE filtres) sont classés ensemble (MAX_LIMIT produits
+        au plus).
+        """
+        results = {}
+        for key in {(s, m) for s, m, _ in items}:
+            cached = self.product_results.get(key)
+            if cached is not None:
+                results[key] = cached
+        missing = {(s, m) for s, m, _ in items} - results.keys()
+        if missing:
+            sentiments = sorted({s for s, _ in missing})
+            thresholds = sorted({m for _, m in missing})
+            ranked = self.rank_recommendations(
+                self.sentiments, sentiments, thresholds, top_k=MAX_LIMIT
+            )
+            for key in missing:
+                results[key] = ranked[key]
+                self.product_results.put(key, ranked[key])
+        return [
+            _records(results[sentiment, min_reviews].head(limit))
+            for sentiment, min_reviews, limit in items
+        ]
+
+    # --- Routes ---
+
+    async def tools(self, params):
+        role = _param(params, "role", str)
+        top_n = _param(params, "top_n", int, DEFAULT_TOP_N, maximum=MAX_LIMIT)
+        if role not in self.saas.skill_index:
+            raise HTTPError(404, f"Le rôle '{role}' n'existe pas dans le dataset.")
+        tools = await self.tool_batcher.submit((role, top_n))
+        return {"role": role, "tools": tools}
+
+    async def roles(self, params):
+        return {"roles": list(self.saas.skill_index)}
+
+    async def products(self, params):
+        if self.sentiments is None:
+            raise HTTPError(503, "Sentiments des avis non disponibles.")
+        sentiment = _param(params, "sentiment", str, "positive").lower()
+        min_reviews = _param(params, "min_reviews", int, 5)
+        limit = _param(params, "limit", int, DEFAULT_LIMIT, maximum=MAX_LIMIT)
+        products = await self.product_batcher.submit((sentiment, min_reviews, limit))
+        return {
+            "sentiment": sentiment,
+            "min_reviews": min_reviews,
+            "products": products,
+        }
+
+    async def performance_ranking(self, params):
+        if self.performance is None:
+            raise HTTPError(503, "Classement par performance non disponible.")
+        limit = _param(params, "limit", int, DEFAULT_LIMIT, maximum=MAX_LIMIT)
+        return {"products": _records(self.performance.head(limit))}
+
+    async def stats(self, params):
+        routes = {}
+        for route, latencies in self.latencies.items():
+            values = np.array(latencies) * 1000
+            p50, p95, p99 = np.percentile(values, [50, 95, 99])
+            routes[route] = {
+                "requests": len(values),
+                "p50_ms": round(p50, 3),
+                "p95_ms": round(p95, 3),
+                "p99_ms": round(p99, 3),
+            }
+        batches = {
+            name: {
+                "batches": len(batcher.batch_sizes),
+                "mean_size": (
+                    round(float(np.mean(batcher.batch_sizes)), 2)
+                    if batcher.batch_sizes
+                    else 0.0
+                ),
+            }
+            for name, batcher in (
+                ("tools", self.tool_batcher),
+                ("products", self.product_batcher),
+            )
+        }
+        return {
+            "uptime_s": round(time.time() - self.started, 1),
+            "latency": routes,
+            "micro_batches": batches,
+            "caches": {
+                **self.saas.cache_stats(),
+                "products": self.product_results.stats(),
+            },
+        }
+
+    async def health(self, params):
+        return {"status": "ok"}
+
+    # --- HTTP ---
+
+    async def start(self, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        # Un seul thread de calcul : les caches de SaaS_recommendation ne sont pas
+        # partagés entre threads
+        executor = ThreadPoolExecutor(max_workers=1)
+        self.tool_batcher = MicroBatcher(
+            self.tool_batch, executor, self.window, self.max_batch
+        )
+        self.product_batcher = MicroBatcher(
+            self.product_batch, executor, self.window, self.max_batch
+        )
+        self.tool_batcher.start()
+        self.product_batcher.start()
+        self.routes = {
+            "/tools": self.tools,
+            "/roles": self.roles,
+            "/products": self.products,
+            "/performance": self.performance_ranking,
+            "/stats": self.stats,
+            "/health": self.health,
+        }
+        return await asyncio.start_server(self.handle, host, port)
+
+    async def dispatch(self, method, target):
+        url = urlsplit(target)
+        handler = self.routes.get(url.path)
+        if handler is None:
+            raise HTTPError(404, f"Route inconnue : {url.path}")
+        if method != "GET":
+            raise HTTPError(405, f"Méthode non prise en charge : {method}")
+        return await handler(parse_qs(url.query))
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                start = time.perf_counter()
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                try:
+                    length = int(headers.get("content-length") or 0)
+                except ValueError:
+                    length = -1
+                # Longueur invalide : corps non lu, réponse 400 puis fermeture
+                if length > 0:
+                    await reader.readexactly(length)
+
+                parts = request_line.decode("latin-1").split()
+                route = "invalid"
+                try:
+                    if len(parts) != 3:
+                        raise HTTPError(400, "Ligne de requête invalide.")
+                    if length < 0:
+                        raise HTTPError(400, "En-tête Content-Length invalide.")
+                    method, target, version = parts
+                    route = urlsplit(target).path
+                    status, payload = 200, await self.dispatch(method, target)
+                except HTTPError as e:
+                    status, payload = e.status, {"error": str(e)}
+                except Exception as e:
+                    # Erreur du service (ex. micro-lot en échec), pas de la requête
+                    status, payload = 500, {"error": f"{type(e).__name__}: {e}"}
+
+                keep_alive = (
+                    length >= 0
+                    and len(parts) == 3
+                    and parts[2] == "HTTP/1.1"
+                    and headers.get("connection", "").lower() != "close"
+                )
+                body = json.dumps(payload, ensure_ascii=False, default=str).encode()
+                writer.write(
+                    (
+                        f"HTTP/1.1 {status} {REASONS[status]}\r\n"
+                        "Content-Type: application/json; charset=utf-8\r\n"
+                        f"Content-Length: {len(body)}\r\n"
+                        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n"
+                        "\r\n"
+                    ).encode("latin-1")
+                    + body
+                )
+                await writer.drain()
+                if route not in self.routes:
+                    route = "other"
+                self.latencies.setdefault(route, deque(maxlen=LATENCY_WINDOW)).append(
+                    time.perf_counter() - start
+                )
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+
+def _param(params, name, kind, default=None, maximum=None):
+    """Paramètre de requête converti en `kind` (HTTPError 400 si invalide)."""
+    values = params.get(name)
+    if not values:
+        if default is None:
+            raise HTTPError(400, f"Paramètre '{name}' manquant.")
+        return default
+    try:
+        value = kind(values[0])
+    except ValueError:
+        raise HTTPError(400, f"Paramètre '{name}' invalide : {values[0]}")
+    if kind is int and (value < 0 or (maximum is not None and value > maximum)):
+        raise HTTPError(400, f"Paramètre '{name}' hors limites : {value}")
+    return value
+
+
+async def serve(host, port, window, max_batch):
+    service = RecommendationService(window=window, max_batch=max_batch)
+    service.load()
+    server = await service.start(host, port)
+    print(f"Service de recommandations prêt sur http://{host}:{port}")
+    async with server:
+        await server.serve_forever()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Service HTTP de recommandations.")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument(
+        "--batch-window-ms",
+        type=float,
+        default=BATCH_WINDOW * 1000,
+        help="Attente maximale avant de traiter un micro-lot",
+    )
+    parser.add_argument(
+        "--max-batch", type=int, default=MAX_BATCH_SIZE, help="Taille maximale d'un lot"
+    )
+    args = parser.parse_args()
+    try:
+        asyncio.run(
+            serve(args.host, args.port, args.batch_window_ms / 1000, args.max_batch)
+        )
+    except KeyboardInterrupt:
+        print("Service arrêté.")
@@ -0,0 +1,141 @@
+import os
+import sys
+import json
+import argparse
+import subprocess
+
+# Gestion dynamique des chemins : ROOT_DIR = racine du projet
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Benchmark : démarrage à froid des modules d'analyse. Chaque module est importé dans
+# un processus neuf (aucun cache de modules partagé) : temps d'import, puis latence du
+# premier appel (load() puis un calcul), si les données du pipeline sont présentes.
+# L'import doit rester sans effet : aucune donnée lue, sys.path inchangé et aucune
+# bibliothèque lourde (sklearn, matplotlib, seaborn) chargée. Code de sortie 1 si une
+# de ces règles ou un budget de temps n'est pas respecté.
+#
+#   python src/benchmarks/bench_cold_start.py --import-budget 1500 --call-budget 5000
+
+HEAVY_MODULES = ["sklearn", "matplotlib", "seaborn"]
+
+# Premier appel de chaque module : load() puis le calcul principal, sans écriture
+FIRST_CALLS = {
+    "src.analysis.SaaS_recommendation": (
+        "recommender = module.load()\n"
+        "recommender.recommend_roles(list(recommender.skill_index)[:1])"
+    ),
+    "src.analysis.recommendation_engine": (
+        "module.generate_recommendations(module.load())"
+    ),
+    "src.analysis.sentiment_analysis": (
+        "module.bucket_scores(module.load()['avg_score'])"
+    ),
+    "src.analysis.cloud_performance_analysis": (
+        "performance_data, recommendations = module.load()\n"
+        "module.rank_products(recommendations, module.performance_scores(performance_data))"
+    ),
+}
+
+# Exécuté dans le processus fils ; le résultat est la dernière ligne de la sortie
+CHILD = """
+import io, sys, json, time, importlib, contextlib
+sys.path.insert(0, {root!r})
+path_before = list(sys.path)
+start = time.perf_counter()
+with contextlib.redirect_stdout(io.StringIO()):
+    module = importlib.import_module({module!r})
+result = {{"import_ms": (time.perf_counter() - start) * 1000}}
+result["sys_path_changed"] = sys.path != path_before
+result["heavy_loaded"] = sorted(
+    name for name in {heavy!r} if name in sys.modules
+)
+start = time.perf_counter()
+try:
+    with contextlib.redirect_stdout(io.StringIO()):
+        exec({call!r})
+    result["call_ms"] = (time.perf_counter() - start) * 1000
+except Exception as e:
+    result["call_error"] = f"{{type(e).__name__}}: {{e}}"
+print(json.dumps(result))
+"""
+
+
+def measure(module, call, skip_call=False):
+    """Mesure l'import (et le premier appel) d'un module dans un processus neuf."""
+    code = CHILD.format(
+        root=ROOT_DIR,
+        module=module,
+        heavy=HEAVY_MODULES,
+        call="pass" if skip_call else call,
+    )
+    completed = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=ROOT_DIR,
+        capture_output=True,
+        text=True,
+    )
+    if completed.returncode != 0:
+        return {"error": completed.stderr.strip().splitlines()[-1]}
+    result = json.loads(completed.stdout.strip().splitlines()[-1])
+    if skip_call:
+        result.pop("call_ms")
+    return result
+
+
+def check(results, import_budget, call_budget):
+    """Liste des règles ou budgets non respectés."""
+    failures = []
+    for module, result in results.items():
+        if "error" in result:
+            failures.append(f"{module} : import en échec ({result['error']})")
+            continue
+        if result["sys_path_changed"]:
+            failures.append(f"{module} : sys.path modifié à l'import")
+        if result["heavy_loaded"]:
+            failures.append(
+                f"{module} : {', '.join(result['heavy_loaded'])} chargé(s) à l'import"
+            )
+        if result["import_ms"] > import_budget:
+            failures.append(
+                f"{module} : import {result['import_ms']:.0f} ms > {import_budget} ms"
+            )
+        if result.get("call_ms", 0) > call_budget:
+            failures.append(
+                f"{module} : premier appel {result['call_ms']:.0f} ms > {call_budget} ms"
+            )
+    return failures
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Démarrage à froid des modules.")
+    parser.add_argument("--modules", nargs="+", default=list(FIRST_CALLS))
+    parser.add_argument(
+        "--import-budget", type=float, default=1500, help="Budget d'import (ms)"
+    )
+    parser.add_argument(
+        "--call-budget", type=float, default=5000, help="Budget du premier appel (ms)"
+    )
+    parser.add_argument(
+        "--import-only", action="store_true", help="Ne mesurer que l'import"
+    )
+    args = parser.parse_args()
+
+    results = {}
+    for module in args.modules:
+        results[module] = result = measure(
+            module, FIRST_CALLS.get(module, "pass"), skip_call=args.import_only
+        )
+        if "error" in result:
+            print(f"{module:42s} erreur : {result['error']}")
+            continue
+        line = f"{module:42s} import {result['import_ms']:8.1f} ms"
+        if "call_ms" in result:
+            line += f"   premier appel {result['call_ms']:8.1f} ms"
+        elif "call_error" in result:
+            line += f"   premier appel impossible ({result['call_error']})"
+        print(line)
+
+    failures = check(results, args.import_budget, args.call_budget)
+    for failure in failures:
+        print(f"Régression : {failure}")
+    sys.exit(1 if failures else 0)
@@ -0,0 +1,171 @@
+import io
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+import contextlib
+import numpy as np
+import pandas as pd
+
+# Gestion dynamique des chemins : ROOT_DIR = racine du projet
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if __package__ in (None, ""):
+    # Lancé comme script : la racine du projet n'est pas encore dans sys.path
+    sys.path.append(ROOT_DIR)
+
+from src.utils import dtypes
+from src.utils.storage import save_dataset, load_dataset
+from src.preprocesing.enrich_data import CLEANED_DATASETS, ENRICHED_DATASETS
+from src.preprocesing.enrich_and_summarize import enrich_and_summarize
+from src.utils import feature_engineering
+from src.utils.feature_engineering import SUMMARY_DATASETS
+
+# Benchmark : enrichissement + résumés en deux étapes (ancien enrich_data, reproduit
+# ci-dessous, puis utils/feature_engineering) contre l'étape fusionnée (enrich_and_summarize), sur des
+# datasets nettoyés synthétiques de grande taille. Les résultats sont comparés.
+#
+#   python src/benchmarks/bench_enrich_summary.py --rows 1000000 --repeat 3
+
+
+def make_cleaned_datasets(rows, seed=0):
+    """Datasets nettoyés synthétiques ; `rows` lignes pour les avis et vmCloud."""
+    rng = np.random.default_rng(seed)
+    small = max(rows // 100, 10)
+    products = np.array([f"B{i:07d}" for i in range(max(rows // 20, 1))])
+    task_types = np.array(["compute", "io", "network", "storage"])
+    departments = np.array(["IT", "HR", "Sales", "Finance", "Marketing"])
+    tools = np.array([" Trello", "Jira ", "monday.com", "Asana", "ClickUp"])
+
+    return {
+        "amazon_reviews_cleaned": pd.DataFrame(
+            {
+                "id": np.arange(rows),
+                "productid": rng.choice(products, rows),
+                "userid": rng.choice(products, rows),
+                "score": rng.integers(1, 6, rows),
+                "text": rng.choice(["great product", "bad taste", "ok"], rows),
+            }
+        ),
+        "hr_dashboard_data_cleaned": pd.DataFrame(
+            {
+                "department": rng.choice(departments, small),
+                "productivity_(%)": rng.integers(0, 101, small),
+                "satisfaction_rate_(%)": rng.integers(0, 101, small),
+                "joining_date": pd.to_datetime("2015-01-01")
+                + pd.to_timedelta(rng.integers(0, 3000, small), unit="D"),
+            }
+        ),
+        "project_tools_cleaned": pd.DataFrame(
+            {"final_selected_tool": rng.choice(tools, small)}
+        ),
+        "task_assignment_cleaned": pd.DataFrame(
+            {
+                "category": rng.choice(["dev", "ops", "design", "qa"], small),
+                "skill": rng.choice([f"skill_{i}" for i in range(40)], small),
+            }
+        ),
+        "vmCloud_data_cleaned": pd.DataFrame(
+            {
+                "vm_id": rng.choice([f"vm-{i}" for i in range(1000)], rows),
+                "task_type": rng.choice(task_types, rows),
+                "cpu_usage": rng.random(rows) * 100,
+                "memory_usage": rng.random(rows) * 100,
+                "network_traffic": rng.random(rows) * 1000,
+            }
+        ),
+    }
+
+
+def enrich_two_stages(directory):
+    """Ancien enrich_data : relit les datasets nettoyés et enrichit par `transform`."""
+    amazon_reviews, hr_dashboard, project_tools, task_assignment, vmCloud_data = (
+        load_dataset(directory, name) for name in CLEANED_DATASETS
+    )
+    amazon_reviews["avg_score"] = amazon_reviews.groupby("productid", observed=True)[
+        "score"
+    ].transform("mean")
+    hr_dashboard["avg_productivity"] = hr_dashboard.groupby(
+        "department", observed=True
+    )["productivity_(%)"].transform("mean")
+    hr_dashboard["avg_satisfaction"] = hr_dashboard.groupby(
+        "department", observed=True
+    )["satisfaction_rate_(%)"].transform("mean")
+    project_tools["recent_usage"] = project_tools["final_selected_tool"].apply(
+        lambda x: 1 if x.strip().lower() in ["monday.com", "trello"] else 0
+    )
+    task_assignment["task_load"] = task_assignment.groupby("category", observed=True)[
+        "category"
+    ].transform("count")
+    vmCloud_data["avg_cpu_usage"] = vmCloud_data.groupby("task_type", observed=True)[
+        "cpu_usage"
+    ].transform("mean")
+
+    for df, name in zip(
+        [amazon_reviews, hr_dashboard, project_tools, task_assignment, vmCloud_data],
+        ENRICHED_DATASETS,
+    ):
+        save_dataset(df, directory, name)
+
+
+def timed(func, repeat):
+    """Meilleur temps de `repeat` exécutions (sorties console masquées)."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def compare_outputs(base_dir, fused_dir):
+    """Vérifie que les deux variantes produisent les mêmes datasets."""
+    for name in ENRICHED_DATASETS + SUMMARY_DATASETS:
+        with contextlib.redirect_stdout(io.StringIO()):
+            expected = load_dataset(base_dir, name)
+            result = load_dataset(fused_dir, name)
+        # L'ancienneté dépend de l'heure de calcul
+        pd.testing.assert_frame_equal(
+            expected, result, check_dtype=False, check_categorical=False, rtol=1e-6
+        )
+
+
+def main(rows, repeat):
+    work_dir = tempfile.mkdtemp(prefix="bench_enrich_summary_")
+    # Schémas et historique mémoire du benchmark hors du répertoire data/
+    dtypes.SCHEMA_DIR = os.path.join(work_dir, "schemas")
+    dtypes.MEMORY_LOG_PATH = os.path.join(work_dir, "memory_usage.csv")
+    try:
+        base_dir = os.path.join(work_dir, "two_stages")
+        fused_dir = os.path.join(work_dir, "fused")
+        for name, df in make_cleaned_datasets(rows).items():
+            save_dataset(df, base_dir, name)
+            save_dataset(df, fused_dir, name)
+
+        def two_stages():
+            enrich_two_stages(base_dir)
+            feature_engineering.feature_engineering(base_dir)
+
+        base_time = timed(two_stages, repeat)
+        fused_time = timed(lambda: enrich_and_summarize(fused_dir, fused_dir), repeat)
+        compare_outputs(base_dir, fused_dir)
+
+        print(f"Lignes (avis, vmCloud) : {rows}")
+        print(f"Deux étapes        : {base_time:.2f} s")
+        print(f"Étape fusionnée    : {fused_time:.2f} s")
+        print(f"Gain               : {100 * (1 - fused_time / base_time):.0f} %")
+        print("Résultats identiques.")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Benchmark de l'enrichissement et des résumés fusionnés."
+    )
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    main(args.rows, args.repeat)
@@ -0,0 +1,115 @@
+import io
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+import contextlib
+import numpy as np
+import pandas as pd
+
+# Gestion dynamique des chemins : ROOT_DIR = racine du projet
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if __package__ in (None, ""):
+    # Lancé comme script : la racine du projet n'est pas encore dans sys.path
+    sys.path.append(ROOT_DIR)
+
+from src.utils.tool_index import ToolIndex, build_tool_index
+
+# Benchmark : latence d'une recommandation d'outils (un rôle, top-n) selon la taille
+# du catalogue, pour le calcul exhaustif (similarités avec tous les outils puis tri
+# complet, comme l'ancien recommend_tools_for_role), le produit par blocs avec
+# sélection partielle (ToolIndex.top_n) et les listes inversées (ToolIndex.search).
+# Les trois classements sont comparés.
+#
+#   python src/benchmarks/bench_tool_retrieval.py --tools 1000 10000 50000
+
+
+def make_descriptions(count, words, rng, min_words, max_words):
+    """Textes synthétiques : mots tirés selon une loi de Zipf (comme un vrai corpus)."""
+    probabilities = 1 / np.arange(1, len(words) + 1) ** 1.1
+    probabilities /= probabilities.sum()
+    lengths = rng.integers(min_words, max_words + 1, count)
+    drawn = rng.choice(words, lengths.sum(), p=probabilities)
+    return [" ".join(text) for text in np.split(drawn, np.cumsum(lengths)[:-1])]
+
+
+def exhaustive(index, vectors, top_n):
+    """Ancien calcul : similarités avec tous les outils puis tri complet."""
+    results = []
+    for row in range(vectors.shape[0]):
+        similarities = index.similarities(vectors[row]).flatten()
+        top_indices = similarities.argsort(kind="stable")[::-1][:top_n]
+        results.append((top_indices, similarities[top_indices]))
+    return results
+
+
+def per_query(method, vectors, top_n):
+    """Appelle `method` requête par requête (une recommandation à la fois)."""
+    results = []
+    for row in range(vectors.shape[0]):
+        _, positions, scores = method(vectors[row], top_n=top_n)
+        results.append((positions, scores))
+    return results
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return time.perf_counter() - start, result
+
+
+def main(tool_counts, queries, top_n, vocabulary, seed=0):
+    rng = np.random.default_rng(seed)
+    words = np.array([f"term{i}" for i in range(vocabulary)])
+    work_dir = tempfile.mkdtemp(prefix="bench_tool_retrieval_")
+    try:
+        print(
+            f"{'outils':>8}  {'exhaustif':>10}  {'blocs':>10}  {'inversé':>10}  (ms/requête)"
+        )
+        for count in tool_counts:
+            tools_df = pd.DataFrame(
+                {
+                    "tool_name": [f"tool_{i}" for i in range(count)],
+                    "tool_description": make_descriptions(count, words, rng, 20, 60),
+                }
+            )
+            index_dir = os.path.join(work_dir, f"index_{count}")
+            with contextlib.redirect_stdout(io.StringIO()):
+                build_tool_index(tools_df, index_dir, source_digest=str(count))
+            index = ToolIndex(index_dir)
+            vectors = index.transform(make_descriptions(queries, words, rng, 5, 15))
+
+            base_time, expected = timed(lambda: exhaustive(index, vectors, top_n))
+            block_time, blocks = timed(lambda: per_query(index.top_n, vectors, top_n))
+            search_time, found = timed(lambda: per_query(index.search, vectors, top_n))
+            for results in (blocks, found):
+                for (positions, scores), (ref_positions, ref_scores) in zip(
+                    results, expected
+                ):
+                    if not np.array_equal(positions, ref_positions):
+                        raise ValueError(f"Classements différents ({count} outils)")
+                    if not np.allclose(scores, ref_scores, rtol=0, atol=1e-12):
+                        raise ValueError(f"Similarités différentes ({count} outils)")
+
+            per_ms = 1000 / queries
+            print(
+                f"{count:>8}  {base_time * per_ms:>10.2f}  {block_time * per_ms:>10.2f}"
+                f"  {search_time * per_ms:>10.2f}"
+            )
+        print("Classements identiques.")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Benchmark de la recherche des meilleurs outils par rôle."
+    )
+    parser.add_argument("--tools", type=int, nargs="+", default=[1_000, 10_000, 50_000])
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--top-n", type=int, default=10)
+    parser.add_argument("--vocabulary", type=int, default=20_000)
+    args = parser.parse_args()
+    main(args.tools, args.queries, args.top_n, args.vocabulary)
@@ -4,7 +4,9 @@ import pandas as pd
 
 # Gestion dynamique des chemins : ROOT_DIR = racine du projet
 ROOT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-sys.path.append(ROOT_DIR)
+if __package__ in (None, ""):
+    # Lancé comme script : la racine du projet n'est pas encore dans sys.path
+    sys.path.append(ROOT_DIR)
 
 # Import des chemins définis dans paths.py
 from paths import PROCESSED_DATA_DIR, CLEANED_DATA_DIR
@@ -0,0 +1,409 @@
+import os
+import sys
+import time
+import argparse
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+# Gestion dynamique des chemins : ROOT_DIR = racine du projet
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if __package__ in (None, ""):
+    # Lancé comme script : la racine du projet n'est pas encore dans sys.path
+    sys.path.append(ROOT_DIR)
+
+# Import des chemins définis dans paths.py
+from paths import (
+    PROCESSED_DATA_DIR,
+    CLEANED_DATA_DIR,
+    OUTPUT_DIR,
+    RECOMMENDATION_RESULTS_DIR,
+)
+from src.utils.storage import (
+    STORAGES,
+    copy_dataset,
+    find_dataset,
+    open_table_writer,
+    enable_shared_frames,
+    disable_shared_frames,
+    retain_frames,
+)
+
+# --- Lanceur du pipeline ---
+#
+# Les étapes et leurs dépendances forment un graphe orienté sans cycle. Les étapes
+# dont les dépendances sont terminées tournent en parallèle dans des threads du même
+# processus : les DataFrames enregistrés par une étape sont transmis en mémoire aux
+# suivantes (voir storage.enable_shared_frames) au lieu d'être relus sur le disque.
+# Chaque étape garde son cache incrémental (build_cache) et peut toujours être lancée
+# seule avec son script. L'enrichissement et les résumés passent par l'étape fusionnée
+# enrich_and_summarize (une seule lecture des données nettoyées).
+
+# Nombre d'étapes exécutées en même temps
+DEFAULT_JOBS = 4
+
+# Les étapes ne lisent pas toutes dans le répertoire où la précédente écrit
+# (nettoyage -> data/processed, enrichissement et résumés -> data/clean, analyses ->
+# data/processed) : les étapes de publication font les copies correspondantes.
+PUBLISHED_CLEANED = [
+    ("amazon_reviews_cleaned", "amazon_reviews_cleaned"),
+    ("hr_dashboard_data_cleaned", "hr_dashboard_data_cleaned"),
+    ("project_tools_cleaned", "project_tools_cleaned"),
+    ("task_assignment_cleaned", "task_assignment_cleaned"),
+    ("cloud_metrics_cleaned", "vmCloud_data_cleaned"),
+]
+PUBLISHED_ENRICHED = [
+    "amazon_reviews_enriched",
+    "hr_dashboard_enriched",
+    "project_tools_enriched",
+    "task_assignment_enriched",
+    "vmCloud_enriched",
+]
+PUBLISHED_SUMMARIES = [
+    "amazon_reviews_summary",
+    "hr_dashboard_summary",
+    "project_tools_summary",
+    "task_assignment_summary",
+    "vmcloud_summary",
+]
+
+
+class Stage:
+    """
+    Étape du pipeline.
+    :param func: Fonction appelée avec les options de la ligne de commande.
+    :param deps: Noms des étapes qui doivent être terminées avant celle-ci.
+    :param reads: Datasets lus, sous la forme (répertoire, nom) ; sert à libérer les
+        DataFrames partagés que plus aucune étape ne lira.
+    """
+
+    def __init__(self, name, func, deps=(), reads=()):
+        self.name = name
+        self.func = func
+        self.deps = list(deps)
+        self.reads = list(reads)
+
+
+def _dataset_files(directory, name):
+    """Fichiers possibles d'un dataset, quel que soit son format."""
+    return [os.path.join(directory, name + s.extension) for s in STORAGES.values()]
+
+
+def publish(pairs, source_dir, target_dir):
+    """Copie les datasets `pairs` (nom source, nom cible) d'un répertoire à l'autre."""
+    for source_name, target_name in pairs:
+        target = copy_dataset(source_dir, source_name, target_dir, target_name)
+        print(f"Publié : {target}")
+
+
+# --- Étapes ---
+#
+# Les modules des étapes sont importés au moment de l'exécution, dans le processus
+# qui exécute l'étape ; leur import ne lit aucune donnée (voir
+# src/benchmarks/bench_cold_start.py).
+
+
+def run_explore(options):
+    from src.preprocesing import load_and_explore
+
+    load_and_explore.main()
+
+
+def run_clean(options):
+    from src.preprocesing import clean_data
+
+    results = clean_data.main(workers=options.workers, force=options.force)
+    failed = [name for name, result in results.items() if "error" in result]
+    if failed:
+        raise RuntimeError(f"Nettoyage en échec pour : {', '.join(failed)}")
+
+
+def run_publish_cleaned(options):
+    publish(PUBLISHED_CLEANED, PROCESSED_DATA_DIR, CLEANED_DATA_DIR)
+
+
+def run_enrich_summary(options):
+    from src.preprocesing import enrich_and_summarize
+
+    enrich_and_summarize.run(force=options.force)
+
+
+def run_rolling_features(options):
+    from src.preprocesing import rolling_features
+
+    rolling_features.run(force=options.force)
+
+
+def run_publish_enriched(options):
+    from src.preprocesing import enrich_and_summarize
+
+    # Un dataset enrichi dont des lots ont été intégrés par fold_batch n'est pas à
+    # jour sur le disque : il est réécrit à partir de l'état d'agrégation
+    folded = {}
+    for name, spec in enrich_and_summarize.INCREMENTAL_SUMMARIES.items():
+        if enrich_and_summarize.pending_batches(name, CLEANED_DATA_DIR):
+            folded[spec["enriched"]] = name
+    pairs = [(name, name) for name in PUBLISHED_ENRICHED if name not in folded]
+    publish(pairs, CLEANED_DATA_DIR, PROCESSED_DATA_DIR)
+
+    for enriched_name, name in folded.items():
+        target = os.path.join(
+            PROCESSED_DATA_DIR,
+            os.path.basename(find_dataset(CLEANED_DATA_DIR, enriched_name)),
+        )
+        writer = open_table_writer(target)
+        try:
+            for chunk in enrich_and_summarize.iter_enriched(name, CLEANED_DATA_DIR):
+                writer.write(chunk)
+        finally:
+            writer.close()
+        print(f"Publié (lots intégrés) : {target}")
+
+
+def run_publish_summaries(options):
+    pairs = [(name, name) for name in PUBLISHED_SUMMARIES]
+    publish(pairs, CLEANED_DATA_DIR, PROCESSED_DATA_DIR)
+
+
+def run_sentiments(options):
+    from src.analysis import sentiment_analysis
+
+    sentiment_analysis.run(force=options.force, workers=options.workers)
+
+
+def run_recommendations(options):
+    from src.analysis import recommendation_engine
+
+    recommendation_engine.run(force=options.force)
+
+
+def run_performance(options):
+    from src.analysis import cloud_performance_analysis
+
+    cloud_performance_analysis.run(force=options.force)
+
+
+def run_tool_index(options):
+    from src.utils.tool_index import load_tool_index
+
+    load_tool_index(force=options.force)
+
+
+def run_saas(options):
+    from src.analysis import SaaS_recommendation
+
+    SaaS_recommendation.run()
+
+
+STAGES = [
+    Stage("explore", run_explore),
+    Stage("clean", run_clean),
+    Stage(
+        "publish_cleaned",
+        run_publish_cleaned,
+        deps=["clean"],
+        reads=[(PROCESSED_DATA_DIR, source) for source, _ in PUBLISHED_CLEANED],
+    ),
+    Stage(
+        "enrich_summary",
+        run_enrich_summary,
+        deps=["publish_cleaned"],
+        reads=[(CLEANED_DATA_DIR, target) for _, target in PUBLISHED_CLEANED],
+    ),
+    Stage(
+        "rolling_features",
+        run_rolling_features,
+        deps=["publish_cleaned"],
+        reads=[(CLEANED_DATA_DIR, "vmCloud_data_cleaned")],
+    ),
+    Stage(
+        "publish_enriched",
+        run_publish_enriched,
+        deps=["enrich_summary"],
+        reads=[(CLEANED_DATA_DIR, name) for name in PUBLISHED_ENRICHED],
+    ),
+    Stage(
+        "publish_summaries",
+        run_publish_summaries,
+        deps=["enrich_summary"],
+        reads=[(CLEANED_DATA_DIR, name) for name in PUBLISHED_SUMMARIES],
+    ),
+    Stage(
+        "sentiments",
+        run_sentiments,
+        deps=["publish_summaries"],
+        reads=[(PROCESSED_DATA_DIR, "amazon_reviews_summary")],
+    ),
+    Stage(
+        "recommendations",
+        run_recommendations,
+        deps=["sentiments"],
+        reads=[(OUTPUT_DIR, "amazon_reviews_sentiments")],
+    ),
+    Stage(
+        "performance",
+        run_performance,
+        deps=["recommendations", "publish_enriched"],
+        reads=[
+            (PROCESSED_DATA_DIR, "vmCloud_enriched"),
+            (RECOMMENDATION_RESULTS_DIR, "recommended_products"),
+        ],
+    ),
+    Stage(
+        "tool_index",
+        run_tool_index,
+        deps=["publish_summaries"],
+        reads=[(PROCESSED_DATA_DIR, "project_tools_summary")],
+    ),
+    Stage(
+        "saas",
+        run_saas,
+        deps=["publish_summaries", "tool_index"],
+        reads=[(PROCESSED_DATA_DIR, "task_assignment_summary")],
+    ),
+]
+
+
+def select_stages(stages, targets=None):
+    """
+    Étapes nécessaires pour produire `targets` (toutes par défaut), dépendances
+    comprises, dans l'ordre de déclaration.
+    """
+    by_name = {stage.name: stage for stage in stages}
+    if not targets:
+        return list(stages)
+    unknown = [name for name in targets if name not in by_name]
+    if unknown:
+        raise ValueError(
+            f"Étapes inconnues : {unknown} (disponibles : {list(by_name)})"
+        )
+
+    selected = set()
+    pending = list(targets)
+    while pending:
+        name = pending.pop()
+        if name not in selected:
+            selected.add(name)
+            pending.extend(by_name[name].deps)
+    return [stage for stage in stages if stage.name in selected]
+
+
+def run_pipeline(stages, options, jobs=DEFAULT_JOBS):
+    """
+    Exécute les étapes en respectant leurs dépendances, jusqu'à `jobs` à la fois.
+    Une étape en échec n'arrête que les étapes qui en dépendent.
+    :return: Dictionnaire nom -> {"status": "ok" | "error" | "skipped", "seconds": ...}.
+    """
+    names = {stage.name for stage in stages}
+    for stage in stages:
+        missing = [dep for dep in stage.deps if dep not in names]
+        if missing:
+            raise ValueError(f"Dépendances absentes pour {stage.name} : {missing}")
+
+    results = {}
+    pending = list(stages)
+    running = {}
+
+    enable_shared_frames()
+    try:
+        with ThreadPoolExecutor(max_workers=jobs) as executor:
+            while pending or running:
+                for stage in list(pending):
+                    statuses = [
+                        results.get(dep, {}).get("status") for dep in stage.deps
+                    ]
+                    if any(status in ("error", "skipped") for status in statuses):
+                        print(f"[pipeline] {stage.name} sautée (dépendance en échec)")
+                        results[stage.name] = {"status": "skipped", "seconds": 0.0}
+                        pending.remove(stage)
+                    elif all(status == "ok" for status in statuses):
+                        print(f"[pipeline] Début de {stage.name}")
+                        future = executor.submit(_timed, stage.func, options)
+                        running[future] = stage
+                        pending.remove(stage)
+                if not running:
+                    if pending:
+                        blocked = [stage.name for stage in pending]
+                        raise ValueError(f"Dépendances circulaires : {blocked}")
+                    continue
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    stage = running.pop(future)
+                    status, seconds, error = future.result()
+                    results[stage.name] = {"status": status, "seconds": seconds}
+                    if error is not None:
+                        print(f"[pipeline] Erreur dans {stage.name} : {error}")
+                    print(f"[pipeline] Fin de {stage.name} ({seconds:.2f} s)")
+
+                # Ne garder en mémoire que les DataFrames encore attendus
+                still_read = [
+                    path
+                    for stage in pending + list(running.values())
+                    for directory, name in stage.reads
+                    for path in _dataset_files(directory, name)
+                ]
+                retain_frames(still_read)
+    finally:
+        disable_shared_frames()
+    return results
+
+
+def _timed(func, options):
+    start = time.perf_counter()
+    try:
+        func(options)
+    except Exception as e:
+        return "error", time.perf_counter() - start, f"{type(e).__name__}: {e}"
+    return "ok", time.perf_counter() - start, None
+
+
+def print_report(results, total_seconds):
+    """Affiche le temps passé dans chaque étape."""
+    print("\n### Temps par étape ###")
+    width = max(len(name) for name in results)
+    for name, result in results.items():
+        print(f"{name:<{width}}  {result['status']:<7}  {result['seconds']:8.2f} s")
+    print(f"{'total':<{width}}  {'':<7}  {total_seconds:8.2f} s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Exécution du pipeline complet.")
+    parser.add_argument(
+        "stages",
+        nargs="*",
+        help="Étapes à produire (avec leurs dépendances) ; toutes par défaut",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=DEFAULT_JOBS,
+        help="Nombre d'étapes exécutées en même temps",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Nombre de processus (nettoyage des sources, textes des avis)",
+    )
+    parser.add_argument(
+        "--force", action="store_true", help="Ignorer le cache incrémental"
+    )
+    parser.add_argument(
+        "--list", action="store_true", help="Afficher les étapes et leurs dépendances"
+    )
+    args = parser.parse_args()
+
+    if args.list:
+        for stage in STAGES:
+            print(f"{stage.name}: {', '.join(stage.deps) or '-'}")
+        sys.exit(0)
+
+    # Les processus de nettoyage sont créés pendant que d'autres étapes tournent dans
+    # des threads : « forkserver » évite de dupliquer un processus multi-thread
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        multiprocessing.set_start_method("forkserver")
+
+    start = time.perf_counter()
+    results = run_pipeline(select_stages(STAGES, args.stages), args, jobs=args.jobs)
+    print_report(results, time.perf_counter() - start)
+    sys.exit(0 if all(r["status"] == "ok" for r in results.values()) else 1)
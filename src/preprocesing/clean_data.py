@@ -1,12 +1,16 @@
 import os
 import sys
+import argparse
 import pandas as pd
-import sqlite3
 import numpy as np
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from concurrent.futures.process import BrokenProcessPool
 
 # Gestion dynamique des chemins : ROOT_DIR = racine du projet
 ROOT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-sys.path.append(ROOT_DIR)
+if __package__ in (None, ""):
+    # Lancé comme script : la racine du projet n'est pas encore dans sys.path
+    sys.path.append(ROOT_DIR)
 
 # Import des chemins définis dans paths.py
 from paths import (
@@ -14,6 +18,16 @@ from paths import (
     PROCESSED_DATA_DIR,
     CLEANED_DATA_DIR,
 )
+from src.preprocesing.type_inference import resolve_schema, apply_schema
+from src.utils.storage import (
+    dataset_path,
+    write_table,
+    open_table_writer,
+    share_frame,
+)
+from src.utils.build_cache import BuildCache, COMMON_CODE_FILES
+from src.utils.sqlite_source import iter_table, PAGE_SIZE
+from src.utils.dtypes import compact_dtypes
 
 # Fichiers à nettoyer
 files_to_clean = {
@@ -28,21 +42,30 @@ files_to_clean = {
 }
 
 
+# Seuils de nettoyage (partagés entre le mode en mémoire et le mode streaming) :
+# colonnes avec plus de 40% et lignes avec plus de 50% de valeurs manquantes
+MISSING_THRESHOLD = 0.4
+ROW_MISSING_THRESHOLD = 0.5
+
+# Mode streaming : taille des blocs lus et taille de fichier à partir de laquelle il est activé
+CHUNK_SIZE = 100_000
+STREAMING_THRESHOLD_BYTES = 100 * 1024 * 1024
+
+
 # Fonction de nettoyage général
-def clean_data(df):
-    """Nettoie un DataFrame selon les étapes standard."""
+def clean_data(df, source_path=None):
+    """
+    Nettoie un DataFrame selon les étapes standard.
+    :param source_path: Fichier d'origine, utilisé pour mettre en cache le schéma inféré.
+    """
     # 1. Supprimer les doublons
     df = df.drop_duplicates()
 
     # 2. Supprimer les colonnes ou lignes avec trop de valeurs manquantes
-    missing_threshold = (
-        0.4  # Supprimer les colonnes avec plus de 40% de valeurs manquantes
-    )
-    df = df.loc[:, df.isnull().mean() < missing_threshold]
+    df = df.loc[:, df.isnull().mean() < MISSING_THRESHOLD]
 
     # Supprimer les lignes avec plus de 50% de données manquantes
-    row_missing_threshold = 0.5
-    df = df[df.isnull().mean(axis=1) < row_missing_threshold]
+    df = df[df.isnull().mean(axis=1) < ROW_MISSING_THRESHOLD]
 
     # 3. Imputer les valeurs manquantes pour les colonnes restantes
     for col in df.select_dtypes(include=["float", "int"]).columns:
@@ -52,85 +75,536 @@ def clean_data(df):
         df[col] = df[col].fillna("Inconnu")  # Remplacer NaN par "Inconnu"
 
     # 4. Standardiser les noms des colonnes
-    df.columns = [col.strip().lower().replace(" ", "_") for col in df.columns]
-
-    # 5. Gestion des colonnes contenant des timestamps Unix et conversion en dates
-    for col in df.columns:
-        if df[col].dtype in [
-            "int64",
-            "float64",
-        ]:  # Vérifier si la colonne est numérique
-            # Vérifier si la colonne semble contenir un timestamp Unix valide
-            if (
-                df[col].max() > 1000000000
-            ):  # Valeur typique pour un timestamp Unix valide
-                try:
-                    # Convertir le timestamp Unix en date
-                    df[col] = pd.to_datetime(df[col], unit="s", errors="coerce")
-                    # Gérer les dates incohérentes (comme 1970-01-01)
-                    df[col] = df[col].apply(lambda x: np.nan if x.year == 1970 else x)
-                except Exception:
-                    pass  # Si la conversion échoue, on laisse les valeurs inchangées
-
-    # 6. Corriger les types de données (par exemple, convertir les dates)
-    for col in df.columns:
-        if "date" in col or "time" in col:
-            try:
-                df[col] = pd.to_datetime(df[col], errors="coerce")
-                # Gérer les dates incohérentes (comme 1970-01-01)
-                df[col] = df[col].apply(lambda x: np.nan if x.year == 1970 else x)
-            except Exception:
-                pass  # Ignorer si la conversion échoue
-
-    # 7. Gestion spéciale de la colonne `execution_time`
-    if "execution_time" in df.columns:
-        # Essayer de convertir `execution_time` en datetime
-        df["execution_time"] = pd.to_datetime(df["execution_time"], errors="coerce")
-        # Remplacer les dates invalides par NaT
-        df["execution_time"] = df["execution_time"].apply(
-            lambda x: np.nan if pd.isna(x) else x
+    df.columns = [standardize_column_name(col) for col in df.columns]
+
+    # 5 à 7. Conversion des timestamps et des dates
+    return convert_dates(df, source_path=source_path)
+
+
+def standardize_column_name(col):
+    """Normalise un nom de colonne (minuscules, espaces remplacés par des '_')."""
+    return col.strip().lower().replace(" ", "_")
+
+
+def convert_dates(df, timestamp_columns=None, source_path=None):
+    """
+    Convertit les timestamps Unix et les colonnes de dates (étapes 5 à 7 du nettoyage).
+    Le type de chaque colonne est décidé par `type_inference` puis chaque colonne est
+    convertie d'un bloc, valeurs 1970-01-01 comprises.
+    :param timestamp_columns: Colonnes numériques à traiter comme timestamps Unix. Par
+        défaut, elles sont détectées sur `df` ; le mode streaming fournit la liste
+        calculée sur le fichier entier pour que tous les blocs soient traités pareil.
+    :param source_path: Fichier source ; permet de réutiliser le schéma mis en cache.
+    """
+    schema = resolve_schema(
+        df, source_path=source_path, timestamp_columns=timestamp_columns
+    )
+    return apply_schema(df, schema)
+
+
+# --- Nettoyage en streaming (fichiers trop gros pour tenir en mémoire) ---
+#
+# Les seuils de suppression et l'imputation par la moyenne dépendent de statistiques
+# globales : une première passe les calcule bloc par bloc, une seconde relit la source
+# et applique le nettoyage en écrivant le résultat au fur et à mesure.
+
+
+def _column_kind(series):
+    """Type logique d'une colonne lue par read_csv : bool, int, float ou object."""
+    if pd.api.types.is_bool_dtype(series):
+        return "bool"
+    if pd.api.types.is_integer_dtype(series):
+        return "int"
+    if pd.api.types.is_float_dtype(series):
+        return "float"
+    return "object"
+
+
+def _merge_kinds(kind_a, kind_b):
+    """Type commun de deux blocs d'une même colonne (comme le ferait read_csv en une fois)."""
+    if kind_a is None or kind_a == kind_b:
+        return kind_b
+    if {kind_a, kind_b} == {"int", "float"}:
+        return "float"
+    return "object"
+
+
+class _DuplicateFilter:
+    """Reproduit `drop_duplicates` bloc par bloc en mémorisant le hash des lignes déjà vues."""
+
+    def __init__(self):
+        self.seen = set()  # Hash des lignes conservées
+
+    def __call__(self, chunk):
+        # Les numériques sont ramenés en float64 pour qu'un même contenu ait le même
+        # hash, que read_csv ait inféré int64 ou float64 pour le bloc
+        normalized = pd.DataFrame(
+            {
+                i: (
+                    chunk.iloc[:, i].astype("float64")
+                    if _column_kind(chunk.iloc[:, i]) in ("int", "float")
+                    else chunk.iloc[:, i]
+                )
+                for i in range(chunk.shape[1])
+            }
         )
+        hashes = pd.util.hash_pandas_object(normalized, index=False).to_numpy()
+
+        keep = ~pd.Series(hashes).duplicated().to_numpy()
+        if self.seen:
+            # Recherche dans l'ensemble : coût proportionnel au bloc, pas au fichier
+            keep &= ~np.fromiter(
+                map(self.seen.__contains__, hashes.tolist()), bool, len(hashes)
+            )
+        self.seen.update(hashes[keep].tolist())
+        return chunk[keep]
+
 
-    return df
+def collect_cleaning_stats(chunks):
+    """
+    Première passe du mode streaming : calcule les statistiques globales de clean_data.
+    Les lignes sont regroupées par motif de valeurs manquantes ; chaque motif garde son
+    nombre de lignes et les sommes, effectifs et maximums des colonnes numériques. On en
+    déduit ensuite exactement les colonnes et lignes conservées et les moyennes.
+    :param chunks: Itérable de DataFrames (les blocs de la source).
+    :return: Dictionnaire des statistiques attendu par `apply_cleaning_stats`.
+    """
+    drop_duplicates = _DuplicateFilter()
+    columns = None
+    kinds = {}
+    patterns = {}
+
+    for chunk in chunks:
+        if columns is None:
+            columns = list(chunk.columns)
+        for col in columns:
+            kinds[col] = _merge_kinds(kinds.get(col), _column_kind(chunk[col]))
+
+        chunk = drop_duplicates(chunk)
+        if chunk.empty:
+            continue
+
+        # Regroupement des lignes par motif de valeurs manquantes
+        nulls = chunk.isnull().to_numpy()
+        keys, inverse = np.unique(
+            np.packbits(nulls, axis=1), axis=0, return_inverse=True
+        )
+        inverse = inverse.ravel()
+
+        numeric = [
+            i
+            for i, col in enumerate(columns)
+            if _column_kind(chunk[col]) in ("int", "float")
+        ]
+        values = pd.DataFrame(
+            chunk.iloc[:, numeric].to_numpy(dtype="float64"), columns=numeric
+        ).groupby(inverse)
+        sums, counts, maxima = values.sum(), values.count(), values.max()
+        sizes = np.bincount(inverse, minlength=len(keys))
+
+        for k, key in enumerate(keys):
+            stats = patterns.setdefault(
+                key.tobytes(),
+                {
+                    "nulls": np.unpackbits(key)[: len(columns)].astype(bool),
+                    "rows": 0,
+                    "sum": np.zeros(len(columns)),
+                    "count": np.zeros(len(columns)),
+                    "max": np.full(len(columns), -np.inf),
+                },
+            )
+            stats["rows"] += sizes[k]
+            stats["sum"][numeric] += sums.loc[k].to_numpy()
+            stats["count"][numeric] += counts.loc[k].to_numpy()
+            stats["max"][numeric] = np.fmax(
+                stats["max"][numeric], maxima.loc[k].to_numpy()
+            )
+
+    if columns is None:
+        raise ValueError("La source ne contient aucune donnée.")
+
+    # 2. Colonnes conservées (part de valeurs manquantes après dédoublonnage)
+    total_rows = sum(stats["rows"] for stats in patterns.values())
+    null_counts = sum(
+        (stats["nulls"] * stats["rows"] for stats in patterns.values()),
+        np.zeros(len(columns)),
+    )
+    kept = (
+        null_counts / total_rows < MISSING_THRESHOLD
+        if total_rows
+        else np.zeros(len(columns), dtype=bool)
+    )
+
+    # Lignes conservées : motifs dont la part de manquants (colonnes gardées) est < 50%
+    sums = np.zeros(len(columns))
+    counts = np.zeros(len(columns))
+    maxima = np.full(len(columns), -np.inf)
+    for stats in patterns.values():
+        if kept.any() and stats["nulls"][kept].mean() < ROW_MISSING_THRESHOLD:
+            sums += stats["sum"]
+            counts += stats["count"]
+            maxima = np.fmax(maxima, stats["max"])
+
+    # 3. Moyennes d'imputation et colonnes timestamp (étape 5) sur les lignes conservées
+    kept_columns = [col for col, keep in zip(columns, kept) if keep]
+    means = {}
+    timestamp_columns = set()
+    for i, col in enumerate(columns):
+        if kept[i] and kinds[col] in ("int", "float"):
+            means[col] = sums[i] / counts[i] if counts[i] else np.nan
+            if maxima[i] > 1000000000:
+                timestamp_columns.add(standardize_column_name(col))
+
+    return {
+        "kept_columns": kept_columns,
+        "kinds": {col: kinds[col] for col in kept_columns},
+        "means": means,
+        "timestamp_columns": timestamp_columns,
+    }
+
+
+def apply_cleaning_stats(chunk, stats, drop_duplicates, source_path=None):
+    """
+    Seconde passe du mode streaming : nettoie un bloc avec les statistiques globales.
+    :param drop_duplicates: `_DuplicateFilter` partagé par tous les blocs de la source.
+    :param source_path: Fichier d'origine, utilisé pour mettre en cache le schéma inféré.
+    """
+    # 1. Supprimer les doublons (y compris ceux vus dans les blocs précédents)
+    chunk = drop_duplicates(chunk)
+
+    # 2. Colonnes et lignes avec trop de valeurs manquantes
+    chunk = chunk.loc[:, stats["kept_columns"]]
+    chunk = chunk[chunk.isnull().mean(axis=1) < ROW_MISSING_THRESHOLD].copy()
+
+    # Aligner le type de chaque colonne sur celui du fichier entier
+    for col, kind in stats["kinds"].items():
+        if kind == "float" and _column_kind(chunk[col]) != "float":
+            chunk[col] = chunk[col].astype("float64")
+        elif kind == "object" and _column_kind(chunk[col]) != "object":
+            chunk[col] = chunk[col].astype(object)
+
+    # 3. Imputer avec les moyennes globales
+    for col, mean in stats["means"].items():
+        chunk[col] = chunk[col].fillna(mean)
+
+    for col in chunk.select_dtypes(include=["object"]).columns:
+        chunk[col] = chunk[col].fillna("Inconnu")
+
+    # 4. Standardiser les noms des colonnes
+    chunk.columns = [standardize_column_name(col) for col in chunk.columns]
+
+    # 5 à 7. Conversion des dates : le schéma est résolu sur le premier bloc puis
+    # réutilisé, avec les colonnes timestamp calculées sur le fichier entier
+    if "schema" not in stats:
+        stats["schema"] = resolve_schema(
+            chunk,
+            source_path=source_path,
+            timestamp_columns=stats["timestamp_columns"],
+        )
+    return apply_schema(chunk, stats["schema"])
+
+
+def clean_chunks(make_chunks, output_path, source_path=None):
+    """
+    Nettoie une source lue par blocs et écrit le résultat au fil de l'eau.
+    La mémoire utilisée est bornée par la taille d'un bloc (plus un hash par ligne).
+    :param make_chunks: Fonction sans argument renvoyant un nouvel itérable de blocs
+        (appelée une fois par passe).
+    :param output_path: Fichier de sortie (CSV ou Parquet selon l'extension).
+    :param source_path: Fichier d'origine, utilisé pour mettre en cache le schéma inféré.
+    """
+    stats = collect_cleaning_stats(make_chunks())
+
+    drop_duplicates = _DuplicateFilter()
+    writer = open_table_writer(output_path)
+    first = True
+    try:
+        for chunk in make_chunks():
+            chunk_cleaned = apply_cleaning_stats(
+                chunk, stats, drop_duplicates, source_path=source_path
+            )
+            if first or not chunk_cleaned.empty:
+                writer.write(chunk_cleaned)
+                first = False
+    finally:
+        writer.close()
+
+
+def clean_csv_chunked(file_path, output_path, chunksize=CHUNK_SIZE):
+    """Nettoie un fichier CSV en streaming (même résultat que clean_data en mémoire)."""
+    clean_chunks(
+        lambda: pd.read_csv(file_path, chunksize=chunksize),
+        output_path,
+        source_path=file_path,
+    )
 
 
 # Fonction pour nettoyer un fichier SQLite
 def clean_sqlite(file_path, table_name, output_path):
     """Nettoie une table dans une base SQLite et enregistre le résultat."""
     try:
-        print(f"Nettoyage de la table {table_name} dans {file_path}...")
-        conn = sqlite3.connect(file_path)
-        df = pd.read_sql_query(f"SELECT * FROM {table_name}", conn)
-        conn.close()
-
-        df_cleaned = clean_data(df)
-
-        os.makedirs(os.path.dirname(output_path), exist_ok=True)
-        df_cleaned.to_csv(output_path, index=False)
-        print(f"Table nettoyée enregistrée : {output_path}")
+        clean_sqlite_table(file_path, table_name, output_path)
     except Exception as e:
         print(f"Erreur lors du nettoyage de {file_path}: {e}")
 
 
+def clean_sqlite_table(
+    file_path, table_name, output_path, page_size=PAGE_SIZE, columns=None
+):
+    """
+    Comme clean_sqlite, mais laisse remonter les erreurs.
+    La table est lue par pages (pagination sur le rowid) et nettoyée bloc par bloc,
+    sans jamais être chargée entièrement en mémoire.
+    :param columns: Colonnes à lire (toutes par défaut).
+    """
+    print(f"Nettoyage de la table {table_name} dans {file_path}...")
+    clean_chunks(
+        lambda: iter_table(file_path, table_name, page_size=page_size, columns=columns),
+        output_path,
+        source_path=file_path,
+    )
+    print(f"Table nettoyée enregistrée : {output_path}")
+
+
+def source_output_path(name):
+    """Fichier de sortie d'une source de `files_to_clean`."""
+    if name == "amazon_reviews_db":  # La base SQLite produit les mêmes avis nettoyés
+        return dataset_path(PROCESSED_DATA_DIR, "amazon_reviews_cleaned")
+    return dataset_path(PROCESSED_DATA_DIR, f"{name}_cleaned")
+
+
+def clean_source(name, file_path, streaming=None, chunksize=CHUNK_SIZE):
+    """
+    Nettoie une source de `files_to_clean` et renvoie le chemin du fichier produit.
+    Les erreurs sont propagées à l'appelant.
+    """
+    output_path = source_output_path(name)
+    if name == "amazon_reviews_db":  # Cas particulier pour la base SQLite
+        clean_sqlite_table(file_path, "Reviews", output_path)
+        return output_path
+
+    print(f"Traitement de {file_path}...")
+    use_streaming = streaming
+    if use_streaming is None:
+        use_streaming = os.path.getsize(file_path) > STREAMING_THRESHOLD_BYTES
+
+    if use_streaming:
+        clean_csv_chunked(file_path, output_path, chunksize=chunksize)
+    else:
+        df = pd.read_csv(file_path)
+        df_cleaned = clean_data(df, source_path=file_path)
+        # En streaming, les types varient d'un bloc à l'autre : le compactage se
+        # fait alors à la lecture du fichier produit
+        df_cleaned = compact_dtypes(df_cleaned, name=os.path.basename(output_path))
+        write_table(df_cleaned, output_path)
+        share_frame(output_path, df_cleaned)
+    print(f"Fichier nettoyé enregistré : {output_path}")
+    return output_path
+
+
+# --- Nettoyage parallèle ---
+#
+# Les sources sont indépendantes : elles sont nettoyées dans des processus séparés.
+# Pour borner la mémoire, une seule source « lourde » (au-delà de HEAVY_SOURCE_BYTES)
+# tourne à la fois, les plus grosses étant lancées en premier ; les sources qui
+# écrivent le même fichier gardent leur ordre d'origine et ne se chevauchent pas.
+
+HEAVY_SOURCE_BYTES = 50 * 1024 * 1024
+
+
+def _source_size(file_path):
+    try:
+        return os.path.getsize(file_path)
+    except OSError:
+        return 0  # L'erreur sera signalée par le worker
+
+
+def clean_sources_parallel(
+    sources,
+    workers,
+    streaming=None,
+    chunksize=CHUNK_SIZE,
+    heavy_threshold=HEAVY_SOURCE_BYTES,
+):
+    """
+    Nettoie les sources en parallèle dans un pool de processus.
+    :param sources: Dictionnaire nom -> chemin (comme `files_to_clean`).
+    :param workers: Nombre maximal de processus.
+    :param heavy_threshold: Taille à partir de laquelle une source est dite lourde ;
+        deux sources lourdes ne sont jamais nettoyées en même temps.
+    :return: Dictionnaire nom -> {"output": chemin} ou {"error": message}.
+    """
+    order = list(sources)
+    sizes = {name: _source_size(path) for name, path in sources.items()}
+    outputs = {name: source_output_path(name) for name in order}
+    pending = sorted(order, key=lambda name: sizes[name], reverse=True)
+    running = {}
+    results = {}
+
+    def can_start(name):
+        if sizes[name] >= heavy_threshold and any(
+            sizes[other] >= heavy_threshold for other in running.values()
+        ):
+            return False
+        # Une source écrivant le même fichier qu'une source précédente attend celle-ci
+        earlier = order[: order.index(name)]
+        return not any(
+            outputs[other] == outputs[name] and other not in results
+            for other in earlier
+        )
+
+    def collect(future):
+        name = running.pop(future)
+        try:
+            results[name] = {"output": future.result()}
+        except BrokenProcessPool as e:
+            results[name] = {
+                "error": f"BrokenProcessPool: processus arrêté pendant le nettoyage ({e})"
+            }
+            return False
+        except Exception as e:
+            results[name] = {"error": f"{type(e).__name__}: {e}"}
+        return True
+
+    executor = ProcessPoolExecutor(max_workers=workers)
+    try:
+        while pending or running:
+            healthy = True
+            for name in list(pending):
+                if len(running) >= workers:
+                    break
+                if can_start(name):
+                    try:
+                        future = executor.submit(
+                            clean_source, name, sources[name], streaming, chunksize
+                        )
+                    except BrokenProcessPool:
+                        healthy = False
+                        break
+                    running[future] = name
+                    pending.remove(name)
+
+            if running:
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    healthy = collect(future) and healthy
+
+            if not healthy:
+                # Un processus a été tué (ex. manque de mémoire) : le pool est
+                # inutilisable et les sources en cours échouent avec lui. Les sources
+                # restantes repartent dans un nouveau pool.
+                for future in wait(running)[0]:
+                    collect(future)
+                executor.shutdown()
+                executor = ProcessPoolExecutor(max_workers=workers)
+    finally:
+        executor.shutdown()
+
+    return {name: results[name] for name in order}
+
+
+# Code dont dépend le résultat du nettoyage (pour le cache incrémental)
+CLEAN_CODE_FILES = [
+    os.path.abspath(__file__),
+    os.path.join(ROOT_DIR, "src", "preprocesing", "type_inference.py"),
+]
+
+
+def stale_sources(sources, cache, force=False):
+    """
+    Sources à nettoyer de nouveau, avec leur empreinte (voir build_cache).
+    Les sources qui écrivent le même fichier sont relancées ensemble pour que le
+    résultat reste celui d'un nettoyage complet.
+    :param force: Considérer toutes les sources comme à nettoyer.
+    """
+    fingerprints = {
+        name: cache.fingerprint([path], CLEAN_CODE_FILES + COMMON_CODE_FILES)
+        for name, path in sources.items()
+    }
+    stale = {
+        name
+        for name in sources
+        if force
+        or not cache.is_up_to_date(
+            f"clean:{name}", fingerprints[name], [source_output_path(name)]
+        )
+    }
+    stale_outputs = {source_output_path(name) for name in stale}
+    return {
+        name: fingerprints[name]
+        for name in sources
+        if source_output_path(name) in stale_outputs
+    }
+
+
 # Processus principal
-def main():
-    # Nettoyer et sauvegarder chaque fichier
-    for name, file_path in files_to_clean.items():
-        if name == "amazon_reviews_db":  # Cas particulier pour la base SQLite
-            output_path = os.path.join(PROCESSED_DATA_DIR, "amazon_reviews_cleaned.csv")
-            clean_sqlite(file_path, "Reviews", output_path)
-        else:
-            output_path = os.path.join(PROCESSED_DATA_DIR, f"{name}_cleaned.csv")
-            print(f"Traitement de {file_path}...")
+def main(streaming=None, chunksize=CHUNK_SIZE, workers=1, force=False):
+    """
+    :param streaming: True/False pour forcer le mode streaming ; par défaut il est
+        utilisé pour les fichiers de plus de STREAMING_THRESHOLD_BYTES.
+    :param chunksize: Nombre de lignes par bloc en mode streaming.
+    :param workers: Nombre de processus ; au-delà de 1, les sources sont nettoyées
+        en parallèle (voir clean_sources_parallel).
+    :param force: Nettoyer toutes les sources, même celles dont l'entrée et le code
+        n'ont pas changé depuis le dernier nettoyage.
+    """
+    cache = BuildCache()
+    fingerprints = stale_sources(files_to_clean, cache, force=force)
+    for name in files_to_clean:
+        if name not in fingerprints:
+            print(f"[cache] {files_to_clean[name]} inchangé, nettoyage sauté.")
+    sources = {name: files_to_clean[name] for name in fingerprints}
+
+    if workers > 1:
+        results = clean_sources_parallel(
+            sources, workers, streaming=streaming, chunksize=chunksize
+        )
+        for name, result in results.items():
+            if "error" in result:
+                print(
+                    f"Erreur lors du traitement de {files_to_clean[name]}: "
+                    f"{result['error']}"
+                )
+    else:
+        # Nettoyer et sauvegarder chaque fichier
+        results = {}
+        for name, file_path in sources.items():
             try:
-                df = pd.read_csv(file_path)
-                df_cleaned = clean_data(df)
-                os.makedirs(os.path.dirname(output_path), exist_ok=True)
-                df_cleaned.to_csv(output_path, index=False)
-                print(f"Fichier nettoyé enregistré : {output_path}")
+                output_path = clean_source(
+                    name, file_path, streaming=streaming, chunksize=chunksize
+                )
+                results[name] = {"output": output_path}
             except Exception as e:
                 print(f"Erreur lors du traitement de {file_path}: {e}")
+                results[name] = {"error": f"{type(e).__name__}: {e}"}
+
+    # Enregistrer les sources nettoyées avec succès dans le cache incrémental
+    for name, result in results.items():
+        if "output" in result:
+            cache.record(f"clean:{name}", fingerprints[name], [result["output"]])
+    cache.save()
+    return results
 
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Nettoyage des données brutes.")
+    parser.add_argument(
+        "--workers", type=int, default=1, help="Nombre de processus (1 = séquentiel)"
+    )
+    parser.add_argument(
+        "--streaming",
+        action=argparse.BooleanOptionalAction,
+        default=None,
+        help="Forcer (ou désactiver) le nettoyage par blocs",
+    )
+    parser.add_argument("--chunksize", type=int, default=CHUNK_SIZE)
+    parser.add_argument(
+        "--force", action="store_true", help="Ignorer le cache incrémental"
+    )
+    args = parser.parse_args()
+    main(
+        streaming=args.streaming,
+        chunksize=args.chunksize,
+        workers=args.workers,
+        force=args.force,
+    )
@@ -0,0 +1,531 @@
+import os
+import re
+import sys
+import json
+import argparse
+import numpy as np
+import pandas as pd
+
+# Gestion dynamique des chemins : ROOT_DIR = racine du projet
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if __package__ in (None, ""):
+    # Lancé comme script : la racine du projet n'est pas encore dans sys.path
+    sys.path.append(ROOT_DIR)
+
+# Import des chemins définis dans paths.py
+from paths import CLEANED_DATA_DIR
+from src.utils.storage import (
+    load_dataset,
+    save_dataset,
+    find_dataset,
+    dataset_path,
+    read_table,
+    iter_table_chunks,
+    open_table_writer,
+)
+from src.utils.aggregates import (
+    aggregate_state,
+    merge_states,
+    state_mean,
+    state_column,
+    state_to_frame,
+    state_from_frame,
+    lookup,
+)
+from src.utils.out_of_core import aggregate_file
+from src.utils.build_cache import run_cached, is_cached, record_cached
+from src.preprocesing.enrich_data import CLEANED_DATASETS, ENRICHED_DATASETS
+from src.utils.feature_engineering import (
+    SUMMARY_DATASETS,
+    experience_years,
+    reference_day,
+)
+
+# --- Enrichissement et résumés en une seule passe ---
+#
+# L'enrichissement (colonnes moyennes par groupe) et les résumés de
+# utils/feature_engineering reposent sur les mêmes regroupements (moyenne des scores
+# par produit, productivité par département, CPU par type de tâche...). Ici, chaque
+# dataset est lu une fois et chaque regroupement calculé une fois : le résultat par groupe donne le résumé, et il est redistribué sur les lignes (par le
+# numéro de groupe ou la clé de chaque ligne) pour l'enrichissement.
+
+# Outils considérés comme utilisés récemment (colonne enrichie recent_usage)
+RECENT_TOOLS = ["monday.com", "trello"]
+
+# Résumés mis à jour par lots : les nouvelles lignes (avis, métriques) ne font que
+# s'ajouter à l'historique. Chaque lot est conservé dans un journal (un fichier par
+# lot, dans l'ordre d'arrivée) qui prolonge le dataset nettoyé : une exécution
+# complète le rejoue. L'état d'agrégation (somme, nombre, somme des carrés, min, max
+# par clé) est enregistré à côté du résumé ; fold_batch y fusionne un lot sans relire
+# l'historique. Le dataset enrichi n'est pas réécrit : ses moyennes par clé sont lues
+# dans l'état au chargement (voir iter_enriched).
+INCREMENTAL_SUMMARIES = {
+    "amazon_reviews": {
+        "key": "productid",
+        "columns": ["score"],
+        "journal": "amazon_reviews_batches",
+        "state": "amazon_reviews_summary_state",
+        "summary": "amazon_reviews_summary",
+        "enriched": "amazon_reviews_enriched",
+        # Colonne enrichie -> colonne dont elle est la moyenne par clé
+        "enriched_columns": {"avg_score": "score"},
+    },
+    "vmcloud": {
+        "key": "task_type",
+        "columns": ["cpu_usage", "memory_usage", "network_traffic"],
+        "journal": "vmcloud_batches",
+        "state": "vmcloud_summary_state",
+        "summary": "vmcloud_summary",
+        "enriched": "vmCloud_enriched",
+        "enriched_columns": {"avg_cpu_usage": "cpu_usage"},
+    },
+}
+STATE_DATASETS = [spec["state"] for spec in INCREMENTAL_SUMMARIES.values()]
+
+# Identifiant d'un lot : nom du fichier du lot dans le journal
+BATCH_ID_PATTERN = re.compile(r"^[A-Za-z0-9][A-Za-z0-9_.-]*$")
+
+STAGE = "enrich_summary"
+
+# Au-delà de cette taille, vmCloud nettoyé n'est pas chargé en mémoire : l'état
+# d'agrégation est calculé par blocs, en parallèle (voir out_of_core), puis le
+# dataset enrichi est écrit bloc par bloc
+OUT_OF_CORE_THRESHOLD_BYTES = 100 * 1024 * 1024
+OUT_OF_CORE_WORKERS = min(4, os.cpu_count() or 1)
+OUT_OF_CORE_CHUNK_ROWS = 200_000
+
+
+# --- Journal des lots ---
+#
+# Le journal `<journal>/` (à côté du dataset nettoyé) contient un fichier par lot et
+# `index.json`, la liste des lots dans l'ordre d'arrivée. `<journal>_built.json`, à
+# côté du dataset enrichi, liste les lots que celui-ci contient déjà : les autres
+# (« en attente ») ne sont que dans l'état et le résumé.
+
+
+def journal_dir(name, directory):
+    return os.path.join(directory, INCREMENTAL_SUMMARIES[name]["journal"])
+
+
+def journal_index_path(name, directory):
+    return os.path.join(journal_dir(name, directory), "index.json")
+
+
+def built_manifest_path(name, directory):
+    return os.path.join(
+        directory, INCREMENTAL_SUMMARIES[name]["journal"] + "_built.json"
+    )
+
+
+def _read_ids(path):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return []
+
+
+def _write_ids(path, ids):
+    # Écriture atomique, comme le cache du pipeline
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(ids, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def journal_batches(name, directory):
+    """Identifiants des lots du journal, dans l'ordre d'arrivée."""
+    return _read_ids(journal_index_path(name, directory))
+
+
+def pending_batches(name, directory):
+    """Lots du journal absents du dataset enrichi de `directory`."""
+    built = set(_read_ids(built_manifest_path(name, directory)))
+    return [
+        batch_id
+        for batch_id in journal_batches(name, directory)
+        if batch_id not in built
+    ]
+
+
+def batch_paths(name, directory, batch_ids=None):
+    if batch_ids is None:
+        batch_ids = journal_batches(name, directory)
+    return [
+        find_dataset(journal_dir(name, directory), batch_id) for batch_id in batch_ids
+    ]
+
+
+def check_batch_id(name, batch_id, directory):
+    """Refuse un identifiant mal formé ou déjà présent dans le journal."""
+    if not BATCH_ID_PATTERN.match(batch_id):
+        raise ValueError(f"Identifiant de lot invalide : {batch_id!r}")
+    if batch_id in journal_batches(name, directory):
+        raise ValueError(
+            f"Lot '{batch_id}' déjà intégré à {INCREMENTAL_SUMMARIES[name]['journal']}."
+        )
+
+
+def append_batch(name, batch, batch_id, directory):
+    """Ajoute un lot au journal (fichier du lot, puis index)."""
+    check_batch_id(name, batch_id, directory)
+    save_dataset(batch, journal_dir(name, directory), batch_id, export_csv=False)
+    _write_ids(
+        journal_index_path(name, directory),
+        journal_batches(name, directory) + [batch_id],
+    )
+
+
+def align_columns(df, columns):
+    """Colonnes `columns` de `df`, dans cet ordre ; celles absentes d'un lot (qui
+    peut ne contenir que la clé et les mesures) sont nulles."""
+    missing = [col for col in columns if col not in df.columns]
+    if missing:
+        df = df.assign(
+            **{col: pd.Series(None, index=df.index, dtype=object) for col in missing}
+        )
+    return df[columns]
+
+
+def with_batches(name, df, directory):
+    """Dataset nettoyé prolongé des lots du journal."""
+    batches = [read_table(path, compact=False) for path in batch_paths(name, directory)]
+    if not batches:
+        return df
+    return pd.concat(
+        [df] + [align_columns(batch, list(df.columns)) for batch in batches],
+        ignore_index=True,
+    )
+
+
+def broadcast(group_values, group_ids):
+    """
+    Valeur du groupe de chaque ligne, comme `transform` : `group_ids` vient de
+    `ngroup()` et vaut NaN pour les lignes dont la clé est manquante.
+    """
+    ids = group_ids.to_numpy()
+    valid = ~np.isnan(ids)
+    values = group_values.to_numpy()
+    if valid.all():
+        return pd.Series(values[ids.astype(np.intp)], index=group_ids.index)
+    dtype = values.dtype if values.dtype.kind == "f" else np.float64
+    result = np.full(len(ids), np.nan, dtype=dtype)
+    result[valid] = values[ids[valid].astype(np.intp)]
+    return pd.Series(result, index=group_ids.index)
+
+
+def summary_from_state(name, state):
+    """Résumé (moyennes par clé) déduit de l'état d'agrégation."""
+    spec = INCREMENTAL_SUMMARIES[name]
+    summary = pd.DataFrame(index=state.index)
+    if name == "amazon_reviews":
+        summary["avg_score"] = state_mean(state, "score")
+        summary["num_reviews"] = state[state_column("score", "count")]
+    else:
+        for col in spec["columns"]:
+            summary[f"avg_{col}"] = state_mean(state, col)
+    return summary.rename_axis(spec["key"]).reset_index()
+
+
+def enrich_from_state(name, df, state):
+    """Ajoute à `df` les colonnes enrichies (moyenne de la clé de chaque ligne)."""
+    spec = INCREMENTAL_SUMMARIES[name]
+    for enriched_col, col in spec["enriched_columns"].items():
+        df[enriched_col] = lookup(state_mean(state, col), df[spec["key"]])
+    return df
+
+
+def enrich_and_summarize_incremental(name, df):
+    """Enrichissement, résumé et état d'agrégation d'un résumé incrémental."""
+    spec = INCREMENTAL_SUMMARIES[name]
+    state = aggregate_state(df, spec["key"], spec["columns"])
+    return enrich_from_state(name, df, state), summary_from_state(name, state), state
+
+
+def enrich_and_summarize_out_of_core(
+    name, input_path, output_dir, workers=OUT_OF_CORE_WORKERS, batch_files=()
+):
+    """
+    Comme enrich_and_summarize_incremental, pour un fichier trop gros pour la
+    mémoire : deux lectures par blocs (état d'agrégation, puis enrichissement écrit
+    au fil de l'eau dans le dataset enrichi).
+    :param batch_files: Lots du journal, ajoutés à la fin du fichier.
+    :return: Résumé et état d'agrégation.
+    """
+    spec = INCREMENTAL_SUMMARIES[name]
+    state = aggregate_file(
+        input_path,
+        spec["key"],
+        spec["columns"],
+        workers=workers,
+        chunksize=OUT_OF_CORE_CHUNK_ROWS,
+    )
+    for path in batch_files:
+        batch = read_table(path, columns=[spec["key"]] + spec["columns"], compact=False)
+        state = merge_states(
+            state, aggregate_state(batch, spec["key"], spec["columns"])
+        )
+
+    writer = open_table_writer(dataset_path(output_dir, spec["enriched"]))
+    try:
+        for path in [input_path] + list(batch_files):
+            for chunk in iter_table_chunks(path, chunksize=OUT_OF_CORE_CHUNK_ROWS):
+                writer.write(enrich_from_state(name, chunk, state))
+    finally:
+        writer.close()
+    return summary_from_state(name, state), state
+
+
+def enrich_and_summarize_hr(hr_dashboard, reference_date=None):
+    joining_date = pd.to_datetime(hr_dashboard["joining_date"], errors="coerce")
+    columns = pd.DataFrame(
+        {
+            "avg_productivity": hr_dashboard["productivity_(%)"],
+            "avg_satisfaction": hr_dashboard["satisfaction_rate_(%)"],
+            "avg_experience": experience_years(joining_date, reference_date),
+        }
+    )
+    grouped = columns.groupby(hr_dashboard["department"], observed=True)
+    stats = grouped.mean()
+
+    group_ids = grouped.ngroup()
+    hr_dashboard["avg_productivity"] = broadcast(stats["avg_productivity"], group_ids)
+    hr_dashboard["avg_satisfaction"] = broadcast(stats["avg_satisfaction"], group_ids)
+    return hr_dashboard, stats.rename_axis("department").reset_index()
+
+
+def enrich_and_summarize_tools(project_tools):
+    tools = project_tools["final_selected_tool"].str.strip().str.lower()
+    project_tools["recent_usage"] = tools.isin(RECENT_TOOLS).astype("int64")
+
+    summary = tools.value_counts().reset_index()
+    summary.columns = ["tool_name", "selection_count"]
+    return project_tools, summary
+
+
+def enrich_and_summarize_tasks(task_assignment):
+    # Un seul regroupement (catégorie, compétence), lignes sans compétence comprises :
+    # la charge d'une catégorie est la somme de ses sous-groupes
+    pair_counts = task_assignment.groupby(
+        ["category", "skill"], observed=True, dropna=False
+    ).size()
+    category_counts = pair_counts.groupby(level="category", observed=True).sum()
+
+    category_ids = pd.Series(
+        category_counts.index.get_indexer(task_assignment["category"]),
+        index=task_assignment.index,
+    )
+    category_ids = category_ids.where(task_assignment["category"].notna())
+    task_assignment["task_load"] = broadcast(category_counts, category_ids)
+
+    summary = pair_counts.reset_index(name="task_count").dropna(
+        subset=["category", "skill"]
+    )
+    return task_assignment, summary.reset_index(drop=True)
+
+
+def enrich_and_summarize(
+    input_dir=CLEANED_DATA_DIR, output_dir=CLEANED_DATA_DIR, reference_date=None
+):
+    """
+    Produit les datasets enrichis (ENRICHED_DATASETS) et les résumés (SUMMARY_DATASETS)
+    en lisant chaque dataset nettoyé une seule fois (deux fois par blocs pour un
+    vmCloud plus gros que OUT_OF_CORE_THRESHOLD_BYTES). Les lots du journal des
+    résumés incrémentaux sont rejoués à la suite de leur dataset nettoyé.
+    """
+    amazon_reviews, hr_dashboard, project_tools, task_assignment = (
+        load_dataset(input_dir, name) for name in CLEANED_DATASETS[:4]
+    )
+    amazon_reviews = with_batches("amazon_reviews", amazon_reviews, input_dir)
+
+    amazon_reviews, amazon_summary, amazon_state = enrich_and_summarize_incremental(
+        "amazon_reviews", amazon_reviews
+    )
+    results = [
+        (amazon_reviews, amazon_summary),
+        enrich_and_summarize_hr(hr_dashboard, reference_date),
+        enrich_and_summarize_tools(project_tools),
+        enrich_and_summarize_tasks(task_assignment),
+    ]
+
+    vmcloud_path = find_dataset(input_dir, CLEANED_DATASETS[4])
+    if os.path.getsize(vmcloud_path) > OUT_OF_CORE_THRESHOLD_BYTES:
+        # Dataset enrichi déjà écrit bloc par bloc
+        vmcloud_summary, vmcloud_state = enrich_and_summarize_out_of_core(
+            "vmcloud",
+            vmcloud_path,
+            output_dir,
+            batch_files=batch_paths("vmcloud", input_dir),
+        )
+        save_dataset(vmcloud_summary, output_dir, SUMMARY_DATASETS[4])
+    else:
+        vmCloud_data = with_batches(
+            "vmcloud", load_dataset(input_dir, CLEANED_DATASETS[4]), input_dir
+        )
+        vmCloud_data, vmcloud_summary, vmcloud_state = enrich_and_summarize_incremental(
+            "vmcloud", vmCloud_data
+        )
+        results.append((vmCloud_data, vmcloud_summary))
+
+    for (enriched, summary), enriched_name, summary_name in zip(
+        results, ENRICHED_DATASETS, SUMMARY_DATASETS
+    ):
+        save_dataset(enriched, output_dir, enriched_name)
+        save_dataset(summary, output_dir, summary_name)
+    for name, state in (("amazon_reviews", amazon_state), ("vmcloud", vmcloud_state)):
+        save_dataset(
+            state_to_frame(state), output_dir, INCREMENTAL_SUMMARIES[name]["state"]
+        )
+        _write_ids(
+            built_manifest_path(name, output_dir), journal_batches(name, input_dir)
+        )
+
+
+def stage_params(reference_date=None):
+    """Paramètres de l'étape pour build_cache (jour de référence de l'ancienneté)."""
+    return {"reference_date": reference_day(reference_date)}
+
+
+def stage_files(directory=CLEANED_DATA_DIR):
+    """Entrées et sorties de l'étape (journaux des lots compris), pour build_cache."""
+    inputs = [find_dataset(directory, name) for name in CLEANED_DATASETS]
+    outputs = [
+        dataset_path(directory, name)
+        for name in ENRICHED_DATASETS + SUMMARY_DATASETS + STATE_DATASETS
+    ]
+    for name in INCREMENTAL_SUMMARIES:
+        index_path = journal_index_path(name, directory)
+        if os.path.exists(index_path):
+            inputs += [index_path] + batch_paths(name, directory)
+        outputs.append(built_manifest_path(name, directory))
+    return inputs, outputs
+
+
+def fold_batch(name, batch, batch_id, directory=CLEANED_DATA_DIR, reference_date=None):
+    """
+    Intègre un lot de nouvelles lignes nettoyées (avis ou métriques) au résumé
+    incrémental `name` de INCREMENTAL_SUMMARIES.
+    Le lot est ajouté au journal sous `batch_id` (un identifiant déjà utilisé est
+    refusé), puis fusionné à l'état et au résumé sans relire l'historique ni
+    réécrire le dataset enrichi. L'étape est ensuite enregistrée à jour dans le
+    cache : run() ne relance pas l'exécution complète.
+    Si l'étape n'était pas à jour, le lot est seulement ajouté au journal et la
+    prochaine exécution complète l'intègre.
+    Un lot sans la clé ou les mesures du résumé est refusé (ValueError) avant d'être
+    journalisé : chaque exécution complète rejoue le journal.
+    :return: True si l'état et le résumé ont été mis à jour.
+    """
+    spec = INCREMENTAL_SUMMARIES[name]
+    check_batch_id(name, batch_id, directory)
+    missing = [col for col in [spec["key"]] + spec["columns"] if col not in batch]
+    if missing:
+        raise ValueError(
+            f"Lot '{batch_id}' refusé : colonnes manquantes {', '.join(missing)}."
+        )
+    batch_state = aggregate_state(batch, spec["key"], spec["columns"])
+    code_files = [os.path.abspath(__file__)]
+    inputs, outputs = stage_files(directory)
+    params = stage_params(reference_date)
+    up_to_date = is_cached(STAGE, inputs, outputs, code_files, params)
+
+    append_batch(name, batch, batch_id, directory)
+    if not up_to_date:
+        print(
+            f"Lot '{batch_id}' ajouté à {spec['journal']} ; il sera intégré à "
+            f"{spec['summary']} par la prochaine exécution complète."
+        )
+        return False
+
+    state = state_from_frame(load_dataset(directory, spec["state"]), spec["key"])
+    state = merge_states(state, batch_state)
+    save_dataset(state_to_frame(state), directory, spec["state"])
+    save_dataset(summary_from_state(name, state), directory, spec["summary"])
+
+    inputs, outputs = stage_files(directory)
+    record_cached(STAGE, inputs, outputs, code_files, params)
+    print(
+        f"Lot '{batch_id}' de {len(batch)} lignes intégré à {spec['summary']} "
+        f"({len(batch_state)} clés mises à jour)."
+    )
+    return True
+
+
+def iter_enriched(name, directory=CLEANED_DATA_DIR, chunksize=OUT_OF_CORE_CHUNK_ROWS):
+    """
+    Dataset enrichi `name` par blocs, à jour des lots intégrés par fold_batch : les
+    colonnes enrichies sont relues dans l'état d'agrégation et les lots en attente
+    suivent les lignes du fichier.
+    """
+    spec = INCREMENTAL_SUMMARIES[name]
+    state = state_from_frame(load_dataset(directory, spec["state"]), spec["key"])
+    enriched_path = find_dataset(directory, spec["enriched"])
+    columns = None
+    for path in [enriched_path] + batch_paths(
+        name, directory, pending_batches(name, directory)
+    ):
+        for chunk in iter_table_chunks(path, chunksize=chunksize):
+            if columns is None:
+                columns = list(chunk.columns)
+            chunk = enrich_from_state(name, chunk, state)
+            yield align_columns(chunk, columns)
+
+
+def load_enriched(name, directory=CLEANED_DATA_DIR):
+    """Dataset enrichi `name` à jour des lots intégrés par fold_batch (en mémoire)."""
+    return pd.concat(list(iter_enriched(name, directory)), ignore_index=True)
+
+
+def run(force=False, directory=CLEANED_DATA_DIR, reference_date=None):
+    """Enrichissement et résumés incrémentaux : sautés si les données nettoyées, les
+    lots du journal, le jour de référence de l'ancienneté et le code n'ont pas changé
+    depuis la dernière exécution (voir build_cache)."""
+    inputs, outputs = stage_files(directory)
+    params = stage_params(reference_date)
+    return run_cached(
+        STAGE,
+        lambda: enrich_and_summarize(directory, directory, params["reference_date"]),
+        inputs=inputs,
+        outputs=outputs,
+        code_files=[os.path.abspath(__file__)],
+        params=params,
+        force=force,
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Enrichissement et résumés.")
+    parser.add_argument(
+        "--force", action="store_true", help="Ignorer le cache incrémental"
+    )
+    parser.add_argument(
+        "--fold-reviews", help="Lot d'avis nettoyés à intégrer aux résumés"
+    )
+    parser.add_argument(
+        "--fold-vmcloud", help="Lot de métriques nettoyées à intégrer aux résumés"
+    )
+    parser.add_argument(
+        "--batch-id",
+        help="Identifiant du lot (par défaut, le nom du fichier sans extension)",
+    )
+    parser.add_argument(
+        "--reference-date",
+        help="Date de calcul de l'ancienneté (AAAA-MM-JJ, aujourd'hui par défaut)",
+    )
+    args = parser.parse_args()
+
+    if args.fold_reviews or args.fold_vmcloud:
+        for name, path in (
+            ("amazon_reviews", args.fold_reviews),
+            ("vmcloud", args.fold_vmcloud),
+        ):
+            if path:
+                batch_id = args.batch_id or os.path.splitext(os.path.basename(path))[0]
+                fold_batch(
+                    name,
+                    read_table(path, compact=False),
+                    batch_id,
+                    reference_date=args.reference_date,
+                )
+    else:
+        run(force=args.force, reference_date=args.reference_date)
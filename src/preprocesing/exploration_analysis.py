@@ -6,32 +6,33 @@ import seaborn as sns
 
 # Gestion dynamique des chemins : ROOT_DIR = racine du projet
 ROOT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-sys.path.append(ROOT_DIR)
+if __package__ in (None, ""):
+    # Lancé comme script : la racine du projet n'est pas encore dans sys.path
+    sys.path.append(ROOT_DIR)
 
 # Import des chemins définis dans paths.py
 from paths import PROCESSED_DATA_DIR, ANALYSIS_DIR
+from src.utils.storage import load_dataset
 
 # Création du dossier de sortie pour les analyses
 os.makedirs(ANALYSIS_DIR, exist_ok=True)
 
-# Fichiers nettoyés
+# Fichiers nettoyés (nom du dataset dans PROCESSED_DATA_DIR, Parquet ou CSV)
 files_to_analyze = {
-    "hr_dashboard_data": os.path.join(
-        PROCESSED_DATA_DIR, "hr_dashboard_data_cleaned.csv"
-    ),
-    "amazon_reviews": os.path.join(PROCESSED_DATA_DIR, "amazon_reviews_cleaned.csv"),
-    "project_tools": os.path.join(PROCESSED_DATA_DIR, "project_tools_cleaned.csv"),
-    "task_assignment": os.path.join(PROCESSED_DATA_DIR, "task_assignment_cleaned.csv"),
-    "cloud_metrics": os.path.join(PROCESSED_DATA_DIR, "cloud_metrics_cleaned.csv"),
+    "hr_dashboard_data": "hr_dashboard_data_cleaned",
+    "amazon_reviews": "amazon_reviews_cleaned",
+    "project_tools": "project_tools_cleaned",
+    "task_assignment": "task_assignment_cleaned",
+    "cloud_metrics": "cloud_metrics_cleaned",
 }
 
 
 # Fonction pour l'analyse exploratoire
-def exploratory_analysis(file_name, file_path):
-    """Réalise une analyse exploratoire sur un fichier CSV."""
+def exploratory_analysis(file_name, dataset_name):
+    """Réalise une analyse exploratoire sur un dataset nettoyé."""
     print(f"Analyse exploratoire de {file_name}...")
     try:
-        df = pd.read_csv(file_path)
+        df = load_dataset(PROCESSED_DATA_DIR, dataset_name)
 
         # Statistiques descriptives
         stats = df.describe(include="all").transpose()
@@ -71,8 +72,8 @@ def exploratory_analysis(file_name, file_path):
 
 # Processus principal
 def main():
-    for name, path in files_to_analyze.items():
-        exploratory_analysis(name, path)
+    for name, dataset_name in files_to_analyze.items():
+        exploratory_analysis(name, dataset_name)
 
 
 if __name__ == "__main__":
@@ -1,89 +1,189 @@
 import os
 import sys
-import pandas as pd
-import sqlite3
-import hashlib
+import subprocess
 
 # Gestion dynamique des chemins
 ROOT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-sys.path.append(ROOT_DIR)
+if __package__ in (None, ""):
+    # Lancé comme script : la racine du projet n'est pas encore dans sys.path
+    sys.path.append(ROOT_DIR)
 
 from paths import RAW_DATA_DIR, PROCESSED_DATA_DIR
+from src.utils.digests import DigestCache, digest_files
+from src.utils.lazy_dataset import CsvDataset, SqliteDataset
 
+# Début d'un pointeur Git LFS et taille maximale d'un tel fichier
+LFS_POINTER_HEADER = "version https://git-lfs"
+LFS_POINTER_MAX_SIZE = 1024
 
-def hash_file(file_path):
+
+def hash_file(file_path, algorithm="md5"):
     """
-    Calculer le hash MD5 d'un fichier pour vérifier son intégrité.
+    Calculer le hash d'un fichier (MD5 par défaut) pour vérifier son intégrité.
+    Le résultat est mis en cache tant que le fichier n'est pas modifié.
     """
-    hasher = hashlib.md5()
-    with open(file_path, "rb") as f:
-        while chunk := f.read(8192):
-            hasher.update(chunk)
-    return hasher.hexdigest()
+    cache = DigestCache()
+    digest = cache.get(file_path, (algorithm,))[algorithm]
+    cache.save()
+    return digest
 
 
 def load_datasets():
     """
-    Charger les datasets bruts depuis RAW_DATA_DIR et associer les fichiers.
+    Associer les datasets bruts de RAW_DATA_DIR à des accès paresseux.
+    Aucune donnée n'est lue ici : chaque objet expose `columns`, `shape`, `schema`,
+    `head(n)` et `sample_stats(n)`, et ne charge le DataFrame complet qu'avec `load()`.
     """
     datasets = {}
 
     # Association des fichiers
-    datasets["Employee Productivity and Satisfaction HR Data"] = pd.read_csv(
+    datasets["Employee Productivity and Satisfaction HR Data"] = CsvDataset(
         os.path.join(RAW_DATA_DIR, "hr_dashboard_data.csv")
     )
-    datasets["amazon_reviews"] = pd.read_csv(os.path.join(RAW_DATA_DIR, "Reviews.csv"))
-    datasets["Software Project Management Tools"] = pd.read_csv(
+    datasets["amazon_reviews"] = CsvDataset(os.path.join(RAW_DATA_DIR, "Reviews.csv"))
+    datasets["Software Project Management Tools"] = CsvDataset(
         os.path.join(RAW_DATA_DIR, "SPMQA Data Visualization - Sheet1.csv")
     )
-    datasets["Skill-Based Task Assignment"] = pd.read_csv(
+    datasets["Skill-Based Task Assignment"] = CsvDataset(
         os.path.join(RAW_DATA_DIR, "Task Categories.csv")
     )
-    datasets["Cloud Computing Performance Metrics"] = pd.read_csv(
+    datasets["Cloud Computing Performance Metrics"] = CsvDataset(
         os.path.join(RAW_DATA_DIR, "vmCloud_data.csv")
     )
 
-    # Charger la base de données SQLite Amazon Reviews
+    # Base de données SQLite Amazon Reviews
     sqlite_path = os.path.join(RAW_DATA_DIR, "database.sqlite")
-    conn = sqlite3.connect(sqlite_path)
-    datasets["amazon_reviews_db"] = pd.read_sql_query("SELECT * FROM Reviews", conn)
-    conn.close()
+    datasets["amazon_reviews_db"] = SqliteDataset(sqlite_path, "Reviews")
 
     return datasets
 
 
-def verify_hashes():
+def parse_lfs_pointer(text):
+    """Extrait (sha256, taille) d'un pointeur Git LFS, ou None si ce n'en est pas un."""
+    if not text.startswith(LFS_POINTER_HEADER):
+        return None
+    fields = dict(line.split(" ", 1) for line in text.splitlines() if " " in line)
+    oid = fields.get("oid", "")
+    if not oid.startswith("sha256:") or not fields.get("size", "").isdigit():
+        return None
+    return oid[len("sha256:") :], int(fields["size"])
+
+
+def read_lfs_pointer(file_path):
+    """Pointeur LFS contenu dans un fichier de travail non téléchargé (sinon None)."""
+    try:
+        if os.path.getsize(file_path) > LFS_POINTER_MAX_SIZE:
+            return None
+        with open(file_path, "r", encoding="utf-8") as f:
+            return parse_lfs_pointer(f.read())
+    except (OSError, UnicodeDecodeError):
+        return None
+
+
+def committed_lfs_pointers(directory=RAW_DATA_DIR):
+    """
+    Pointeurs LFS enregistrés dans le commit courant pour les fichiers de `directory`,
+    lus avec git (dictionnaire nom de fichier -> (sha256, taille)).
+    """
+    try:
+        listing = subprocess.run(
+            ["git", "ls-tree", "-l", "-z", "HEAD", "--", "."],
+            cwd=directory,
+            capture_output=True,
+            check=True,
+        ).stdout.decode()
+    except (OSError, subprocess.CalledProcessError):
+        return {}
+
+    pointers = {}
+    for entry in filter(None, listing.split("\0")):
+        info, path = entry.split("\t", 1)
+        _, object_type, object_id, size = info.split()
+        # Un pointeur LFS est un petit blob texte
+        if object_type != "blob" or int(size) > LFS_POINTER_MAX_SIZE:
+            continue
+        blob = subprocess.run(
+            ["git", "cat-file", "blob", object_id],
+            cwd=directory,
+            capture_output=True,
+        ).stdout.decode(errors="replace")
+        pointer = parse_lfs_pointer(blob)
+        if pointer:
+            pointers[os.path.basename(path)] = pointer
+    return pointers
+
+
+def read_reference_hashes(directory=RAW_DATA_DIR):
     """
-    Vérifier les hashes des fichiers à l'aide de `hashes.txt`.
+    Hashes de référence des fichiers de `directory` :
+    - lignes « MD5 (fichier) = hash » ou « SHA256 (fichier) = hash » de `hashes.txt` ;
+    - oid SHA-256 et taille des pointeurs Git LFS.
+    :return: Dictionnaire nom de fichier -> {"md5": ..., "sha256": ..., "size": ...}.
     """
-    hashes_path = os.path.join(RAW_DATA_DIR, "hashes.txt")
-    with open(hashes_path, "r") as file:
-        lines = file.readlines()
-
-    # Extraire les hashes de référence
-    reference_hashes = {}
-    for line in lines:
-        if "MD5" in line:
-            file_name = line.split("(")[1].split(")")[0]
-            hash_value = line.split("=")[1].strip()
-            reference_hashes[file_name] = hash_value
-
-    # Vérifier chaque fichier
-    for file_name, reference_hash in reference_hashes.items():
+    references = {}
+    hashes_path = os.path.join(directory, "hashes.txt")
+    if os.path.exists(hashes_path):
+        with open(hashes_path, "r") as file:
+            for line in file:
+                for label, algorithm in (("MD5", "md5"), ("SHA256", "sha256")):
+                    if line.startswith(label) and "(" in line and "=" in line:
+                        file_name = line.split("(")[1].split(")")[0]
+                        hash_value = line.split("=")[1].strip().lower()
+                        references.setdefault(file_name, {})[algorithm] = hash_value
+
+    for file_name, (sha256, size) in committed_lfs_pointers(directory).items():
+        reference = references.setdefault(file_name, {})
+        reference.setdefault("sha256", sha256)
+        reference["size"] = size
+    return references
+
+
+def verify_hashes(workers=None):
+    """
+    Vérifier les hashes des fichiers à l'aide de `hashes.txt` et des pointeurs Git LFS.
+    Les fichiers sont hachés en parallèle et les hash mis en cache par (chemin,
+    taille, mtime, inode) : un fichier inchangé n'est pas relu.
+    """
+    references = read_reference_hashes()
+
+    to_hash = {}
+    for file_name, reference in sorted(references.items()):
         file_path = os.path.join(RAW_DATA_DIR, file_name)
-        if os.path.exists(file_path):
-            computed_hash = hash_file(file_path)
-            if computed_hash == reference_hash:
-                print(f"Hash OK for {file_name}")
-            else:
-                print(
-                    f"Hash mismatch for {file_name}: expected {reference_hash}, got {computed_hash}"
-                )
-        else:
+        if not os.path.exists(file_path):
             print(f"File {file_name} not found!")
-
-
-if __name__ == "__main__":
+            continue
+        pointer = read_lfs_pointer(file_path)
+        if pointer is not None:
+            print(f"File {file_name} is a Git LFS pointer (run `git lfs pull`)")
+            continue
+        size = os.path.getsize(file_path)
+        if "size" in reference and size != reference["size"]:
+            print(
+                f"Size mismatch for {file_name}: expected {reference['size']}, got {size}"
+            )
+            continue
+        to_hash[file_path] = [a for a in ("md5", "sha256") if a in reference]
+
+    # Un seul passage par fichier, quel que soit le nombre d'algorithmes demandés
+    computed = digest_files(to_hash, workers=workers)
+
+    for file_path, digests in computed.items():
+        file_name = os.path.basename(file_path)
+        mismatches = [
+            (algorithm, references[file_name][algorithm], digest)
+            for algorithm, digest in digests.items()
+            if digest != references[file_name][algorithm]
+        ]
+        if not mismatches:
+            print(f"Hash OK for {file_name}")
+        for algorithm, reference_hash, computed_hash in mismatches:
+            print(
+                f"Hash mismatch for {file_name} ({algorithm.upper()}): "
+                f"expected {reference_hash}, got {computed_hash}"
+            )
+
+
+def main():
     print("### Vérification des fichiers avec les hashes ###")
     verify_hashes()
 
@@ -97,3 +197,7 @@ if __name__ == "__main__":
             print(f"First rows:\n{dataset.head()}")
     except Exception as e:
         print(f"Erreur lors du chargement des datasets : {e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,444 @@
+import os
+import sys
+import argparse
+import tempfile
+import numpy as np
+import pandas as pd
+
+# Gestion dynamique des chemins : ROOT_DIR = racine du projet
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if __package__ in (None, ""):
+    # Lancé comme script : la racine du projet n'est pas encore dans sys.path
+    sys.path.append(ROOT_DIR)
+
+# Import des chemins définis dans paths.py
+from paths import CLEANED_DATA_DIR
+from src.utils.storage import (
+    load_dataset,
+    save_dataset,
+    find_dataset,
+    dataset_path,
+    iter_table_chunks,
+    open_table_writer,
+)
+from src.utils.aggregates import lookup
+from src.utils.build_cache import run_cached
+
+# --- Indicateurs glissants par VM ---
+#
+# Pour chaque ligne des métriques cloud : moyenne et 95e centile de cpu_usage,
+# memory_usage et network_traffic sur des fenêtres de temps glissantes (t - fenêtre,
+# t] de la même VM, et moyenne mobile exponentielle (EWMA, demi-vie en temps).
+# Les lignes sont triées par (VM, horodatage) puis les fenêtres calculées pour toutes
+# les VM à la fois (rolling groupé de pandas, sommes cumulées pour l'EWMA).
+#
+# En mode par blocs, les lignes arrivent dans l'ordre chronologique de chaque VM ;
+# l'état conservé d'un bloc au suivant se limite, par VM, aux lignes encore dans la
+# plus grande fenêtre et aux sommes pondérées de l'EWMA. Un fichier qui n'est pas dans
+# cet ordre est d'abord réparti par VM en fichiers temporaires, traités chacun en
+# mémoire, puis les résultats sont remis dans l'ordre des lignes : les deux modes
+# acceptent les mêmes données et donnent le même résultat.
+
+SOURCE_DATASET = "vmCloud_data_cleaned"
+ROLLING_DATASET = "vmCloud_rolling_features"
+
+ROLLING_METRICS = ["cpu_usage", "memory_usage", "network_traffic"]
+ROLLING_WINDOWS = ["1h", "6h", "24h"]
+EWMA_HALFLIFE = "1h"
+ROLLING_QUANTILE = 0.95
+
+# Au-delà de cette taille, les métriques sont lues et traitées par blocs
+CHUNKED_THRESHOLD_BYTES = 100 * 1024 * 1024
+CHUNK_ROWS = 200_000
+# Colonne temporaire : numéro de ligne dans le fichier d'origine
+ROW_COLUMN = "_row"
+
+# Les poids de l'EWMA sont calculés par tranches de EWMA_BLOCK demi-vies (2**EWMA_BLOCK
+# reste représentable en float64) ; une ligne plus ancienne que la tranche précédente
+# pèse moins de 2**-EWMA_BLOCK et est négligée
+EWMA_BLOCK = 256
+
+
+def feature_columns(metrics=ROLLING_METRICS, windows=ROLLING_WINDOWS, halflife=None):
+    """Noms des colonnes produites, dans l'ordre."""
+    columns = []
+    for metric in metrics:
+        for window in windows:
+            columns.append(f"{metric}_mean_{window}")
+            columns.append(f"{metric}_p95_{window}")
+        columns.append(f"{metric}_ewma_{halflife or EWMA_HALFLIFE}")
+    return columns
+
+
+def _run_starts(*keys):
+    """Début de chaque suite de lignes consécutives ayant les mêmes `keys`."""
+    starts = np.zeros(len(keys[0]), dtype=bool)
+    if len(starts):
+        starts[0] = True
+        for key in keys:
+            starts[1:] |= key[1:] != key[:-1]
+    return starts
+
+
+def _run_ends(starts):
+    """Fin de chaque suite, à partir des débuts renvoyés par _run_starts."""
+    return np.flatnonzero(np.append(starts[1:], True))
+
+
+class RollingFeatures:
+    """
+    Calcule les indicateurs glissants bloc par bloc. Un seul appel à `update` sur
+    tout le dataset équivaut au mode en mémoire.
+    """
+
+    def __init__(
+        self, metrics=ROLLING_METRICS, windows=ROLLING_WINDOWS, halflife=EWMA_HALFLIFE
+    ):
+        self.metrics = list(metrics)
+        self.windows = list(windows)
+        self.halflife = halflife
+        self.halflife_delta = pd.Timedelta(halflife)
+        self.max_window = max(pd.Timedelta(window) for window in self.windows)
+        self.columns = feature_columns(self.metrics, self.windows, halflife)
+        # Lignes récentes de chaque VM (encore dans la plus grande fenêtre)
+        self.context = None
+        # Par VM : dernier horodatage, sommes pondérées de l'EWMA (num, den)
+        self.ewma_state = None
+
+    def update(self, chunk):
+        """
+        Indicateurs des lignes de `chunk` (colonnes vm_id, timestamp et métriques),
+        dans l'ordre du bloc. Les lignes sans VM ou sans horodatage n'ont pas
+        d'indicateurs.
+        """
+        rows = pd.DataFrame(
+            {
+                "vm_id": chunk["vm_id"].astype(object),
+                "timestamp": pd.to_datetime(chunk["timestamp"], errors="coerce"),
+                **{
+                    metric: pd.to_numeric(chunk[metric], errors="coerce").astype(
+                        "float64"
+                    )
+                    for metric in self.metrics
+                },
+            }
+        ).reset_index(drop=True)
+        rows["position"] = np.arange(len(rows))
+        rows = rows[rows["vm_id"].notna() & rows["timestamp"].notna()]
+        self._check_order(rows)
+
+        features = np.full((len(chunk), len(self.columns)), np.nan)
+        if not rows.empty:
+            # Les lignes conservées du bloc précédent passent en premier à horodatage
+            # égal (tri stable)
+            combined = pd.concat([self.context, rows], ignore_index=True)
+            combined = combined.sort_values(
+                ["vm_id", "timestamp"], kind="mergesort", ignore_index=True
+            )
+            windows = self._window_features(combined)
+            current = combined["position"].to_numpy() >= 0
+            current_rows = combined[current].reset_index(drop=True)
+            ewma = self._ewma_features(current_rows)
+
+            values = {name: column[current] for name, column in windows.items()}
+            values.update(ewma)
+            positions = current_rows["position"].to_numpy()
+            for i, name in enumerate(self.columns):
+                features[positions, i] = values[name]
+            self._keep_context(combined)
+
+        result = pd.DataFrame(features, columns=self.columns, index=chunk.index)
+        result.insert(
+            0, "timestamp", pd.to_datetime(chunk["timestamp"], errors="coerce")
+        )
+        result.insert(0, "vm_id", chunk["vm_id"])
+        return result
+
+    def _check_order(self, rows):
+        if self.ewma_state is None or rows.empty:
+            return
+        last_seen = rows["vm_id"].map(self.ewma_state["timestamp"])
+        late = rows["timestamp"] < last_seen
+        if late.any():
+            vm_id = rows.loc[late, "vm_id"].iloc[0]
+            raise ValueError(
+                f"Métriques hors de l'ordre chronologique pour {vm_id} : le mode par "
+                "blocs suppose des horodatages croissants pour chaque VM."
+            )
+
+    def _window_features(self, combined):
+        """Moyenne et centile sur chaque fenêtre, alignés sur `combined` (trié)."""
+        grouped = combined.groupby("vm_id", sort=False)
+        features = {}
+        for window in self.windows:
+            rolling = grouped.rolling(window, on="timestamp")[self.metrics]
+            means = rolling.mean()
+            quantiles = rolling.quantile(ROLLING_QUANTILE)
+            for metric in self.metrics:
+                features[f"{metric}_mean_{window}"] = means[metric].to_numpy()
+                features[f"{metric}_p95_{window}"] = quantiles[metric].to_numpy()
+        return features
+
+    def _ewma_features(self, rows):
+        """
+        EWMA de chaque métrique (poids 2**(-âge / demi-vie), comme
+        `ewm(halflife=..., times=...)` de pandas), à partir de l'état des blocs
+        précédents.
+        """
+        vm_ids = rows["vm_id"].to_numpy()
+        origin = rows["timestamp"].min()
+        # Temps en demi-vies depuis le début du bloc
+        u = ((rows["timestamp"] - origin) / self.halflife_delta).to_numpy()
+
+        vm_starts = _run_starts(vm_ids)
+        vm_first = u[vm_starts][np.cumsum(vm_starts) - 1]
+        block = np.floor((u - vm_first) / EWMA_BLOCK)
+        run_starts = _run_starts(vm_ids, block)
+        run_ids = np.cumsum(run_starts) - 1
+        run_origin = (vm_first + block * EWMA_BLOCK)[run_starts]
+        scale = np.exp2(u - run_origin[run_ids])
+
+        # Tranche précédente de la même VM, si elle est contiguë
+        run_vm_start = vm_starts[run_starts]
+        run_block = block[run_starts]
+        has_previous = np.zeros(len(run_origin), dtype=bool)
+        has_previous[1:] = ~run_vm_start[1:] & (run_block[1:] == run_block[:-1] + 1)
+        run_ends = _run_ends(run_starts)
+        previous_origin = np.roll(run_origin, 1)
+        previous_decay = np.exp2(
+            np.where(has_previous[run_ids], previous_origin[run_ids] - u, -np.inf)
+        )
+
+        # État des blocs précédents, amorti jusqu'à chaque ligne
+        if self.ewma_state is not None:
+            seed_time = lookup(
+                self.ewma_state["timestamp"].astype("int64").astype("float64"),
+                rows["vm_id"],
+            ).to_numpy()
+            seed_decay = np.exp2(
+                (seed_time - rows["timestamp"].astype("int64").to_numpy())
+                / self.halflife_delta.value
+            )
+            seed_decay = np.nan_to_num(seed_decay)
+
+        vm_ends = _run_ends(vm_starts)
+        state = pd.DataFrame(
+            {"timestamp": rows["timestamp"].to_numpy()[vm_ends]},
+            index=pd.Index(vm_ids[vm_starts], name="vm_id"),
+        )
+        features = {}
+        for metric in self.metrics:
+            x = rows[metric].to_numpy()
+            valid = ~np.isnan(x)
+            sums = {}
+            for part, values in (("num", np.where(valid, x, 0.0)), ("den", valid)):
+                prefix = pd.Series(values * scale).groupby(run_ids).cumsum().to_numpy()
+                previous_total = np.roll(prefix[run_ends], 1)[run_ids]
+                total = prefix / scale + previous_decay * previous_total
+                if self.ewma_state is not None:
+                    carried = lookup(
+                        self.ewma_state[f"{metric}_{part}"], rows["vm_id"]
+                    ).to_numpy()
+                    total = total + np.nan_to_num(carried) * seed_decay
+                sums[part] = total
+            with np.errstate(invalid="ignore", divide="ignore"):
+                features[f"{metric}_ewma_{self.halflife}"] = np.where(
+                    sums["den"] > 0, sums["num"] / sums["den"], np.nan
+                )
+            state[f"{metric}_num"] = sums["num"][vm_ends]
+            state[f"{metric}_den"] = sums["den"][vm_ends]
+
+        if self.ewma_state is not None:
+            state = state.combine_first(self.ewma_state)[self.ewma_state.columns]
+        self.ewma_state = state
+        return features
+
+    def _keep_context(self, combined):
+        """Garde les lignes qui peuvent encore entrer dans une fenêtre."""
+        last_seen = combined.groupby("vm_id", sort=False)["timestamp"].transform("max")
+        recent = combined["timestamp"] > last_seen - self.max_window
+        context = combined[recent].copy()
+        context["position"] = -1
+        self.context = context
+
+
+def chunks_in_order(path, chunksize):
+    """
+    Vrai si, lu par blocs de `chunksize` lignes, le fichier ne présente à aucune VM
+    un horodatage antérieur à ceux de ses blocs précédents (condition du mode par
+    blocs, voir RollingFeatures._check_order). Seules vm_id et timestamp sont lues.
+    """
+    last_seen = pd.Series(dtype="datetime64[ns]")
+    for chunk in iter_table_chunks(
+        path, columns=["vm_id", "timestamp"], chunksize=chunksize
+    ):
+        rows = pd.DataFrame(
+            {
+                "vm_id": chunk["vm_id"].astype(object),
+                "timestamp": pd.to_datetime(chunk["timestamp"], errors="coerce"),
+            }
+        ).dropna()
+        if rows.empty:
+            continue
+        if (rows["timestamp"] < rows["vm_id"].map(last_seen)).any():
+            return False
+        latest = rows.groupby("vm_id")["timestamp"].max()
+        last_seen = pd.concat([last_seen, latest]).groupby(level=0).max()
+    return True
+
+
+def _empty_features(features_args, columns):
+    """Résultat sans ligne, avec les colonnes produites (fichier vide mais lisible)."""
+    return RollingFeatures(**features_args).update(pd.DataFrame(columns=columns))
+
+
+def _rolling_by_partition(path, writer, work_dir, features_args, columns, chunksize):
+    """
+    Indicateurs d'un fichier dont l'ordre ne convient pas au mode par blocs : les
+    lignes sont réparties par VM (hash de vm_id) dans des fichiers temporaires assez
+    petits pour la mémoire, chaque partition est traitée en une fois, puis les
+    résultats sont fusionnés dans l'ordre des lignes d'origine.
+    """
+    partitions = max(2, -(-os.path.getsize(path) // CHUNKED_THRESHOLD_BYTES) + 1)
+    with tempfile.TemporaryDirectory(dir=work_dir) as tmp_dir:
+        part_paths = [dataset_path(tmp_dir, f"part_{i}") for i in range(partitions)]
+        part_writers = [open_table_writer(part_path) for part_path in part_paths]
+        try:
+            start = 0
+            for chunk in iter_table_chunks(path, columns=columns, chunksize=chunksize):
+                chunk = chunk.reset_index(drop=True)
+                chunk[ROW_COLUMN] = np.arange(start, start + len(chunk))
+                start += len(chunk)
+                buckets = (
+                    pd.util.hash_pandas_object(
+                        chunk["vm_id"].astype(object), index=False
+                    ).to_numpy()
+                    % partitions
+                )
+                for i, part_writer in enumerate(part_writers):
+                    part = chunk[buckets == i]
+                    if not part.empty:
+                        part_writer.write(part)
+        finally:
+            for part_writer in part_writers:
+                part_writer.close()
+
+        # Chaque partition (VM disjointes) en mémoire, lignes dans l'ordre d'origine
+        result_paths = []
+        for i, part_path in enumerate(part_paths):
+            if not os.path.exists(part_path):
+                continue
+            part = load_dataset(tmp_dir, f"part_{i}", compact=False)
+            result = RollingFeatures(**features_args).update(part)
+            result[ROW_COLUMN] = part[ROW_COLUMN].to_numpy()
+            result_path = dataset_path(tmp_dir, f"result_{i}")
+            save_dataset(result, tmp_dir, f"result_{i}", export_csv=False)
+            result_paths.append(result_path)
+        if not result_paths:
+            # Aucune ligne : le fichier de sortie est tout de même écrit
+            writer.write(_empty_features(features_args, columns))
+            return
+
+        # Fusion par tranches de numéros de ligne (chaque résultat est déjà trié)
+        readers = [
+            iter_table_chunks(result_path, chunksize=chunksize)
+            for result_path in result_paths
+        ]
+        buffers = [None] * len(readers)
+        for end in range(chunksize, start + chunksize, chunksize):
+            parts = []
+            for i, reader in enumerate(readers):
+                # Lire jusqu'à dépasser la tranche (ou épuiser le résultat)
+                while buffers[i] is None or (
+                    buffers[i].empty or buffers[i][ROW_COLUMN].iloc[-1] < end
+                ):
+                    block = next(reader, None)
+                    if block is None:
+                        break
+                    buffers[i] = pd.concat([buffers[i], block], ignore_index=True)
+                if buffers[i] is None:
+                    continue
+                taken = buffers[i][ROW_COLUMN] < end
+                parts.append(buffers[i][taken])
+                buffers[i] = buffers[i][~taken]
+            block = pd.concat(parts).sort_values(ROW_COLUMN)
+            writer.write(block.drop(columns=ROW_COLUMN).reset_index(drop=True))
+
+
+def compute_rolling_features(
+    input_dir=CLEANED_DATA_DIR,
+    output_dir=CLEANED_DATA_DIR,
+    windows=ROLLING_WINDOWS,
+    halflife=EWMA_HALFLIFE,
+    chunksize=None,
+):
+    """
+    Produit le dataset des indicateurs glissants par VM.
+    :param chunksize: Lecture par blocs de `chunksize` lignes ; par défaut, seulement
+        au-delà de CHUNKED_THRESHOLD_BYTES. Si les horodatages de chaque VM ne sont
+        pas croissants d'un bloc à l'autre, les lignes sont d'abord réparties par VM
+        (voir _rolling_by_partition) : le résultat est celui du mode en mémoire.
+    """
+    path = find_dataset(input_dir, SOURCE_DATASET)
+    if chunksize is None and os.path.getsize(path) > CHUNKED_THRESHOLD_BYTES:
+        chunksize = CHUNK_ROWS
+    features_args = {"windows": windows, "halflife": halflife}
+    columns = ["vm_id", "timestamp"] + ROLLING_METRICS
+
+    if chunksize is None:
+        df = load_dataset(input_dir, SOURCE_DATASET, columns=columns)
+        save_dataset(
+            RollingFeatures(**features_args).update(df), output_dir, ROLLING_DATASET
+        )
+        return
+
+    writer = open_table_writer(dataset_path(output_dir, ROLLING_DATASET))
+    try:
+        if not chunks_in_order(path, chunksize):
+            print(
+                f"{SOURCE_DATASET} n'est pas trié par VM et horodatage : "
+                "répartition par VM avant le calcul."
+            )
+            _rolling_by_partition(
+                path, writer, output_dir, features_args, columns, chunksize
+            )
+            return
+        features = RollingFeatures(**features_args)
+        written = False
+        for chunk in iter_table_chunks(path, columns=columns, chunksize=chunksize):
+            writer.write(features.update(chunk))
+            written = True
+        if not written:
+            writer.write(_empty_features(features_args, columns))
+    finally:
+        writer.close()
+
+
+def run(force=False, windows=ROLLING_WINDOWS, halflife=EWMA_HALFLIFE):
+    """Indicateurs glissants incrémentaux : sautés si les métriques nettoyées, les
+    paramètres et le code n'ont pas changé (voir build_cache)."""
+    return run_cached(
+        "rolling_features",
+        lambda: compute_rolling_features(windows=windows, halflife=halflife),
+        inputs=[find_dataset(CLEANED_DATA_DIR, SOURCE_DATASET)],
+        outputs=[dataset_path(CLEANED_DATA_DIR, ROLLING_DATASET)],
+        code_files=[os.path.abspath(__file__)],
+        params={"windows": list(windows), "halflife": halflife},
+        force=force,
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Indicateurs glissants par VM.")
+    parser.add_argument(
+        "--force", action="store_true", help="Ignorer le cache incrémental"
+    )
+    parser.add_argument(
+        "--windows",
+        nargs="+",
+        default=ROLLING_WINDOWS,
+        help="Fenêtres de temps (ex. 1h 6h 24h)",
+    )
+    parser.add_argument("--halflife", default=EWMA_HALFLIFE, help="Demi-vie de l'EWMA")
+    args = parser.parse_args()
+    run(force=args.force, windows=args.windows, halflife=args.halflife)
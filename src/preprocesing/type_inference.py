@@ -0,0 +1,156 @@
+import os
+import sys
+import json
+import pandas as pd
+from pandas.tseries.api import guess_datetime_format
+
+# Gestion dynamique des chemins : ROOT_DIR = racine du projet
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if __package__ in (None, ""):
+    # Lancé comme script : la racine du projet n'est pas encore dans sys.path
+    sys.path.append(ROOT_DIR)
+
+# Import des chemins définis dans paths.py
+from paths import SCHEMA_DIR
+
+# Nombre de valeurs examinées pour deviner le format d'une colonne de dates
+SAMPLE_SIZE = 1000
+
+# Seuil au-delà duquel une colonne numérique est considérée comme un timestamp Unix
+UNIX_TIMESTAMP_THRESHOLD = 1000000000
+
+# Version du format des schémas en cache (à incrémenter si les règles changent)
+SCHEMA_VERSION = 1
+
+
+def _guess_format(series, sample_size=SAMPLE_SIZE):
+    """
+    Devine le format d'une colonne de dates textuelles à partir d'un échantillon.
+    Comme pandas, le format retenu est celui de la première valeur exploitable ; il
+    n'est gardé que s'il permet de lire tout l'échantillon, sinon on renvoie None et
+    pandas analysera les valeurs une à une.
+    """
+    sample = series.dropna().head(sample_size).astype(str)
+    fmt = None
+    for value in sample:
+        fmt = guess_datetime_format(value)
+        if fmt is not None:
+            break
+    if fmt is None:
+        return None
+
+    parsed = pd.to_datetime(sample, format=fmt, errors="coerce")
+    reference = pd.to_datetime(sample, errors="coerce")
+    if not parsed.equals(reference):
+        return None
+    return fmt
+
+
+def infer_schema(df, timestamp_columns=None, sample_size=SAMPLE_SIZE):
+    """
+    Détermine le type de chaque colonne à convertir en dates.
+    - "unix_timestamp" : colonne numérique dont le maximum dépasse UNIX_TIMESTAMP_THRESHOLD
+      (ou listée dans `timestamp_columns`, calculée sur le fichier entier en streaming) ;
+    - "datetime" : colonne dont le nom contient "date" ou "time", avec le format deviné
+      sur un échantillon.
+    Les autres colonnes sont absentes du schéma et restent inchangées.
+    """
+    schema = {}
+    for col in df.columns:
+        if df[col].dtype in ["int64", "float64"]:
+            if timestamp_columns is None:
+                is_timestamp = df[col].max() > UNIX_TIMESTAMP_THRESHOLD
+            else:
+                is_timestamp = col in timestamp_columns
+            if is_timestamp:
+                schema[col] = {"type": "unix_timestamp"}
+                continue
+
+        if "date" in col or "time" in col:
+            fmt = None
+            if df[col].dtype == object:
+                fmt = _guess_format(df[col], sample_size=sample_size)
+            schema[col] = {"type": "datetime", "format": fmt}
+    return schema
+
+
+def apply_schema(df, schema):
+    """Convertit les colonnes du schéma en dates, colonne par colonne (opérations vectorisées)."""
+    for col, spec in schema.items():
+        if col not in df.columns:
+            continue
+        try:
+            if spec["type"] == "unix_timestamp":
+                if df[col].dtype not in ["int64", "float64"]:
+                    continue
+                converted = pd.to_datetime(df[col], unit="s", errors="coerce")
+            else:
+                converted = pd.to_datetime(
+                    df[col], format=spec.get("format"), errors="coerce"
+                )
+            # Gérer les dates incohérentes (comme 1970-01-01)
+            df[col] = converted.mask(converted.dt.year == 1970)
+        except Exception:
+            pass  # Si la conversion échoue, on laisse les valeurs inchangées
+    return df
+
+
+def _schema_path(source_path):
+    return os.path.join(SCHEMA_DIR, f"{os.path.basename(source_path)}.schema.json")
+
+
+def _source_signature(source_path):
+    stat = os.stat(source_path)
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def load_cached_schema(source_path, columns):
+    """Renvoie le schéma en cache de `source_path` s'il est encore valide, sinon None."""
+    try:
+        with open(_schema_path(source_path), "r", encoding="utf-8") as f:
+            cached = json.load(f)
+        signature = _source_signature(source_path)
+    except (OSError, ValueError):
+        return None
+
+    if (
+        cached.get("version") != SCHEMA_VERSION
+        or cached.get("source") != os.path.abspath(source_path)
+        or cached.get("signature") != signature
+        or cached.get("columns") != list(columns)
+    ):
+        return None
+    return cached["schema"]
+
+
+def save_schema(source_path, columns, schema):
+    """Enregistre le schéma inféré pour `source_path` dans SCHEMA_DIR."""
+    os.makedirs(SCHEMA_DIR, exist_ok=True)
+    cached = {
+        "version": SCHEMA_VERSION,
+        "source": os.path.abspath(source_path),
+        "signature": _source_signature(source_path),
+        "columns": list(columns),
+        "schema": schema,
+    }
+    with open(_schema_path(source_path), "w", encoding="utf-8") as f:
+        json.dump(cached, f, indent=2)
+
+
+def resolve_schema(df, source_path=None, timestamp_columns=None):
+    """
+    Schéma de `df` : relu depuis le cache si la source n'a pas changé, sinon inféré
+    (puis mis en cache lorsque `source_path` est fourni).
+    """
+    if source_path is not None:
+        schema = load_cached_schema(source_path, df.columns)
+        if schema is not None:
+            return schema
+
+    schema = infer_schema(df, timestamp_columns=timestamp_columns)
+    if source_path is not None:
+        try:
+            save_schema(source_path, df.columns, schema)
+        except OSError as e:
+            print(f"Impossible d'enregistrer le schéma de {source_path} : {e}")
+    return schema
@@ -0,0 +1,126 @@
+import os
+import sys
+import numpy as np
+import pandas as pd
+
+# Gestion dynamique des chemins : ROOT_DIR = racine du projet
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if __package__ in (None, ""):
+    # Lancé comme script : la racine du projet n'est pas encore dans sys.path
+    sys.path.append(ROOT_DIR)
+
+# --- États d'agrégation fusionnables ---
+#
+# Pour chaque clé et chaque colonne, on garde somme, nombre de valeurs, somme des
+# carrés, minimum et maximum. Deux états se fusionnent sans revenir aux lignes
+# d'origine : l'état de l'historique plus celui d'un nouveau lot donne l'état de
+# l'ensemble, et les moyennes (ou écarts-types) s'en déduisent.
+
+STATE_STATS = ["sum", "count", "sumsq", "min", "max"]
+
+
+def state_column(column, stat):
+    return f"{column}_{stat}"
+
+
+def aggregate_state(df, key, columns):
+    """
+    État d'agrégation de `df` par `key` pour les colonnes `columns`.
+    Les lignes sans clé sont ignorées, comme dans un groupby.
+    :return: DataFrame indexé par la clé, une colonne par (colonne, statistique).
+    """
+    values = pd.DataFrame(
+        {
+            col: pd.to_numeric(df[col], errors="coerce").astype("float64")
+            for col in columns
+        }
+    )
+    squares = values.pow(2).add_suffix("_sumsq")
+
+    # Un seul regroupement (factorisation des clés) pour toutes les statistiques ;
+    # les clés catégorielles sont regroupées par leurs codes
+    grouped = pd.concat([values, squares], axis=1).groupby(
+        df[key].rename(key), observed=True, sort=True
+    )
+    sums = grouped.sum()
+    counts = grouped[columns].count()
+    mins = grouped[columns].min()
+    maxs = grouped[columns].max()
+
+    state = pd.DataFrame(index=sums.index)
+    for col in columns:
+        state[state_column(col, "sum")] = sums[col]
+        state[state_column(col, "count")] = counts[col]
+        state[state_column(col, "sumsq")] = sums[f"{col}_sumsq"]
+        state[state_column(col, "min")] = mins[col]
+        state[state_column(col, "max")] = maxs[col]
+    if isinstance(state.index, pd.CategoricalIndex):
+        state.index = state.index.astype(state.index.categories.dtype)
+    return state
+
+
+def merge_states(left, right):
+    """Fusionne deux états d'agrégation (clés réunies, triées)."""
+    index = left.index.union(right.index).sort_values()
+    left = left.reindex(index)
+    right = right.reindex(index)
+    merged = pd.DataFrame(index=index)
+    for name in left.columns:
+        stat = name.rsplit("_", 1)[1]
+        a, b = left[name].to_numpy(), right[name].to_numpy()
+        if stat == "min":
+            merged[name] = np.fmin(a, b)
+        elif stat == "max":
+            merged[name] = np.fmax(a, b)
+        else:
+            merged[name] = np.nan_to_num(a) + np.nan_to_num(b)
+    for name in merged.columns:
+        if name.endswith("_count"):
+            merged[name] = merged[name].astype("int64")
+    return merged
+
+
+def state_mean(state, column):
+    """Moyenne par clé (NaN pour une clé sans valeur)."""
+    count = state[state_column(column, "count")]
+    return state[state_column(column, "sum")] / count.where(count > 0)
+
+
+def state_std(state, column):
+    """Écart-type (échantillon) par clé, comme pandas (NaN pour moins de 2 valeurs)."""
+    count = state[state_column(column, "count")]
+    mean = state_mean(state, column)
+    variance = (state[state_column(column, "sumsq")] - count * mean**2) / (count - 1)
+    return np.sqrt(variance.clip(lower=0)).where(count > 1)
+
+
+def state_to_frame(state):
+    """État sous forme de table (la clé devient une colonne) pour l'enregistrement."""
+    return state.reset_index()
+
+
+def state_from_frame(df, key):
+    """État relu depuis sa table."""
+    if isinstance(df[key].dtype, pd.CategoricalDtype):
+        df = df.astype({key: df[key].cat.categories.dtype})
+    return df.set_index(key).sort_index()
+
+
+def lookup(values_by_key, keys):
+    """
+    Valeur associée à la clé de chaque ligne (NaN pour une clé absente ou manquante).
+    :param values_by_key: Series indexée par la clé (par ex. state_mean(...)).
+    :param keys: Colonne des clés, éventuellement catégorielle.
+    """
+    if isinstance(keys.dtype, pd.CategoricalDtype):
+        # Recherche sur les seules catégories, puis report par les codes des lignes
+        positions = values_by_key.index.get_indexer(keys.cat.categories)
+        codes = keys.cat.codes.to_numpy()
+        positions = np.where(codes >= 0, positions[codes], -1)
+    else:
+        positions = values_by_key.index.get_indexer(keys)
+    values = values_by_key.to_numpy(dtype="float64")
+    if len(values) == 0:
+        return pd.Series(np.nan, index=keys.index)
+    result = np.where(positions >= 0, values[positions], np.nan)
+    return pd.Series(result, index=keys.index)
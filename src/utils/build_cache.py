@@ -0,0 +1,154 @@
+import os
+import sys
+import json
+import threading
+import hashlib
+
+# Gestion dynamique des chemins : ROOT_DIR = racine du projet
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if __package__ in (None, ""):
+    # Lancé comme script : la racine du projet n'est pas encore dans sys.path
+    sys.path.append(ROOT_DIR)
+
+# Import des chemins définis dans paths.py
+from paths import BUILD_CACHE_PATH
+from src.utils.digests import DigestCache, stat_key
+
+# Version du format du cache (à incrémenter si le calcul des empreintes change)
+CACHE_VERSION = 2
+
+# Les étapes lancées en parallèle dans un même processus (src/pipeline.py) mettent à
+# jour le cache l'une après l'autre
+_record_lock = threading.Lock()
+
+# Fichiers de code dont dépendent toutes les étapes
+COMMON_CODE_FILES = [
+    os.path.join(ROOT_DIR, "paths.py"),
+    os.path.join(ROOT_DIR, "src", "utils", "storage.py"),
+    os.path.join(ROOT_DIR, "src", "utils", "dtypes.py"),
+]
+
+
+class BuildCache:
+    """
+    Cache incrémental du pipeline, adressé par contenu.
+    Pour chaque étape, on enregistre une empreinte calculée à partir du contenu de ses
+    entrées et de son code, ainsi que l'état de ses sorties. Une étape dont l'empreinte
+    n'a pas changé et dont les sorties sont intactes n'est pas relancée.
+    Les hash de fichiers viennent du DigestCache partagé (mémorisés par taille, mtime
+    et inode) pour ne pas relire un fichier inchangé.
+    """
+
+    def __init__(self, path=None, digest_cache=None):
+        self.path = path or BUILD_CACHE_PATH
+        self.digest_cache = digest_cache or DigestCache()
+        self.stages = {}
+        self.load()
+
+    def load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get("version") == CACHE_VERSION:
+            self.stages = data.get("stages", {})
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        data = {"version": CACHE_VERSION, "stages": self.stages}
+        # Écriture atomique pour ne jamais laisser un cache à moitié écrit
+        tmp_path = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2)
+        os.replace(tmp_path, self.path)
+        self.digest_cache.save()
+
+    def file_digest(self, path):
+        """Hash SHA-256 du contenu de `path` (None si le fichier n'existe pas)."""
+        digests = self.digest_cache.get(path, ("sha256",))
+        return digests["sha256"] if digests else None
+
+    def fingerprint(self, inputs, code_files, params=None):
+        """Empreinte d'une étape : contenu des entrées, du code et paramètres."""
+        hasher = hashlib.sha256()
+        for kind, paths in (("input", inputs), ("code", code_files)):
+            for path in sorted(os.path.abspath(p) for p in paths):
+                hasher.update(f"{kind}:{path}:{self.file_digest(path)}\n".encode())
+        hasher.update(json.dumps(params, sort_keys=True, default=str).encode())
+        return hasher.hexdigest()
+
+    def _outputs_state(self, outputs):
+        state = {}
+        for path in outputs:
+            try:
+                state[os.path.abspath(path)] = stat_key(path)
+            except OSError:
+                state[os.path.abspath(path)] = None
+        return state
+
+    def is_up_to_date(self, stage, fingerprint, outputs):
+        """Vrai si l'étape a déjà été exécutée avec cette empreinte et que ses sorties
+        n'ont été ni supprimées ni modifiées depuis."""
+        recorded = self.stages.get(stage)
+        if not recorded or recorded["fingerprint"] != fingerprint:
+            return False
+        state = self._outputs_state(outputs)
+        return None not in state.values() and state == recorded["outputs"]
+
+    def record(self, stage, fingerprint, outputs):
+        self.stages[stage] = {
+            "fingerprint": fingerprint,
+            "outputs": self._outputs_state(outputs),
+        }
+
+
+def run_cached(stage, func, inputs, outputs, code_files, params=None, force=False):
+    """
+    Exécute `func()` sauf si l'étape `stage` est à jour.
+    :param inputs: Fichiers lus par l'étape.
+    :param outputs: Fichiers produits par l'étape.
+    :param code_files: Fichiers de code de l'étape (COMMON_CODE_FILES est ajouté).
+    :param params: Paramètres influant sur le résultat (sérialisables en JSON).
+    :param force: Relancer l'étape même si elle est à jour.
+    :return: True si l'étape a été exécutée, False si elle a été sautée.
+    """
+    cache = BuildCache()
+    code_files = list(code_files) + COMMON_CODE_FILES
+    fingerprint = cache.fingerprint(inputs, code_files, params)
+    if not force and cache.is_up_to_date(stage, fingerprint, outputs):
+        print(f"[cache] Étape '{stage}' à jour, exécution sautée.")
+        cache.save()  # Conserver les hash nouvellement calculés
+        return False
+
+    func()
+
+    # Recharger le cache : une autre étape a pu l'enrichir pendant l'exécution
+    with _record_lock:
+        latest = BuildCache(digest_cache=cache.digest_cache)
+        latest.record(stage, fingerprint, outputs)
+        latest.save()
+    return True
+
+
+def is_cached(stage, inputs, outputs, code_files, params=None):
+    """Vrai si l'étape `stage` est à jour (même test que run_cached, sans l'exécuter)."""
+    cache = BuildCache()
+    code_files = list(code_files) + COMMON_CODE_FILES
+    up_to_date = cache.is_up_to_date(
+        stage, cache.fingerprint(inputs, code_files, params), outputs
+    )
+    cache.save()
+    return up_to_date
+
+
+def record_cached(stage, inputs, outputs, code_files, params=None):
+    """
+    Enregistre l'étape `stage` comme à jour pour ces entrées et ces sorties, après une
+    mise à jour faite hors de run_cached (voir enrich_and_summarize.fold_batch).
+    """
+    with _record_lock:
+        cache = BuildCache()
+        code_files = list(code_files) + COMMON_CODE_FILES
+        cache.record(stage, cache.fingerprint(inputs, code_files, params), outputs)
+        cache.save()
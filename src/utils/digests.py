@@ -0,0 +1,133 @@
+import os
+import sys
+import json
+import threading
+import mmap
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+
+# Gestion dynamique des chemins : ROOT_DIR = racine du projet
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if __package__ in (None, ""):
+    # Lancé comme script : la racine du projet n'est pas encore dans sys.path
+    sys.path.append(ROOT_DIR)
+
+# Import des chemins définis dans paths.py
+from paths import DIGEST_CACHE_PATH
+
+# Taille des tranches passées à hashlib (au-delà de 2 Ko, hashlib libère le GIL, ce
+# qui permet de hacher plusieurs fichiers en parallèle avec des threads)
+HASH_BLOCK_SIZE = 8 * 1024 * 1024
+
+# Version du format du cache (à incrémenter si le calcul des hash change)
+CACHE_VERSION = 1
+
+
+def compute_digests(path, algorithms=("sha256",)):
+    """
+    Calcule en une seule lecture les hash demandés (ex. "md5", "sha256") d'un fichier.
+    Le fichier est projeté en mémoire (mmap) et haché par grandes tranches.
+    """
+    hashers = {algorithm: hashlib.new(algorithm) for algorithm in algorithms}
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size:  # mmap refuse les fichiers vides
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                view = memoryview(mapped)
+                try:
+                    for start in range(0, len(view), HASH_BLOCK_SIZE):
+                        block = view[start : start + HASH_BLOCK_SIZE]
+                        for hasher in hashers.values():
+                            hasher.update(block)
+                        block.release()
+                finally:
+                    view.release()
+    return {algorithm: hasher.hexdigest() for algorithm, hasher in hashers.items()}
+
+
+def stat_key(path):
+    """Identité d'un fichier sur le disque : (taille, mtime, inode)."""
+    stat = os.stat(path)
+    return [stat.st_size, stat.st_mtime_ns, stat.st_ino]
+
+
+class DigestCache:
+    """
+    Cache persistant des hash de fichiers, indexé par chemin et invalidé dès que la
+    taille, la date de modification ou l'inode du fichier change.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or DIGEST_CACHE_PATH
+        self.entries = {}
+        # Vrai si un hash a été calculé depuis le chargement (sinon rien à écrire)
+        self.changed = False
+        self.load()
+
+    def load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get("version") == CACHE_VERSION:
+            self.entries = data.get("entries", {})
+
+    def save(self):
+        if not self.changed:
+            return
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        # Fusion avec les entrées écrites entre-temps par un autre processus
+        latest = DigestCache(self.path)
+        latest.entries.update(self.entries)
+        data = {"version": CACHE_VERSION, "entries": latest.entries}
+        # Écriture atomique pour ne jamais laisser un cache à moitié écrit
+        tmp_path = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2)
+        os.replace(tmp_path, self.path)
+        self.changed = False
+
+    def get(self, path, algorithms=("sha256",)):
+        """
+        Hash de `path` pour les algorithmes demandés, recalculés uniquement s'ils ne
+        sont pas en cache pour l'état actuel du fichier. None si le fichier n'existe pas.
+        """
+        path = os.path.abspath(path)
+        try:
+            key = stat_key(path)
+        except OSError:
+            return None
+
+        entry = self.entries.get(path)
+        if not entry or entry["stat"] != key:
+            entry = {"stat": key, "digests": {}}
+        missing = [a for a in algorithms if a not in entry["digests"]]
+        if missing:
+            entry["digests"].update(compute_digests(path, missing))
+            self.entries[path] = entry
+            self.changed = True
+        return {algorithm: entry["digests"][algorithm] for algorithm in algorithms}
+
+
+def digest_files(paths, algorithms=("sha256",), workers=None, cache=None):
+    """
+    Hache plusieurs fichiers en parallèle (threads) en s'appuyant sur le cache.
+    :param paths: Liste de chemins, ou dictionnaire chemin -> algorithmes propres à
+        chaque fichier (chaque fichier n'est lu qu'une fois).
+    :param workers: Nombre de threads (par défaut, un par cœur, 8 au maximum).
+    :param cache: DigestCache à utiliser (par défaut celui de DIGEST_CACHE_PATH, qui
+        est sauvegardé à la fin).
+    :return: Dictionnaire chemin -> {algorithme: hash} (None si le fichier manque).
+    """
+    if not isinstance(paths, dict):
+        paths = {path: algorithms for path in paths}
+    own_cache = cache is None
+    cache = cache or DigestCache()
+    workers = workers or min(8, os.cpu_count() or 1)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        results = dict(
+            zip(paths, executor.map(lambda p: cache.get(p, paths[p]), paths))
+        )
+    if own_cache:
+        cache.save()
+    return results
@@ -0,0 +1,243 @@
+import os
+import sys
+import json
+import time
+import numpy as np
+import pandas as pd
+
+# Gestion dynamique des chemins : ROOT_DIR = racine du projet
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if __package__ in (None, ""):
+    # Lancé comme script : la racine du projet n'est pas encore dans sys.path
+    sys.path.append(ROOT_DIR)
+
+# Import des chemins définis dans paths.py
+from paths import SCHEMA_DIR, MEMORY_LOG_PATH
+
+# Une colonne de texte devient catégorielle si son nombre de valeurs distinctes ne
+# dépasse pas cette proportion du nombre de valeurs renseignées
+CATEGORY_MAX_RATIO = 0.5
+
+# Entiers candidats, du plus petit au plus grand (signés : les soustractions restent
+# correctes)
+INTEGER_TYPES = ["int8", "int16", "int32"]
+
+# Version du format des schémas compacts (à incrémenter si les règles changent)
+DTYPES_VERSION = 1
+
+
+def _compact_dtype(series):
+    """Type compact d'une colonne, ou None si son type actuel doit être conservé."""
+    dtype = series.dtype
+    if pd.api.types.is_bool_dtype(dtype) or isinstance(dtype, pd.CategoricalDtype):
+        return None
+
+    if pd.api.types.is_integer_dtype(dtype):
+        if series.empty:
+            return None
+        low, high = series.min(), series.max()
+        for candidate in INTEGER_TYPES:
+            info = np.iinfo(candidate)
+            if np.dtype(candidate).itemsize >= dtype.itemsize:
+                return None
+            if info.min <= low and high <= info.max:
+                return candidate
+        return None
+
+    if dtype == "float64":
+        values = series.to_numpy()
+        as_float32 = values.astype("float32")
+        # Conversion sans perte : chaque valeur revient identique (NaN compris)
+        if np.array_equal(as_float32.astype("float64"), values, equal_nan=True):
+            return "float32"
+        return None
+
+    if dtype == object:
+        non_null = series.dropna()
+        if non_null.empty or pd.api.types.infer_dtype(non_null) != "string":
+            return None
+        if non_null.nunique() <= CATEGORY_MAX_RATIO * len(non_null):
+            return "category"
+    return None
+
+
+def infer_compact_schema(df):
+    """Types compacts des colonnes de `df` (seules les colonnes à convertir sont listées)."""
+    schema = {}
+    for col in df.columns:
+        target = _compact_dtype(df[col])
+        if target is not None:
+            schema[col] = target
+    return schema
+
+
+def apply_compact_schema(df, schema):
+    """
+    Convertit les colonnes de `df` selon `schema`.
+    Une conversion qui ferait perdre de l'information (valeur hors de l'intervalle
+    d'un entier, colonne de type inattendu) est ignorée.
+    """
+    for col, target in schema.items():
+        if col not in df.columns or df[col].dtype == target:
+            continue
+        series = df[col]
+        if target == "category":
+            if series.dtype != object:
+                continue
+        elif target == "float32":
+            if series.dtype != "float64":
+                continue
+        else:
+            if not pd.api.types.is_integer_dtype(series.dtype) or series.empty:
+                continue
+            info = np.iinfo(target)
+            if series.min() < info.min or series.max() > info.max:
+                continue
+        df[col] = series.astype(target)
+    return df
+
+
+# Au-delà de ce nombre de lignes, la taille des chaînes Python est estimée sur un
+# échantillon (la mesure exacte parcourt chaque objet)
+MEMORY_SAMPLE_ROWS = 10_000
+
+
+def memory_usage(df):
+    """Mémoire occupée par `df`, en octets (chaînes Python comprises)."""
+    # En float64 : les tailles estimées des colonnes objet ne sont pas entières
+    usage = df.memory_usage(index=True, deep=False).astype("float64")
+    objects = df.select_dtypes(include=["object"]).columns
+    if len(objects) == 0:
+        return int(usage.sum())
+    if len(df) <= MEMORY_SAMPLE_ROWS:
+        usage[objects] = df[objects].memory_usage(index=False, deep=True)
+    else:
+        sample = df[objects].sample(MEMORY_SAMPLE_ROWS, random_state=0)
+        scale = len(df) / MEMORY_SAMPLE_ROWS
+        usage[objects] = sample.memory_usage(index=False, deep=True) * scale
+    return int(usage.sum())
+
+
+def report_memory(name, rows, before, after, log=True, log_path=None):
+    """
+    Affiche l'empreinte mémoire avant/après et, si `log`, l'ajoute à l'historique CSV
+    `log_path` (MEMORY_LOG_PATH par défaut, lu au moment de l'appel).
+    """
+    saved = 100 * (1 - after / before) if before else 0.0
+    print(
+        f"[mémoire] {name} : {before / 1e6:.1f} Mo -> {after / 1e6:.1f} Mo "
+        f"(-{saved:.0f} %)"
+    )
+    if not log:
+        return
+    log_path = log_path or MEMORY_LOG_PATH
+    try:
+        os.makedirs(os.path.dirname(log_path), exist_ok=True)
+        write_header = not os.path.exists(log_path)
+        with open(log_path, "a", encoding="utf-8") as f:
+            if write_header:
+                f.write("timestamp,dataset,rows,bytes_before,bytes_after\n")
+            f.write(
+                f"{time.strftime('%Y-%m-%dT%H:%M:%S')},{name},{rows},{before},{after}\n"
+            )
+    except OSError as e:
+        print(f"Impossible d'enregistrer l'empreinte mémoire de {name} : {e}")
+
+
+def _dtypes_path(data_path):
+    return os.path.join(SCHEMA_DIR, f"{os.path.basename(data_path)}.dtypes.json")
+
+
+def _file_signature(data_path):
+    stat = os.stat(data_path)
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def load_compact_schema(data_path):
+    """
+    Schéma compact enregistré pour `data_path`, sous la forme (colonnes examinées,
+    schéma), ou None s'il est absent ou si le fichier a changé depuis.
+    """
+    try:
+        with open(_dtypes_path(data_path), "r", encoding="utf-8") as f:
+            cached = json.load(f)
+        signature = _file_signature(data_path)
+    except (OSError, ValueError):
+        return None
+    if (
+        cached.get("version") != DTYPES_VERSION
+        or cached.get("source") != os.path.abspath(data_path)
+        or cached.get("signature") != signature
+    ):
+        return None
+    return cached["columns"], cached["schema"]
+
+
+def save_compact_schema(data_path, columns, schema):
+    """Enregistre dans SCHEMA_DIR le schéma compact de `data_path`."""
+    os.makedirs(SCHEMA_DIR, exist_ok=True)
+    cached = {
+        "version": DTYPES_VERSION,
+        "source": os.path.abspath(data_path),
+        "signature": _file_signature(data_path),
+        "columns": list(columns),
+        "schema": schema,
+    }
+    with open(_dtypes_path(data_path), "w", encoding="utf-8") as f:
+        json.dump(cached, f, indent=2)
+
+
+def compact_dtypes(df, name=None, data_path=None, report=True, log=True, log_path=None):
+    """
+    Réduit l'empreinte mémoire de `df` : textes peu variés en catégories, entiers et
+    réels convertis vers le plus petit type qui ne perd aucune information.
+    :param name: Nom du dataset dans le rapport mémoire.
+    :param data_path: Fichier d'où vient `df` : le schéma compact enregistré à son
+        écriture (voir record_compact_schema) est réutilisé tant que le fichier ne
+        change pas ; seules les autres colonnes sont examinées. Rien n'est écrit.
+    :param report: Affiche la mémoire avant/après.
+    :param log: Ajoute aussi la mesure à l'historique CSV (voir report_memory).
+    :param log_path: Historique CSV de la mémoire (MEMORY_LOG_PATH par défaut).
+    """
+    before = memory_usage(df) if report else 0
+
+    columns, schema = [], {}
+    if data_path is not None:
+        cached = load_compact_schema(data_path)
+        if cached is not None:
+            columns, schema = cached
+    unseen = [col for col in df.columns if col not in columns]
+    if unseen:
+        schema = {**schema, **infer_compact_schema(df[unseen])}
+
+    df = apply_compact_schema(df, schema)
+    if report:
+        name = name or (os.path.basename(data_path) if data_path else "dataset")
+        report_memory(
+            name, len(df), before, memory_usage(df), log=log, log_path=log_path
+        )
+    return df
+
+
+def record_compact_schema(df, data_path):
+    """
+    Enregistre le schéma compact de `df`, qui vient d'être écrit dans `data_path` :
+    les colonnes déjà compactes gardent leur type (utile pour un CSV, qui ne le
+    conserve pas), les autres sont examinées. Les lectures suivantes du fichier
+    réutilisent ce schéma sans rien inférer ni écrire.
+    """
+    schema = {}
+    for col in df.columns:
+        dtype = df[col].dtype
+        if isinstance(dtype, pd.CategoricalDtype):
+            schema[col] = "category"
+        elif dtype.name in INTEGER_TYPES + ["float32"]:
+            schema[col] = dtype.name
+        else:
+            target = _compact_dtype(df[col])
+            if target is not None:
+                schema[col] = target
+    try:
+        save_compact_schema(data_path, list(df.columns), schema)
+    except OSError as e:
+        print(f"Impossible d'enregistrer le schéma de {data_path} : {e}")
@@ -1,62 +1,140 @@
 import os
 import sys
+import json
+import argparse
 import pandas as pd
 from datetime import datetime
 
 # Gestion dynamique des chemins : ROOT_DIR = racine du projet
 ROOT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-sys.path.append(ROOT_DIR)
+if __package__ in (None, ""):
+    # Lancé comme script : la racine du projet n'est pas encore dans sys.path
+    sys.path.append(ROOT_DIR)
 
 # Import des chemins définis dans paths.py
 from paths import PROCESSED_DATA_DIR, CLEANED_DATA_DIR
+from src.utils.storage import (
+    load_dataset,
+    save_dataset,
+    find_dataset,
+    dataset_path,
+    iter_table_chunks,
+)
+from src.utils.build_cache import run_cached
+from src.utils.sketches import (
+    HLL_PRECISION,
+    RELATIVE_ACCURACY,
+    hll_sketch,
+    merge_hll,
+    hll_estimate,
+    quantile_sketch,
+    merge_quantiles,
+    sketch_quantiles,
+)
+
+# Colonnes utilisées pour chaque résumé (seules celles-ci sont lues)
+SUMMARY_COLUMNS = {
+    "amazon_reviews_cleaned": ["productid", "score"],
+    "hr_dashboard_data_cleaned": [
+        "department",
+        "productivity_(%)",
+        "satisfaction_rate_(%)",
+        "joining_date",
+    ],
+    "project_tools_cleaned": ["final_selected_tool"],
+    "task_assignment_cleaned": ["category", "skill"],
+    "vmCloud_data_cleaned": [
+        "task_type",
+        "cpu_usage",
+        "memory_usage",
+        "network_traffic",
+    ],
+}
+
+
+# Résumés produits par cette étape
+SUMMARY_DATASETS = [
+    "amazon_reviews_summary",
+    "hr_dashboard_summary",
+    "project_tools_summary",
+    "task_assignment_summary",
+    "vmcloud_summary",
+]
+
+# Résumés approchés (mode --sketch) : valeurs distinctes et quantiles par clé, à partir
+# de sketches calculés bloc par bloc (la mémoire ne dépend que du nombre de clés et de
+# la précision). Les sketches sont enregistrés à côté des résumés et peuvent être
+# fusionnés avec ceux de nouvelles données (voir utils/sketches).
+SKETCH_SUMMARIES = {
+    "amazon_reviews": {
+        "source": "amazon_reviews_cleaned",
+        "key": "productid",
+        # Colonne du résumé -> colonne dont on compte les valeurs distinctes
+        "distinct": {"distinct_users": "userid"},
+        "quantiles": ["score"],
+        "summary": "amazon_reviews_sketch_summary",
+        "sketch": "amazon_reviews_sketch",
+    },
+    "vmcloud": {
+        "source": "vmCloud_data_cleaned",
+        "key": "task_type",
+        "distinct": {"distinct_vms": "vm_id"},
+        "quantiles": ["cpu_usage", "memory_usage"],
+        "summary": "vmcloud_sketch_summary",
+        "sketch": "vmcloud_sketch",
+    },
+}
+SKETCH_QUANTILES = [0.5, 0.95, 0.99]
+SKETCH_CHUNK_ROWS = 200_000
 
 
 # Chargement des fichiers nettoyés
-def load_cleaned_data():
-    amazon_reviews = pd.read_csv(
-        os.path.join(CLEANED_DATA_DIR, "amazon_reviews_cleaned.csv")
-    )
-    hr_dashboard = pd.read_csv(
-        os.path.join(CLEANED_DATA_DIR, "hr_dashboard_data_cleaned.csv")
-    )
-    project_tools = pd.read_csv(
-        os.path.join(CLEANED_DATA_DIR, "project_tools_cleaned.csv")
-    )
-    task_assignment = pd.read_csv(
-        os.path.join(CLEANED_DATA_DIR, "task_assignment_cleaned.csv")
-    )
-    vmCloud_data = pd.read_csv(
-        os.path.join(CLEANED_DATA_DIR, "vmCloud_data_cleaned.csv")
+def reference_day(reference_date=None):
+    """Date de référence de l'ancienneté ("AAAA-MM-JJ"), aujourd'hui par défaut."""
+    return pd.Timestamp(reference_date or pd.Timestamp.today()).strftime("%Y-%m-%d")
+
+
+def experience_years(joining_date, reference_date=None):
+    """
+    Ancienneté en années à la date `reference_date` (aujourd'hui par défaut). Les
+    étapes en cache passent ce jour dans leurs paramètres (voir run) : le résumé est
+    recalculé quand il change.
+    """
+    return (pd.Timestamp(reference_day(reference_date)) - joining_date).dt.days / 365.0
+
+
+def load_cleaned_data(directory=CLEANED_DATA_DIR):
+    amazon_reviews, hr_dashboard, project_tools, task_assignment, vmCloud_data = (
+        load_dataset(directory, name, columns=columns)
+        for name, columns in SUMMARY_COLUMNS.items()
     )
     return amazon_reviews, hr_dashboard, project_tools, task_assignment, vmCloud_data
 
 
-def feature_engineering():
+def feature_engineering(directory=CLEANED_DATA_DIR, reference_date=None):
     # Chargement des données nettoyées
     amazon_reviews, hr_dashboard, project_tools, task_assignment, vmCloud_data = (
-        load_cleaned_data()
+        load_cleaned_data(directory)
     )
 
     # Amazon Reviews Summary
     amazon_reviews["score"] = pd.to_numeric(amazon_reviews["score"], errors="coerce")
     amazon_summary = (
-        amazon_reviews.groupby("productid")
+        amazon_reviews.groupby("productid", observed=True)
         .agg(avg_score=("score", "mean"), num_reviews=("score", "count"))
         .reset_index()
     )
-    amazon_summary.to_csv(
-        os.path.join(CLEANED_DATA_DIR, "amazon_reviews_summary.csv"), index=False
-    )
+    save_dataset(amazon_summary, directory, "amazon_reviews_summary")
 
     # HR Dashboard Summary
     hr_dashboard["joining_date"] = pd.to_datetime(
         hr_dashboard["joining_date"], errors="coerce"
     )
-    hr_dashboard["experience"] = (
-        pd.Timestamp.now() - hr_dashboard["joining_date"]
-    ).dt.days / 365.0
+    hr_dashboard["experience"] = experience_years(
+        hr_dashboard["joining_date"], reference_date
+    )
     hr_summary = (
-        hr_dashboard.groupby("department")
+        hr_dashboard.groupby("department", observed=True)
         .agg(
             avg_productivity=("productivity_(%)", "mean"),
             avg_satisfaction=("satisfaction_rate_(%)", "mean"),
@@ -64,9 +142,7 @@ def feature_engineering():
         )
         .reset_index()
     )
-    hr_summary.to_csv(
-        os.path.join(CLEANED_DATA_DIR, "hr_dashboard_summary.csv"), index=False
-    )
+    save_dataset(hr_summary, directory, "hr_dashboard_summary")
 
     # Project Tools Summary
     project_tools["final_selected_tool"] = (
@@ -74,23 +150,19 @@ def feature_engineering():
     )
     tools_summary = project_tools["final_selected_tool"].value_counts().reset_index()
     tools_summary.columns = ["tool_name", "selection_count"]
-    tools_summary.to_csv(
-        os.path.join(CLEANED_DATA_DIR, "project_tools_summary.csv"), index=False
-    )
+    save_dataset(tools_summary, directory, "project_tools_summary")
 
     # Task Assignment Summary
     task_assignment_summary = (
-        task_assignment.groupby(["category", "skill"])
+        task_assignment.groupby(["category", "skill"], observed=True)
         .size()
         .reset_index(name="task_count")
     )
-    task_assignment_summary.to_csv(
-        os.path.join(CLEANED_DATA_DIR, "task_assignment_summary.csv"), index=False
-    )
+    save_dataset(task_assignment_summary, directory, "task_assignment_summary")
 
     # VMCloud Summary
     vmcloud_summary = (
-        vmCloud_data.groupby("task_type")
+        vmCloud_data.groupby("task_type", observed=True)
         .agg(
             avg_cpu_usage=("cpu_usage", "mean"),
             avg_memory_usage=("memory_usage", "mean"),
@@ -98,10 +170,186 @@ def feature_engineering():
         )
         .reset_index()
     )
-    vmcloud_summary.to_csv(
-        os.path.join(CLEANED_DATA_DIR, "vmcloud_summary.csv"), index=False
+    save_dataset(vmcloud_summary, directory, "vmcloud_summary")
+
+
+def build_sketches(
+    name,
+    directory=CLEANED_DATA_DIR,
+    precision=HLL_PRECISION,
+    relative_accuracy=RELATIVE_ACCURACY,
+    chunksize=SKETCH_CHUNK_ROWS,
+):
+    """
+    Sketches du résumé approché `name` (voir SKETCH_SUMMARIES), le dataset nettoyé
+    étant lu par blocs.
+    :return: Dictionnaire colonne distincte -> registres HyperLogLog, et
+        histogrammes des quantiles.
+    """
+    spec = SKETCH_SUMMARIES[name]
+    columns = [spec["key"]] + list(spec["distinct"].values()) + spec["quantiles"]
+    path = find_dataset(directory, spec["source"])
+
+    hll = {col: None for col in spec["distinct"].values()}
+    quantiles = None
+    for chunk in iter_table_chunks(path, columns=columns, chunksize=chunksize):
+        keys = chunk[spec["key"]]
+        for col, registers in hll.items():
+            chunk_registers = hll_sketch(keys, chunk[col], precision)
+            hll[col] = (
+                chunk_registers
+                if registers is None
+                else merge_hll(registers, chunk_registers)
+            )
+        chunk_quantiles = quantile_sketch(
+            keys, chunk, spec["quantiles"], relative_accuracy
+        )
+        quantiles = (
+            chunk_quantiles
+            if quantiles is None
+            else merge_quantiles(quantiles, chunk_quantiles)
+        )
+    return hll, quantiles
+
+
+def summary_from_sketches(name, hll, quantiles, params):
+    """Résumé approché (valeurs distinctes et quantiles par clé) tiré des sketches."""
+    spec = SKETCH_SUMMARIES[name]
+    columns = {}
+    for summary_col, col in spec["distinct"].items():
+        columns[summary_col] = hll_estimate(hll[col], params["precision"]).round()
+    estimates = sketch_quantiles(
+        quantiles, SKETCH_QUANTILES, params["relative_accuracy"]
+    )
+    for col in spec["quantiles"]:
+        by_key = estimates.xs(col, level="column")
+        for q in SKETCH_QUANTILES:
+            columns[f"{col}_p{round(q * 100)}"] = by_key[q]
+    summary = pd.concat(columns, axis=1).sort_index()
+    return summary.rename_axis(spec["key"]).reset_index()
+
+
+def save_sketches(name, hll, quantiles, params, directory=CLEANED_DATA_DIR):
+    """Enregistre les sketches (une table par sketch) et leurs paramètres (JSON)."""
+    prefix = SKETCH_SUMMARIES[name]["sketch"]
+    for col, registers in hll.items():
+        save_dataset(registers, directory, f"{prefix}_hll_{col}")
+    save_dataset(quantiles, directory, f"{prefix}_quantiles")
+    with open(os.path.join(directory, f"{prefix}.json"), "w", encoding="utf-8") as f:
+        json.dump(params, f, indent=2)
+
+
+def load_sketches(name, directory=CLEANED_DATA_DIR):
+    """Relit les sketches enregistrés par save_sketches : (hll, quantiles, params)."""
+    spec = SKETCH_SUMMARIES[name]
+    prefix = spec["sketch"]
+    with open(os.path.join(directory, f"{prefix}.json"), "r", encoding="utf-8") as f:
+        params = json.load(f)
+    hll = {
+        col: load_dataset(directory, f"{prefix}_hll_{col}", compact=False)
+        for col in spec["distinct"].values()
+    }
+    quantiles = load_dataset(directory, f"{prefix}_quantiles", compact=False)
+    return hll, quantiles, params
+
+
+def sketch_outputs(directory=CLEANED_DATA_DIR):
+    """Fichiers produits par sketch_feature_engineering."""
+    outputs = []
+    for spec in SKETCH_SUMMARIES.values():
+        names = [spec["summary"], f"{spec['sketch']}_quantiles"] + [
+            f"{spec['sketch']}_hll_{col}" for col in spec["distinct"].values()
+        ]
+        outputs += [dataset_path(directory, name) for name in names]
+        outputs.append(os.path.join(directory, f"{spec['sketch']}.json"))
+    return outputs
+
+
+def sketch_feature_engineering(
+    directory=CLEANED_DATA_DIR,
+    precision=HLL_PRECISION,
+    relative_accuracy=RELATIVE_ACCURACY,
+):
+    """Résumés approchés des avis et des métriques cloud, avec leurs sketches."""
+    params = {"precision": precision, "relative_accuracy": relative_accuracy}
+    for name, spec in SKETCH_SUMMARIES.items():
+        hll, quantiles = build_sketches(name, directory, precision, relative_accuracy)
+        save_sketches(name, hll, quantiles, params, directory)
+        summary = summary_from_sketches(name, hll, quantiles, params)
+        save_dataset(summary, directory, spec["summary"])
+
+
+def run(force=False, reference_date=None):
+    """Calcul incrémental des résumés : sauté si les données nettoyées, le jour de
+    référence de l'ancienneté et le code n'ont pas changé depuis la dernière
+    exécution (voir build_cache)."""
+    reference_date = reference_day(reference_date)
+    return run_cached(
+        "summary",
+        lambda: feature_engineering(reference_date=reference_date),
+        inputs=[find_dataset(CLEANED_DATA_DIR, name) for name in SUMMARY_COLUMNS],
+        outputs=[dataset_path(CLEANED_DATA_DIR, name) for name in SUMMARY_DATASETS],
+        code_files=[os.path.abspath(__file__)],
+        params={"reference_date": reference_date},
+        force=force,
+    )
+
+
+def run_sketches(
+    force=False, precision=HLL_PRECISION, relative_accuracy=RELATIVE_ACCURACY
+):
+    """Résumés approchés, sautés si les données, les paramètres et le code n'ont pas
+    changé (voir build_cache)."""
+    sources = [spec["source"] for spec in SKETCH_SUMMARIES.values()]
+    return run_cached(
+        "sketch_summary",
+        lambda: sketch_feature_engineering(
+            precision=precision, relative_accuracy=relative_accuracy
+        ),
+        inputs=[find_dataset(CLEANED_DATA_DIR, name) for name in sources],
+        outputs=sketch_outputs(),
+        code_files=[
+            os.path.abspath(__file__),
+            os.path.join(ROOT_DIR, "src", "utils", "sketches.py"),
+        ],
+        params={"precision": precision, "relative_accuracy": relative_accuracy},
+        force=force,
     )
 
 
 if __name__ == "__main__":
-    feature_engineering()
+    parser = argparse.ArgumentParser(description="Résumés des données nettoyées.")
+    parser.add_argument(
+        "--force", action="store_true", help="Ignorer le cache incrémental"
+    )
+    parser.add_argument(
+        "--sketch",
+        action="store_true",
+        help="Résumés approchés (valeurs distinctes, quantiles) par sketches",
+    )
+    parser.add_argument(
+        "--hll-precision",
+        type=int,
+        default=HLL_PRECISION,
+        help="Bits de registre HyperLogLog (erreur ~ 1.04 / sqrt(2**p))",
+    )
+    parser.add_argument(
+        "--relative-accuracy",
+        type=float,
+        default=RELATIVE_ACCURACY,
+        help="Erreur relative maximale des quantiles",
+    )
+    parser.add_argument(
+        "--reference-date",
+        help="Date de calcul de l'ancienneté (AAAA-MM-JJ, aujourd'hui par défaut)",
+    )
+    args = parser.parse_args()
+
+    if args.sketch:
+        run_sketches(
+            force=args.force,
+            precision=args.hll_precision,
+            relative_accuracy=args.relative_accuracy,
+        )
+    else:
+        run(force=args.force, reference_date=args.reference_date)
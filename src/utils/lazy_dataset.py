@@ -0,0 +1,168 @@
+import os
+import sys
+import numpy as np
+import pandas as pd
+
+# Gestion dynamique des chemins : ROOT_DIR = racine du projet
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if __package__ in (None, ""):
+    # Lancé comme script : la racine du projet n'est pas encore dans sys.path
+    sys.path.append(ROOT_DIR)
+
+from src.utils import sqlite_source
+
+# Taille des blocs lus pour compter les lignes d'un CSV
+COUNT_BLOCK_SIZE = 8 * 1024 * 1024
+
+# Nombre de lignes lues pour déterminer le schéma (types des colonnes)
+SCHEMA_SAMPLE_ROWS = 1000
+
+# Nombre de lignes utilisées par défaut pour les statistiques échantillonnées
+STATS_SAMPLE_ROWS = 10_000
+
+QUOTE = ord('"')
+NEWLINE = ord("\n")
+
+
+def count_csv_records(path, block_size=COUNT_BLOCK_SIZE):
+    """
+    Compte les enregistrements d'un CSV (en-tête compris) en parcourant les octets
+    du fichier, sans les analyser.
+    Les retours à la ligne situés entre guillemets (texte des avis sur plusieurs
+    lignes) ne terminent pas un enregistrement : on suit la parité du nombre de
+    guillemets, ce qui reste juste avec les guillemets doublés ("") du format CSV.
+    """
+    records = 0
+    in_quotes = False
+    last_byte = NEWLINE
+    with open(path, "rb") as f:
+        while True:
+            block = f.read(block_size)
+            if not block:
+                break
+            last_byte = block[-1]
+            if not in_quotes and QUOTE not in block:
+                # Cas courant : aucun guillemet, simple comptage des fins de ligne
+                records += block.count(b"\n")
+                continue
+            data = np.frombuffer(block, dtype=np.uint8)
+            # Parité du nombre de guillemets vus avant chaque octet (uint8 : seule la
+            # parité compte, le débordement est sans effet)
+            parity = np.cumsum(data == QUOTE, dtype=np.uint8) & 1
+            if in_quotes:
+                parity ^= 1
+            records += int(np.count_nonzero((data == NEWLINE) & (parity == 0)))
+            in_quotes = bool(parity[-1])
+    if last_byte != NEWLINE:
+        records += 1  # Dernière ligne sans retour à la ligne final
+    return records
+
+
+class CsvDataset:
+    """
+    Accès paresseux à un fichier CSV : l'en-tête est lu une seule fois, le nombre
+    de lignes est obtenu par un parcours des octets et seules les lignes demandées
+    sont analysées. Le DataFrame complet n'est construit que par `load()`.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._columns = None
+        self._n_rows = None
+        self._schema_sample = None
+
+    @property
+    def columns(self):
+        if self._columns is None:
+            self._columns = list(pd.read_csv(self.path, nrows=0).columns)
+        return self._columns
+
+    def count_rows(self):
+        """Nombre de lignes de données (hors en-tête), calculé une seule fois."""
+        if self._n_rows is None:
+            self._n_rows = max(count_csv_records(self.path) - 1, 0)
+        return self._n_rows
+
+    @property
+    def shape(self):
+        return (self.count_rows(), len(self.columns))
+
+    def head(self, n=5, columns=None):
+        """Premières lignes du fichier (seules `n` lignes sont lues)."""
+        return pd.read_csv(self.path, nrows=n, usecols=columns)
+
+    @property
+    def schema(self):
+        """Types des colonnes, déduits des SCHEMA_SAMPLE_ROWS premières lignes."""
+        if self._schema_sample is None:
+            self._schema_sample = self.head(SCHEMA_SAMPLE_ROWS)
+        return self._schema_sample.dtypes.astype(str).to_dict()
+
+    def sample_stats(self, n=STATS_SAMPLE_ROWS, columns=None):
+        """Statistiques descriptives calculées sur les `n` premières lignes."""
+        return self.head(n, columns=columns).describe(include="all")
+
+    def load(self, columns=None):
+        """Charge le fichier complet (ou les colonnes demandées) en mémoire."""
+        return pd.read_csv(self.path, usecols=columns)
+
+
+class SqliteDataset:
+    """
+    Accès paresseux à une table SQLite : nombre de lignes par COUNT(*), premières
+    lignes lues par une seule page, et chargement complet uniquement par `load()`.
+    """
+
+    def __init__(self, path, table_name):
+        self.path = path
+        self.table_name = table_name
+        self._columns = None
+        self._n_rows = None
+        self._schema_sample = None
+
+    @property
+    def columns(self):
+        if self._columns is None:
+            conn = sqlite_source.connect_readonly(self.path)
+            try:
+                self._columns = sqlite_source.table_columns(conn, self.table_name)
+            finally:
+                conn.close()
+        return self._columns
+
+    def count_rows(self):
+        """Nombre de lignes de la table, calculé une seule fois."""
+        if self._n_rows is None:
+            self._n_rows = sqlite_source.count_rows(self.path, self.table_name)
+        return self._n_rows
+
+    @property
+    def shape(self):
+        return (self.count_rows(), len(self.columns))
+
+    def head(self, n=5, columns=None):
+        """Premières lignes de la table, dans l'ordre du rowid."""
+        pages = sqlite_source.iter_table(
+            self.path, self.table_name, page_size=n, columns=columns
+        )
+        try:
+            return next(pages)
+        except StopIteration:
+            return pd.DataFrame(columns=columns or self.columns)
+        finally:
+            pages.close()
+
+    @property
+    def schema(self):
+        """Types des colonnes, déduits des SCHEMA_SAMPLE_ROWS premières lignes."""
+        if self._schema_sample is None:
+            self._schema_sample = self.head(SCHEMA_SAMPLE_ROWS)
+        return self._schema_sample.dtypes.astype(str).to_dict()
+
+    def sample_stats(self, n=STATS_SAMPLE_ROWS, columns=None):
+        """Statistiques descriptives calculées sur les `n` premières lignes."""
+        return self.head(n, columns=columns).describe(include="all")
+
+    def load(self, columns=None):
+        """Charge la table complète (ou les colonnes demandées) en mémoire."""
+        return sqlite_source.read_table(self.path, self.table_name, columns=columns)
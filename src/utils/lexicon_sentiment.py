@@ -0,0 +1,193 @@
+import os
+import sys
+import hashlib
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+# Gestion dynamique des chemins : ROOT_DIR = racine du projet
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if __package__ in (None, ""):
+    # Lancé comme script : la racine du projet n'est pas encore dans sys.path
+    sys.path.append(ROOT_DIR)
+
+# Import des chemins définis dans paths.py
+from paths import REVIEWS_DB_PATH, SENTIMENT_LEXICON_PATH
+from src.utils.sqlite_source import iter_table
+from src.utils.aggregates import aggregate_state, merge_states
+
+# --- Sentiment des textes d'avis par lexique ---
+#
+# Chaque texte est découpé en mots (minuscules, lettres et apostrophes) ; chaque mot
+# reçoit la note du lexique (fichier « mot<TAB>note », notes de -3 à 3), inversée
+# s'il suit une négation. La somme des notes d'un avis est ramenée dans [-1, 1] :
+# score = somme / sqrt(somme² + SCORE_NORMALIZATION).
+# Un lot d'avis est traité d'un bloc (explode des mots, recherche dans l'index du
+# lexique, sommes par avis) ; les lots sont répartis sur des processus et réduits en
+# états d'agrégation par produit (voir aggregates), fusionnés au fil de l'eau.
+
+TOKEN_PATTERN = r"[a-z']+"
+NEGATIONS = ["not", "no", "never", "don't", "isn't", "wasn't", "didn't", "won't"]
+SCORE_NORMALIZATION = 15.0
+
+# Seuils de classement d'un score de texte
+POSITIVE_THRESHOLD = 0.05
+NEGATIVE_THRESHOLD = -0.05
+
+# Table et colonnes des avis dans la base SQLite
+REVIEWS_TABLE = "Reviews"
+REVIEW_COLUMNS = ["Id", "ProductId", "Text"]
+
+# Avis par lot et lots en cours de traitement à la fois (mémoire bornée)
+BATCH_SIZE = 20_000
+MAX_PENDING_BATCHES = 4
+
+
+def scorer_version(lexicon_path=SENTIMENT_LEXICON_PATH):
+    """Empreinte du lexique et des règles de score (clé de validité des caches)."""
+    hasher = hashlib.sha256()
+    with open(lexicon_path, "rb") as f:
+        hasher.update(f.read())
+    rules = (TOKEN_PATTERN, NEGATIONS, SCORE_NORMALIZATION)
+    hasher.update(repr(rules).encode("utf-8"))
+    return hasher.hexdigest()
+
+
+def load_lexicon(path=SENTIMENT_LEXICON_PATH):
+    """Lexique sous forme de Series note indexée par le mot."""
+    lexicon = pd.read_csv(
+        path,
+        sep="\t",
+        header=None,
+        names=["word", "score"],
+        keep_default_na=False,
+        comment="#",
+    )
+    return lexicon.drop_duplicates("word", keep="last").set_index("word")["score"]
+
+
+def score_texts(texts, lexicon):
+    """
+    Score de sentiment dans [-1, 1] de chaque texte (0 sans mot du lexique, NaN pour
+    un texte manquant).
+    """
+    tokens = texts.astype("string").str.lower().str.findall(TOKEN_PATTERN)
+    words = tokens.explode()
+    # Avis de chaque mot (un avis sans mot donne une ligne NaN)
+    counts = tokens.str.len().to_numpy(dtype="float64", na_value=0).astype(int)
+    rows = np.repeat(np.arange(len(texts)), np.maximum(counts, 1))
+
+    positions = lexicon.index.get_indexer(words)
+    scores = np.where(positions >= 0, lexicon.to_numpy()[positions], 0).astype(
+        "float64"
+    )
+    # Négation : le mot qui suit « not », « never »... compte à l'envers
+    negated = np.zeros(len(words), dtype=bool)
+    negated[1:] = words.isin(NEGATIONS).to_numpy()[:-1] & (rows[1:] == rows[:-1])
+    scores = np.where(negated, -scores, scores)
+
+    totals = np.bincount(rows, weights=scores, minlength=len(texts))
+    result = totals / np.sqrt(totals**2 + SCORE_NORMALIZATION)
+    return pd.Series(result, index=texts.index).where(texts.notna())
+
+
+def label_scores(scores):
+    """Classe des scores en positive / neutral / negative (vectorisé)."""
+    labels = np.select(
+        [scores >= POSITIVE_THRESHOLD, scores <= NEGATIVE_THRESHOLD],
+        ["positive", "negative"],
+        default="neutral",
+    )
+    return pd.Series(labels, index=scores.index).where(scores.notna())
+
+
+_worker_lexicon = None
+
+
+def _init_worker(lexicon_path):
+    global _worker_lexicon
+    _worker_lexicon = load_lexicon(lexicon_path)
+
+
+def score_batch(batch, lexicon=None):
+    """
+    Score de chaque avis d'un lot (colonnes Id, ProductId, Text) et état
+    d'agrégation par produit de ces scores.
+    :return: (scores par avis, état d'agrégation indexé par productid).
+    """
+    lexicon = _worker_lexicon if lexicon is None else lexicon
+    scores = pd.DataFrame(
+        {
+            "id": batch["Id"].to_numpy(),
+            "productid": batch["ProductId"].to_numpy(),
+            "text_sentiment": score_texts(batch["Text"], lexicon).to_numpy(),
+        }
+    )
+    if "text_hash" in batch.columns:
+        # Avis manquants d'un cache (voir sentiment_cache)
+        scores["text_hash"] = batch["text_hash"].to_numpy()
+    return scores, aggregate_state(scores, "productid", ["text_sentiment"])
+
+
+def iter_review_batches(db_path=REVIEWS_DB_PATH, batch_size=BATCH_SIZE):
+    """Avis de la base SQLite par lots (pagination sur le rowid)."""
+    return iter_table(
+        db_path, REVIEWS_TABLE, page_size=batch_size, columns=REVIEW_COLUMNS
+    )
+
+
+def score_reviews(
+    batches, workers=1, lexicon_path=SENTIMENT_LEXICON_PATH, on_scores=None, cache=None
+):
+    """
+    Score les avis lot par lot et renvoie l'état d'agrégation par produit.
+    :param batches: Itérable de lots (voir iter_review_batches).
+    :param workers: Nombre de processus ; 1 pour tout traiter dans ce processus.
+    :param on_scores: Fonction appelée avec les scores de chaque lot (par avis).
+    :param cache: SentimentCache ; seuls les avis absents du cache sont scorés, et
+        leurs scores y sont ajoutés.
+    """
+    state = None
+
+    def collect(result, computed=True):
+        nonlocal state
+        scores, batch_state = result
+        if computed and cache is not None:
+            cache.store(scores)
+        if on_scores is not None:
+            on_scores(scores)
+        state = batch_state if state is None else merge_states(state, batch_state)
+
+    def pending(batches):
+        # Scores trouvés dans le cache comptés ici, avis restants renvoyés
+        for batch in batches:
+            if cache is not None:
+                hits, batch = cache.split(batch)
+                if not hits.empty:
+                    hits_state = aggregate_state(hits, "productid", ["text_sentiment"])
+                    collect((hits, hits_state), computed=False)
+            if not batch.empty:
+                yield batch
+
+    if workers <= 1:
+        lexicon = load_lexicon(lexicon_path)
+        for batch in pending(batches):
+            collect(score_batch(batch, lexicon))
+    else:
+        with ProcessPoolExecutor(
+            max_workers=workers, initializer=_init_worker, initargs=(lexicon_path,)
+        ) as executor:
+            running = set()
+            for batch in pending(batches):
+                if len(running) >= workers * MAX_PENDING_BATCHES:
+                    done, running = wait(running, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        collect(future.result())
+                running.add(executor.submit(score_batch, batch))
+            for future in running:
+                collect(future.result())
+
+    if state is None:
+        empty = pd.DataFrame({"productid": [], "text_sentiment": []})
+        state = aggregate_state(empty, "productid", ["text_sentiment"])
+    return state
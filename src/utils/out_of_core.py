@@ -0,0 +1,176 @@
+import os
+import sys
+import mmap
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+
+# Gestion dynamique des chemins : ROOT_DIR = racine du projet
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if __package__ in (None, ""):
+    # Lancé comme script : la racine du projet n'est pas encore dans sys.path
+    sys.path.append(ROOT_DIR)
+
+from src.utils.aggregates import aggregate_state, merge_states
+from src.utils.storage import storage_for_path, ParquetStorage
+
+# --- Regroupements hors mémoire ---
+#
+# Le fichier est découpé en parties (plages d'octets d'un CSV, groupes de lignes d'un
+# Parquet). Chaque partie est lue par blocs de CHUNK_ROWS lignes ; chaque bloc est
+# réduit en un état d'agrégation (somme, nombre, somme des carrés, min, max par clé,
+# voir aggregates) fusionné au fur et à mesure. La mémoire utilisée dépend de la
+# taille d'un bloc et du nombre de clés, pas de la taille du fichier. Les parties
+# sont indépendantes : elles peuvent être traitées dans des processus séparés, qui
+# lisent eux-mêmes leur partie du fichier.
+
+# Nombre de lignes lues à la fois par partie
+CHUNK_ROWS = 200_000
+
+# Nombre de parties par processus (pour équilibrer la charge)
+PARTS_PER_WORKER = 4
+
+
+class _ByteRange:
+    """
+    Fichier limité à la plage [start, end[ (lecture seule), lisible par pandas.
+    """
+
+    def __init__(self, path, start, end):
+        self.file = open(path, "rb")
+        self.file.seek(start)
+        self.remaining = end - start
+
+    def read(self, size=-1):
+        if size is None or size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def close(self):
+        self.file.close()
+
+
+def _contains_quote(f, start):
+    """Vrai si le fichier ouvert `f` contient un guillemet après `start`."""
+    if os.fstat(f.fileno()).st_size <= start:
+        return False
+    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        return mapped.find(b'"', start) != -1
+
+
+def csv_byte_ranges(path, parts):
+    """
+    Découpe le corps d'un CSV (après l'en-tête) en `parts` plages d'octets qui
+    commencent et finissent sur une fin de ligne.
+    Un champ entre guillemets peut contenir un retour à la ligne (texte libre, ex.
+    avis) qu'une coupure séparerait : si le corps contient un guillemet, il est lu
+    d'un seul tenant (une seule plage).
+    """
+    size = os.path.getsize(path)
+    with open(path, "rb") as f:
+        f.readline()  # En-tête
+        body_start = f.tell()
+        if parts > 1 and _contains_quote(f, body_start):
+            return [(body_start, size)] if body_start < size else []
+        bounds = [body_start]
+        for i in range(1, parts):
+            target = body_start + (size - body_start) * i // parts
+            if target <= bounds[-1]:
+                continue
+            f.seek(target - 1)
+            f.readline()  # Aller à la fin de la ligne en cours
+            position = f.tell()
+            if bounds[-1] < position < size:
+                bounds.append(position)
+        bounds.append(size)
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
+def iter_csv_range(path, start, end, columns=None, chunksize=CHUNK_ROWS):
+    """Lit par blocs les lignes d'un CSV comprises dans la plage [start, end[."""
+    header = list(pd.read_csv(path, nrows=0).columns)
+    source = _ByteRange(path, start, end)
+    try:
+        yield from pd.read_csv(
+            source,
+            header=None,
+            names=header,
+            usecols=columns,
+            chunksize=chunksize,
+        )
+    finally:
+        source.close()
+
+
+def parquet_row_group_ranges(path, parts):
+    """Répartit les groupes de lignes d'un Parquet en `parts` plages contiguës."""
+    import pyarrow.parquet as pq
+
+    groups = pq.ParquetFile(path).metadata.num_row_groups
+    parts = max(1, min(parts, groups))
+    bounds = [groups * i // parts for i in range(parts + 1)]
+    return [(a, b) for a, b in zip(bounds[:-1], bounds[1:]) if a < b]
+
+
+def iter_parquet_range(path, start, end, columns=None, chunksize=CHUNK_ROWS):
+    """Lit par blocs les groupes de lignes [start, end[ d'un Parquet."""
+    import pyarrow.parquet as pq
+
+    parquet_file = pq.ParquetFile(path)
+    batches = parquet_file.iter_batches(
+        batch_size=chunksize, row_groups=list(range(start, end)), columns=columns
+    )
+    for batch in batches:
+        yield batch.to_pandas()
+
+
+def file_parts(path, parts):
+    """Parties indépendantes du fichier : (start, end) en octets ou en groupes."""
+    if isinstance(storage_for_path(path), ParquetStorage):
+        return parquet_row_group_ranges(path, parts)
+    return csv_byte_ranges(path, parts)
+
+
+def iter_part(path, part, columns=None, chunksize=CHUNK_ROWS):
+    """Blocs d'une partie du fichier renvoyée par file_parts."""
+    if isinstance(storage_for_path(path), ParquetStorage):
+        return iter_parquet_range(path, *part, columns=columns, chunksize=chunksize)
+    return iter_csv_range(path, *part, columns=columns, chunksize=chunksize)
+
+
+def aggregate_part(path, part, key, columns, chunksize=CHUNK_ROWS):
+    """État d'agrégation d'une partie du fichier (exécuté dans un worker)."""
+    state = None
+    for chunk in iter_part(path, part, columns=[key] + columns, chunksize=chunksize):
+        chunk_state = aggregate_state(chunk, key, columns)
+        state = chunk_state if state is None else merge_states(state, chunk_state)
+    return state
+
+
+def aggregate_file(path, key, columns, workers=1, chunksize=CHUNK_ROWS):
+    """
+    État d'agrégation de tout le fichier par `key`, calculé hors mémoire.
+    :param workers: Nombre de processus ; 1 pour tout lire dans le processus courant.
+    """
+    parts = file_parts(path, max(1, workers * PARTS_PER_WORKER))
+    if workers > 1 and len(parts) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                executor.submit(aggregate_part, path, part, key, columns, chunksize)
+                for part in parts
+            ]
+            states = [future.result() for future in futures]
+    else:
+        states = [aggregate_part(path, part, key, columns, chunksize) for part in parts]
+
+    states = [state for state in states if state is not None]
+    if not states:
+        # Fichier sans lignes : état vide
+        return aggregate_state(
+            pd.DataFrame({col: [] for col in [key] + columns}), key, columns
+        )
+    result = states[0]
+    for state in states[1:]:
+        result = merge_states(result, state)
+    return result
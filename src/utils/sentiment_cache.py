@@ -0,0 +1,162 @@
+import os
+import sys
+import sqlite3
+import numpy as np
+import pandas as pd
+
+# Gestion dynamique des chemins : ROOT_DIR = racine du projet
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if __package__ in (None, ""):
+    # Lancé comme script : la racine du projet n'est pas encore dans sys.path
+    sys.path.append(ROOT_DIR)
+
+# Import des chemins définis dans paths.py
+from paths import SENTIMENT_CACHE_PATH
+
+# --- Cache persistant des scores de sentiment par avis ---
+#
+# Table SQLite indexée par (id de l'avis, hash du texte) : un avis dont le texte change
+# est rescoré. Chaque lot est cherché d'un coup (table temporaire des clés jointe à la
+# table des scores) ; seuls les avis absents sont envoyés au scoreur. Chaque entrée
+# garde le numéro de la dernière exécution qui l'a utilisée : au-delà de
+# `max_entries`, les entrées les moins récemment utilisées sont supprimées.
+# Le cache est vidé si la version du scoreur (lexique, règles) change.
+
+# Nombre maximal d'avis gardés en cache
+SENTIMENT_CACHE_MAX_ENTRIES = 2_000_000
+
+
+def text_hashes(texts):
+    """Hash 64 bits (signé, comme les entiers SQLite) de chaque texte."""
+    return (
+        pd.util.hash_pandas_object(texts.astype(object), index=False)
+        .to_numpy()
+        .view("int64")
+    )
+
+
+class SentimentCache:
+    """
+    Scores de sentiment déjà calculés, relus par lots.
+    :param version: Version du scoreur ; un cache d'une autre version est vidé.
+    :param max_entries: Taille maximale du cache (en avis).
+    """
+
+    def __init__(
+        self,
+        version,
+        path=SENTIMENT_CACHE_PATH,
+        max_entries=SENTIMENT_CACHE_MAX_ENTRIES,
+    ):
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evicted = 0
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode = WAL")
+        self.conn.execute("PRAGMA synchronous = NORMAL")
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+            CREATE TABLE IF NOT EXISTS scores (
+                review_id INTEGER NOT NULL,
+                text_hash INTEGER NOT NULL,
+                score REAL,
+                last_run INTEGER NOT NULL,
+                PRIMARY KEY (review_id, text_hash)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS scores_last_run ON scores (last_run);
+            CREATE TEMP TABLE lookup_keys (
+                position INTEGER PRIMARY KEY,
+                review_id INTEGER,
+                text_hash INTEGER
+            );
+            """)
+        meta = dict(self.conn.execute("SELECT key, value FROM meta"))
+        if meta.get("version") != version:
+            self.conn.execute("DELETE FROM scores")
+        self.run = int(meta.get("last_run", 0)) + 1
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+            [("version", version), ("last_run", str(self.run))],
+        )
+        self.conn.commit()
+
+    def split(self, batch):
+        """
+        Sépare un lot d'avis (colonnes Id, ProductId, Text) en scores trouvés dans le
+        cache et avis à scorer.
+        :return: (scores trouvés : id, productid, text_sentiment ; avis manquants,
+            avec une colonne text_hash à repasser à `store`).
+        """
+        hashes = text_hashes(batch["Text"])
+        ids = batch["Id"].to_numpy(dtype="int64")
+        self.conn.execute("DELETE FROM lookup_keys")
+        self.conn.executemany(
+            "INSERT INTO lookup_keys VALUES (?, ?, ?)",
+            zip(range(len(ids)), ids.tolist(), hashes.tolist()),
+        )
+        found = self.conn.execute(
+            "SELECT k.position, s.score FROM lookup_keys AS k "
+            "JOIN scores AS s USING (review_id, text_hash)"
+        ).fetchall()
+        # Marquer les entrées trouvées comme utilisées par cette exécution
+        self.conn.execute(
+            "UPDATE scores SET last_run = ? WHERE (review_id, text_hash) IN "
+            "(SELECT review_id, text_hash FROM lookup_keys)",
+            (self.run,),
+        )
+
+        positions = np.array([row[0] for row in found], dtype=np.intp)
+        cached = np.zeros(len(batch), dtype=bool)
+        cached[positions] = True
+        hits = pd.DataFrame(
+            {
+                "id": ids[positions],
+                "productid": batch["ProductId"].to_numpy()[positions],
+                "text_sentiment": np.array([row[1] for row in found], dtype="float64"),
+            }
+        )
+        misses = batch[~cached].assign(text_hash=hashes[~cached])
+        self.hits += len(hits)
+        self.misses += len(misses)
+        return hits, misses
+
+    def store(self, scores):
+        """Enregistre des scores calculés (colonnes id, text_hash, text_sentiment)."""
+        values = scores["text_sentiment"].astype("float64")
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO scores VALUES (?, ?, ?, ?)",
+            zip(
+                scores["id"].to_numpy(dtype="int64").tolist(),
+                scores["text_hash"].to_numpy(dtype="int64").tolist(),
+                values.astype(object).where(values.notna(), None).tolist(),
+                [self.run] * len(scores),
+            ),
+        )
+
+    def close(self):
+        """Applique la taille maximale, enregistre et affiche les compteurs."""
+        try:
+            size = self.conn.execute("SELECT COUNT(*) FROM scores").fetchone()[0]
+            excess = size - self.max_entries
+            if excess > 0:
+                self.conn.execute(
+                    "DELETE FROM scores WHERE (review_id, text_hash) IN ("
+                    "SELECT review_id, text_hash FROM scores "
+                    "ORDER BY last_run LIMIT ?)",
+                    (excess,),
+                )
+                self.evicted = excess
+                size -= excess
+            self.conn.commit()
+        finally:
+            self.conn.close()
+        total = self.hits + self.misses
+        rate = 100 * self.hits / total if total else 0.0
+        print(
+            f"[cache sentiments] {self.hits} trouvés, {self.misses} calculés "
+            f"({rate:.0f} % de réussite), {self.evicted} évincés, {size} en cache"
+        )
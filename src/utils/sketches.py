@@ -0,0 +1,161 @@
+import os
+import sys
+import numpy as np
+import pandas as pd
+
+# Gestion dynamique des chemins : ROOT_DIR = racine du projet
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if __package__ in (None, ""):
+    # Lancé comme script : la racine du projet n'est pas encore dans sys.path
+    sys.path.append(ROOT_DIR)
+
+# --- Résumés approchés par sketches ---
+#
+# Deux structures fusionnables, calculées par clé pour toutes les clés à la fois :
+# - HyperLogLog pour les nombres de valeurs distinctes : chaque valeur est hachée sur
+#   64 bits ; les `precision` premiers bits choisissent un registre, qui garde le
+#   rang du premier bit à 1 du reste. Erreur relative typique : 1.04 / sqrt(2**p).
+# - Histogramme logarithmique (à la DDSketch) pour les quantiles : une valeur x > 0
+#   tombe dans le seau ceil(log_gamma(x)), gamma = (1 + a) / (1 - a) ; un quantile
+#   est estimé à moins de `a` près en valeur relative.
+# Les sketches sont des tables (une ligne par registre ou par seau non vide) : deux
+# sketches se fusionnent par max (registres) ou somme (seaux), sans relire les lignes.
+
+HLL_PRECISION = 12
+RELATIVE_ACCURACY = 0.01
+
+
+def _hash_values(values):
+    """Hash 64 bits stable des valeurs (les catégories sont hachées comme du texte)."""
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        values = values.astype(values.cat.categories.dtype)
+    return pd.util.hash_pandas_object(values, index=False).to_numpy()
+
+
+def _bit_length(values):
+    """Nombre de bits significatifs d'entiers non signés 64 bits."""
+    high = (values >> np.uint64(32)).astype("float64")
+    low = (values & np.uint64(0xFFFFFFFF)).astype("float64")
+    # frexp est exact sur des entiers de 32 bits : x = m * 2**e avec 0.5 <= m < 1
+    return np.where(high > 0, 32 + np.frexp(high)[1], np.frexp(low)[1])
+
+
+def _plain_keys(keys):
+    if isinstance(keys.dtype, pd.CategoricalDtype):
+        return keys.astype(keys.cat.categories.dtype)
+    return keys
+
+
+def hll_sketch(keys, values, precision=HLL_PRECISION):
+    """
+    Registres HyperLogLog des valeurs distinctes de `values` pour chaque clé.
+    Les lignes sans clé ou sans valeur sont ignorées.
+    :return: DataFrame (key, register, rank), un registre non vide par ligne.
+    """
+    valid = keys.notna().to_numpy() & values.notna().to_numpy()
+    keys, values = _plain_keys(keys)[valid], values[valid]
+    hashes = _hash_values(values)
+
+    rest_bits = 64 - precision
+    registers = (hashes >> np.uint64(rest_bits)).astype("int32")
+    rest = hashes & np.uint64((1 << rest_bits) - 1)
+    ranks = (rest_bits - _bit_length(rest) + 1).astype("int8")
+
+    sketch = pd.DataFrame(
+        {"key": keys.to_numpy(), "register": registers, "rank": ranks}
+    )
+    return merge_hll(sketch)
+
+
+def merge_hll(*sketches):
+    """Fusionne des registres HyperLogLog (rang maximal par clé et registre)."""
+    sketch = pd.concat(sketches, ignore_index=True)
+    return sketch.groupby(["key", "register"], sort=True)["rank"].max().reset_index()
+
+
+def hll_estimate(sketch, precision=HLL_PRECISION):
+    """Nombre estimé de valeurs distinctes par clé (Series indexée par la clé)."""
+    m = 2**precision
+    alpha = 0.7213 / (1 + 1.079 / m)
+    grouped = sketch.assign(inverse=np.exp2(-sketch["rank"].astype("float64"))).groupby(
+        "key", sort=True
+    )
+    filled = grouped.size()
+    empty = m - filled
+    # Les registres vides valent 2**-0 = 1
+    estimate = alpha * m * m / (grouped["inverse"].sum() + empty)
+    # Petites cardinalités : comptage linéaire des registres vides
+    small = (estimate <= 2.5 * m) & (empty > 0)
+    linear = m * np.log(m / empty.where(empty > 0))
+    return estimate.where(~small, linear).rename_axis(None)
+
+
+def _gamma(relative_accuracy):
+    return (1 + relative_accuracy) / (1 - relative_accuracy)
+
+
+def quantile_sketch(keys, df, columns, relative_accuracy=RELATIVE_ACCURACY):
+    """
+    Histogrammes logarithmiques des colonnes `columns` de `df` pour chaque clé.
+    Les valeurs négatives sont rangées comme leur valeur absolue (sign = -1), les
+    zéros dans un seau à part (sign = 0).
+    :return: DataFrame (key, column, sign, bucket, count), un seau non vide par ligne.
+    """
+    log_gamma = np.log(_gamma(relative_accuracy))
+    keys = _plain_keys(keys)
+    parts = []
+    for col in columns:
+        values = pd.to_numeric(df[col], errors="coerce").to_numpy(dtype="float64")
+        valid = keys.notna().to_numpy() & ~np.isnan(values)
+        values = values[valid]
+        sign = np.sign(values).astype("int8")
+        with np.errstate(divide="ignore"):
+            bucket = np.ceil(np.log(np.abs(values)) / log_gamma)
+        bucket = np.where(sign == 0, 0, bucket).astype("int32")
+        parts.append(
+            pd.DataFrame(
+                {
+                    "key": keys.to_numpy()[valid],
+                    "column": col,
+                    "sign": sign,
+                    "bucket": bucket,
+                    "count": np.ones(len(values), dtype="int64"),
+                }
+            )
+        )
+    return merge_quantiles(*parts)
+
+
+def merge_quantiles(*sketches):
+    """Fusionne des histogrammes logarithmiques (somme des effectifs par seau)."""
+    sketch = pd.concat(sketches, ignore_index=True)
+    return (
+        sketch.groupby(["key", "column", "sign", "bucket"], sort=True)["count"]
+        .sum()
+        .reset_index()
+    )
+
+
+def sketch_quantiles(sketch, quantiles, relative_accuracy=RELATIVE_ACCURACY):
+    """
+    Quantiles estimés (interpolation « lower » : valeur de rang floor(q * (n - 1))).
+    :return: DataFrame indexé par (key, column), une colonne par quantile.
+    """
+    gamma = _gamma(relative_accuracy)
+    # Valeur représentative de chaque seau, à moins de `a` près de ses valeurs
+    value = (
+        sketch["sign"] * 2 * gamma ** sketch["bucket"].astype("float64") / (gamma + 1)
+    )
+    ordered = sketch.assign(value=value).sort_values(
+        ["key", "column", "value"], kind="mergesort", ignore_index=True
+    )
+    grouped = ordered.groupby(["key", "column"], sort=True)
+    cumulative = grouped["count"].cumsum()
+    total = grouped["count"].transform("sum")
+
+    result = pd.DataFrame(index=grouped.size().index)
+    for q in quantiles:
+        rank = np.floor(q * (total - 1))
+        reached = ordered.loc[cumulative > rank, ["key", "column", "value"]]
+        result[q] = reached.groupby(["key", "column"], sort=True)["value"].first()
+    return result
@@ -0,0 +1,122 @@
+import os
+import sys
+import sqlite3
+import pandas as pd
+from urllib.request import pathname2url
+
+# Gestion dynamique des chemins : ROOT_DIR = racine du projet
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if __package__ in (None, ""):
+    # Lancé comme script : la racine du projet n'est pas encore dans sys.path
+    sys.path.append(ROOT_DIR)
+
+# Nombre de lignes lues par page
+PAGE_SIZE = 50_000
+
+# Nom donné au rowid dans les requêtes de pagination
+ROWID_ALIAS = "__page_rowid__"
+
+# Réglages de lecture en masse : cache de pages de 64 Mo, fichier projeté en mémoire
+# (256 Mo) et tables temporaires en mémoire
+BULK_READ_PRAGMAS = {
+    "query_only": "ON",
+    "cache_size": -64 * 1024,
+    "mmap_size": 256 * 1024 * 1024,
+    "temp_store": "MEMORY",
+}
+
+
+def connect_readonly(db_path):
+    """Ouvre une base SQLite en lecture seule (URI mode=ro) réglée pour les lectures."""
+    if not os.path.exists(db_path):
+        # Sans cette vérification, l'erreur de SQLite n'indique pas le fichier
+        raise FileNotFoundError(f"Base SQLite introuvable : {db_path}")
+    uri = f"file:{pathname2url(os.path.abspath(db_path))}?mode=ro"
+    conn = sqlite3.connect(uri, uri=True)
+    for pragma, value in BULK_READ_PRAGMAS.items():
+        conn.execute(f"PRAGMA {pragma} = {value}")
+    return conn
+
+
+def quote_identifier(name):
+    """Identifiant SQL entre guillemets (les guillemets internes sont doublés)."""
+    return '"' + name.replace('"', '""') + '"'
+
+
+def validate_table(conn, table_name):
+    """
+    Vérifie que `table_name` est une table de la base et renvoie son nom entre
+    guillemets, prêt à être utilisé dans une requête.
+    """
+    found = conn.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'table' AND name = ?",
+        (table_name,),
+    ).fetchone()
+    if found is None:
+        raise ValueError(f"La table '{table_name}' n'existe pas dans la base.")
+    return quote_identifier(table_name)
+
+
+def table_columns(conn, table_name):
+    """Colonnes de la table, dans l'ordre de sa définition."""
+    table = validate_table(conn, table_name)
+    return [row[1] for row in conn.execute(f"PRAGMA table_info({table})")]
+
+
+def count_rows(db_path, table_name):
+    """Nombre de lignes de la table."""
+    conn = connect_readonly(db_path)
+    try:
+        table = validate_table(conn, table_name)
+        return conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+    finally:
+        conn.close()
+
+
+def iter_table(db_path, table_name, page_size=PAGE_SIZE, columns=None):
+    """
+    Parcourt une table par pages de `page_size` lignes, dans l'ordre du rowid.
+    La pagination se fait par clé (`rowid > dernier rowid lu`) : chaque page est
+    une recherche dans l'index du rowid, sans OFFSET à relire.
+    :param columns: Colonnes à lire (toutes par défaut), vérifiées contre le schéma.
+    :return: Générateur de DataFrames.
+    """
+    conn = connect_readonly(db_path)
+    try:
+        table = validate_table(conn, table_name)
+        available = table_columns(conn, table_name)
+        columns = list(columns) if columns is not None else available
+        unknown = [col for col in columns if col not in available]
+        if unknown:
+            raise ValueError(f"Colonnes inconnues dans {table_name} : {unknown}")
+
+        selected = ", ".join(quote_identifier(col) for col in columns)
+        query = (
+            f"SELECT rowid AS {quote_identifier(ROWID_ALIAS)}, {selected} "
+            f"FROM {table} WHERE rowid > ? ORDER BY rowid LIMIT ?"
+        )
+        last_rowid = -(2**63)
+        while True:
+            # read_sql_query garde l'inférence de types habituelle (NULL -> NaN)
+            page = pd.read_sql_query(query, conn, params=(last_rowid, page_size))
+            if page.empty:
+                break
+            last_rowid = int(page.pop(ROWID_ALIAS).iloc[-1])
+            yield page
+            if len(page) < page_size:
+                break
+    finally:
+        conn.close()
+
+
+def read_table(db_path, table_name, columns=None, page_size=PAGE_SIZE):
+    """Charge toute la table (ou les colonnes demandées) dans un DataFrame."""
+    pages = list(iter_table(db_path, table_name, page_size=page_size, columns=columns))
+    if not pages:
+        conn = connect_readonly(db_path)
+        try:
+            columns = columns or table_columns(conn, table_name)
+        finally:
+            conn.close()
+        return pd.DataFrame(columns=columns)
+    return pd.concat(pages, ignore_index=True)
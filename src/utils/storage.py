@@ -0,0 +1,390 @@
+import os
+import sys
+import shutil
+import threading
+import pandas as pd
+
+# Gestion dynamique des chemins : ROOT_DIR = racine du projet
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if __package__ in (None, ""):
+    # Lancé comme script : la racine du projet n'est pas encore dans sys.path
+    sys.path.append(ROOT_DIR)
+
+# Import des chemins définis dans paths.py
+from paths import (
+    PROCESSED_DATA_DIR,
+    CLEANED_DATA_DIR,
+    OUTPUT_DIR,
+    RECOMMENDATION_RESULTS_DIR,
+    STORAGE_FORMAT,
+    STORAGE_COMPRESSION,
+    STORAGE_EXPORT_CSV,
+)
+from src.utils.dtypes import compact_dtypes, record_compact_schema
+from src.utils.digests import stat_key
+
+# --- Formats de stockage disponibles ---
+#
+# Chaque format expose la même interface : `extension`, `write`, `read` (avec une
+# sélection de colonnes optionnelle), `columns` (en-tête seul), `iter_chunks` pour la
+# lecture par blocs et `open_writer` pour l'écriture par blocs.
+
+
+class CsvStorage:
+    """Stockage texte historique, lisible par un humain."""
+
+    name = "csv"
+    extension = ".csv"
+
+    def write(self, df, path):
+        df.to_csv(path, index=False)
+
+    def read(self, path, columns=None):
+        return pd.read_csv(path, usecols=columns)
+
+    def columns(self, path):
+        return list(pd.read_csv(path, nrows=0).columns)
+
+    def iter_chunks(self, path, columns=None, chunksize=100_000):
+        yield from pd.read_csv(path, usecols=columns, chunksize=chunksize)
+
+    def open_writer(self, path):
+        return _CsvWriter(path)
+
+
+class _CsvWriter:
+    """Écriture d'un CSV bloc par bloc (l'en-tête n'est écrit qu'une fois)."""
+
+    def __init__(self, path):
+        self.path = path
+        self.first = True
+
+    def write(self, df):
+        df.to_csv(
+            self.path, mode="w" if self.first else "a", header=self.first, index=False
+        )
+        self.first = False
+
+    def close(self):
+        pass
+
+
+class ParquetStorage:
+    """Stockage colonnaire typé et compressé (Parquet via pyarrow)."""
+
+    name = "parquet"
+    extension = ".parquet"
+
+    def __init__(self, compression=STORAGE_COMPRESSION):
+        self.compression = compression
+
+    def write(self, df, path):
+        _arrow_compatible(df).to_parquet(
+            path, engine="pyarrow", compression=self.compression, index=False
+        )
+
+    def read(self, path, columns=None):
+        return pd.read_parquet(path, engine="pyarrow", columns=columns)
+
+    def columns(self, path):
+        import pyarrow.parquet as pq
+
+        return list(pq.read_schema(path).names)
+
+    def iter_chunks(self, path, columns=None, chunksize=100_000):
+        import pyarrow.parquet as pq
+
+        parquet_file = pq.ParquetFile(path)
+        for batch in parquet_file.iter_batches(batch_size=chunksize, columns=columns):
+            yield batch.to_pandas()
+
+    def open_writer(self, path):
+        return _ParquetWriter(path, self.compression)
+
+
+class _ParquetWriter:
+    """Écriture d'un fichier Parquet par groupes de lignes, un par bloc reçu."""
+
+    def __init__(self, path, compression):
+        self.path = path
+        self.compression = compression
+        self.writer = None
+        self.schema = None
+
+    def write(self, df):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        table = pa.Table.from_pandas(
+            _arrow_compatible(df), schema=self.schema, preserve_index=False
+        )
+        if self.writer is None:
+            self.schema = table.schema
+            self.writer = pq.ParquetWriter(
+                self.path, self.schema, compression=self.compression
+            )
+        self.writer.write_table(table)
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+
+
+def _arrow_compatible(df):
+    """
+    Convertit en texte les colonnes `object` de types mélangés (ex. nombres et chaînes),
+    que Arrow refuse d'écrire ; les valeurs manquantes sont conservées.
+    """
+    mixed = [
+        col
+        for col in df.select_dtypes(include=["object"]).columns
+        if pd.api.types.infer_dtype(df[col], skipna=True) not in ("string", "empty")
+    ]
+    if not mixed:
+        return df
+    df = df.copy()
+    for col in mixed:
+        df[col] = df[col].where(df[col].isna(), df[col].astype(str))
+    return df
+
+
+def _parquet_available():
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+STORAGES = {"csv": CsvStorage(), "parquet": ParquetStorage()}
+
+
+def get_storage(fmt=None):
+    """
+    Renvoie le format de stockage demandé (par défaut STORAGE_FORMAT de paths.py).
+    Sans pyarrow, on se rabat sur le CSV.
+    """
+    fmt = fmt or STORAGE_FORMAT
+    if fmt not in STORAGES:
+        raise ValueError(
+            f"Format de stockage inconnu : {fmt} (disponibles : {list(STORAGES)})"
+        )
+    if fmt == "parquet" and not _parquet_available():
+        print("pyarrow n'est pas installé : stockage intermédiaire en CSV.")
+        fmt = "csv"
+    return STORAGES[fmt]
+
+
+def storage_for_path(path):
+    """Format de stockage correspondant à l'extension d'un fichier."""
+    extension = os.path.splitext(path)[1]
+    for storage in STORAGES.values():
+        if storage.extension == extension:
+            return storage
+    raise ValueError(f"Extension de fichier non prise en charge : {path}")
+
+
+# --- API utilisée par les étapes du pipeline ---
+
+
+def dataset_path(directory, name, fmt=None):
+    """Chemin du dataset `name` dans `directory` pour le format demandé."""
+    return os.path.join(directory, name + get_storage(fmt).extension)
+
+
+def find_dataset(directory, name, fmt=None):
+    """
+    Chemin du dataset existant, en privilégiant le format configuré puis les autres
+    formats (ce qui permet de relire les CSV produits par les versions précédentes).
+    """
+    preferred = get_storage(fmt)
+    candidates = [preferred] + [s for s in STORAGES.values() if s is not preferred]
+    for storage in candidates:
+        path = os.path.join(directory, name + storage.extension)
+        if os.path.exists(path):
+            return path
+    raise FileNotFoundError(
+        f"Dataset introuvable : {os.path.join(directory, name)} "
+        f"({', '.join(s.extension for s in candidates)})"
+    )
+
+
+def read_table(path, columns=None, compact=True):
+    """
+    Lit un fichier dans le format indiqué par son extension.
+    :param compact: Compacte les types des colonnes (catégories, entiers et réels
+        réduits) selon le schéma enregistré à l'écriture du fichier. Une lecture
+        n'écrit rien (ni schéma, ni historique mémoire).
+    """
+    df = _shared_frame(path, columns)
+    if df is None:
+        df = storage_for_path(path).read(path, columns=columns)
+    if compact:
+        df = compact_dtypes(df, data_path=path, log=False)
+    return df
+
+
+def read_columns(path):
+    """Noms des colonnes d'un fichier, sans charger les données."""
+    return storage_for_path(path).columns(path)
+
+
+def iter_table_chunks(path, columns=None, chunksize=100_000):
+    """Lit un fichier par blocs de `chunksize` lignes (types non compactés)."""
+    return storage_for_path(path).iter_chunks(
+        path, columns=columns, chunksize=chunksize
+    )
+
+
+def write_table(df, path):
+    """Écrit un fichier dans le format indiqué par son extension."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    storage_for_path(path).write(df, path)
+
+
+def open_table_writer(path):
+    """Ouvre un écrivain bloc par bloc (méthodes `write(df)` et `close()`)."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    return storage_for_path(path).open_writer(path)
+
+
+def load_dataset(directory, name, columns=None, fmt=None, compact=True):
+    """
+    Charge le dataset `name` de `directory`.
+    :param columns: Colonnes à charger (toutes par défaut) ; en Parquet, seules ces
+        colonnes sont lues sur le disque.
+    :param compact: Compacte les types des colonnes (voir read_table).
+    """
+    path = find_dataset(directory, name, fmt=fmt)
+    return read_table(path, columns=columns, compact=compact)
+
+
+def save_dataset(df, directory, name, fmt=None, export_csv=STORAGE_EXPORT_CSV):
+    """
+    Enregistre le dataset `name` dans `directory` au format configuré.
+    :param export_csv: Écrit aussi une copie CSV lisible par un humain.
+    :return: Chemin du fichier écrit.
+    """
+    path = dataset_path(directory, name, fmt=fmt)
+    write_table(df, path)
+    record_compact_schema(df, path)
+    share_frame(path, df)
+    if export_csv and not path.endswith(CsvStorage.extension):
+        write_table(df, os.path.join(directory, name + CsvStorage.extension))
+    return path
+
+
+def copy_dataset(directory, name, target_directory, target_name=None):
+    """
+    Copie un dataset vers un autre répertoire (sans le relire), en gardant son format.
+    La copie est sautée si la cible est déjà identique (même taille et même date).
+    :return: Chemin de la copie.
+    """
+    source_path = find_dataset(directory, name)
+    extension = os.path.splitext(source_path)[1]
+    target_path = os.path.join(target_directory, (target_name or name) + extension)
+    if not (
+        os.path.exists(target_path)
+        and stat_key(source_path)[:2] == stat_key(target_path)[:2]
+    ):
+        os.makedirs(target_directory, exist_ok=True)
+        shutil.copy2(source_path, target_path)
+    shared = _shared_frame(source_path, copy=False)
+    if shared is not None:
+        share_frame(target_path, shared)
+    return target_path
+
+
+# --- Passage des DataFrames en mémoire entre étapes ---
+#
+# Quand le lanceur du pipeline (src/pipeline.py) exécute plusieurs étapes dans le même
+# processus, les DataFrames enregistrés par save_dataset sont gardés en mémoire : une
+# étape suivante qui lit le même fichier en reçoit une copie au lieu de le relire.
+# Un DataFrame n'est servi que si le fichier n'a pas été modifié depuis.
+
+_shared_frames = None
+_shared_lock = threading.Lock()
+
+
+def enable_shared_frames():
+    """Active le partage en mémoire des DataFrames enregistrés."""
+    global _shared_frames
+    with _shared_lock:
+        if _shared_frames is None:
+            _shared_frames = {}
+
+
+def disable_shared_frames():
+    """Désactive le partage et libère les DataFrames gardés en mémoire."""
+    global _shared_frames
+    with _shared_lock:
+        _shared_frames = None
+
+
+def share_frame(path, df):
+    """Garde `df` en mémoire comme contenu actuel de `path` (si le partage est actif)."""
+    with _shared_lock:
+        if _shared_frames is None:
+            return
+        # Copie superficielle : les colonnes ajoutées ensuite à `df` ne s'y
+        # retrouvent pas
+        _shared_frames[os.path.abspath(path)] = (stat_key(path), df.copy(deep=False))
+
+
+def retain_frames(paths):
+    """Libère les DataFrames partagés qui ne sont pas dans `paths` (plus aucune étape
+    ne les lira)."""
+    keep = {os.path.abspath(path) for path in paths}
+    with _shared_lock:
+        if _shared_frames is None:
+            return
+        for path in list(_shared_frames):
+            if path not in keep:
+                del _shared_frames[path]
+
+
+def _shared_frame(path, columns=None, copy=True):
+    """Copie du DataFrame partagé pour `path`, ou None s'il faut lire le fichier."""
+    with _shared_lock:
+        shared = _shared_frames and _shared_frames.get(os.path.abspath(path))
+    if not shared:
+        return None
+    key, df = shared
+    try:
+        if stat_key(path) != key:
+            return None
+    except OSError:
+        return None
+    if columns is not None:
+        df = df[list(columns)]
+    return df.copy() if copy else df
+
+
+def export_csv(directory, name):
+    """Exporte en CSV un dataset stocké dans un autre format."""
+    output_path = os.path.join(directory, name + CsvStorage.extension)
+    source_path = find_dataset(directory, name, fmt="parquet")
+    if source_path != output_path:
+        write_table(read_table(source_path, compact=False), output_path)
+    return output_path
+
+
+def export_all_csv(directories=None):
+    """Exporte en CSV tous les datasets Parquet des répertoires du pipeline."""
+    directories = directories or [
+        PROCESSED_DATA_DIR,
+        CLEANED_DATA_DIR,
+        OUTPUT_DIR,
+        RECOMMENDATION_RESULTS_DIR,
+    ]
+    for directory in directories:
+        if not os.path.isdir(directory):
+            continue
+        for file_name in sorted(os.listdir(directory)):
+            name, extension = os.path.splitext(file_name)
+            if extension == ParquetStorage.extension:
+                print(f"Export CSV : {export_csv(directory, name)}")
+
+
+if __name__ == "__main__":
+    export_all_csv()
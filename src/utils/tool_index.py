@@ -0,0 +1,382 @@
+import os
+import sys
+import json
+import shutil
+import argparse
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+# Gestion dynamique des chemins : ROOT_DIR = racine du projet
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if __package__ in (None, ""):
+    # Lancé comme script : la racine du projet n'est pas encore dans sys.path
+    sys.path.append(ROOT_DIR)
+
+# Import des chemins définis dans paths.py
+from paths import PROCESSED_DATA_DIR, TOOL_INDEX_DIR
+from src.utils.digests import DigestCache
+from src.utils.storage import (
+    find_dataset,
+    load_dataset,
+    dataset_path,
+    read_table,
+    write_table,
+)
+
+# --- Index TF-IDF des outils SaaS ---
+#
+# Le TfidfVectorizer est ajusté une seule fois sur les descriptions d'outils ; le
+# vocabulaire (trié), les poids IDF et la matrice creuse des outils (lignes normées L2,
+# format CSR) sont enregistrés en .npy dans TOOL_INDEX_DIR, avec les métadonnées des
+# outils et un fichier meta.json (hash du résumé source, paramètres). Le recommandeur
+# relit ces tableaux par projection mémoire (np.load(mmap_mode="r")) et vectorise les
+# rôles sans scikit-learn, avec les mêmes règles que le TfidfVectorizer par défaut
+# (minuscules, mots de 2 caractères ou plus, tf brut * idf, norme L2). L'index n'est
+# reconstruit que si le hash du résumé des outils ou les paramètres changent.
+#
+# Pour les grands catalogues, l'index contient aussi les listes inversées (mot ->
+# outils et poids, c.-à-d. la matrice en CSC) et le poids maximal de chaque mot : une
+# requête ne lit que les listes de ses mots et s'arrête dès qu'aucun outil non encore
+# vu ne peut plus entrer dans le top-n (MaxScore, voir InvertedIndex.search).
+
+# Version du format de l'index (à incrémenter si son contenu change)
+TOOL_INDEX_VERSION = 2
+
+TOOLS_DATASET = "project_tools_summary"
+TOOL_COLUMNS = ["tool_name", "tool_description"]
+
+# Découpage en mots du TfidfVectorizer par défaut
+TOKEN_PATTERN = r"(?u)\b\w\w+\b"
+STOP_WORDS = "english"
+
+ARRAY_FILES = ["vocabulary", "idf", "data", "indices", "indptr"]
+POSTING_FILES = ["postings_indptr", "postings_tools", "postings_weights", "max_weights"]
+
+# Nombre maximal de similarités denses (lignes × outils) calculées à la fois
+SIMILARITY_BLOCK_CELLS = 4_000_000
+
+
+def tool_descriptions(tools_df):
+    """Ajoute une description fictive aux outils si la colonne est absente."""
+    if "tool_description" not in tools_df.columns:
+        print(
+            "La colonne 'tool_description' est manquante. Ajout d'une colonne fictive."
+        )
+        tools_df = tools_df.assign(
+            tool_description=tools_df["tool_name"].astype(str)
+            + " - Description fictive"
+        )
+    if not all(col in tools_df.columns for col in TOOL_COLUMNS):
+        raise ValueError(f"Les colonnes {TOOL_COLUMNS} sont manquantes dans tools_df.")
+    return tools_df
+
+
+def index_params():
+    """Paramètres dont dépend le contenu de l'index."""
+    return {
+        "version": TOOL_INDEX_VERSION,
+        "token_pattern": TOKEN_PATTERN,
+        "stop_words": STOP_WORDS,
+    }
+
+
+def build_tool_index(tools_df, index_dir=TOOL_INDEX_DIR, source_digest=None):
+    """
+    Ajuste le TF-IDF sur les descriptions d'outils et enregistre l'index.
+    Les fichiers sont écrits dans un répertoire temporaire qui remplace ensuite
+    `index_dir` : un lecteur ne voit jamais un index à moitié écrit.
+    """
+    from sklearn.feature_extraction.text import TfidfVectorizer
+
+    tools_df = tool_descriptions(tools_df)
+    vectorizer = TfidfVectorizer(token_pattern=TOKEN_PATTERN, stop_words=STOP_WORDS)
+    matrix = vectorizer.fit_transform(tools_df["tool_description"].astype(str))
+    matrix = sparse.csr_matrix(matrix, dtype="float64")
+    matrix.sort_indices()
+    postings = matrix.tocsc()
+    postings.sort_indices()
+
+    arrays = {
+        "vocabulary": vectorizer.get_feature_names_out().astype(str),
+        "idf": vectorizer.idf_.astype("float64"),
+        "data": matrix.data,
+        "indices": matrix.indices.astype("int32"),
+        "indptr": matrix.indptr.astype("int64"),
+        "postings_indptr": postings.indptr.astype("int64"),
+        "postings_tools": postings.indices.astype("int32"),
+        "postings_weights": postings.data,
+        "max_weights": postings.max(axis=0).toarray().ravel(),
+    }
+    tmp_dir = f"{index_dir}.{os.getpid()}.tmp"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+    for name, array in arrays.items():
+        np.save(os.path.join(tmp_dir, name + ".npy"), array)
+    tools = tools_df[TOOL_COLUMNS].reset_index(drop=True)
+    write_table(tools, dataset_path(tmp_dir, "tools"))
+    meta = dict(
+        index_params(),
+        source_digest=source_digest,
+        shape=list(matrix.shape),
+    )
+    with open(os.path.join(tmp_dir, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=2)
+
+    old_dir = f"{index_dir}.{os.getpid()}.old"
+    if os.path.exists(index_dir):
+        os.replace(index_dir, old_dir)
+    os.replace(tmp_dir, index_dir)
+    shutil.rmtree(old_dir, ignore_errors=True)
+    print(
+        f"Index des outils construit : {matrix.shape[0]} outils, "
+        f"{matrix.shape[1]} mots ({index_dir})"
+    )
+
+
+def top_n_per_row(similarities, top_n):
+    """
+    Positions des `top_n` plus grandes valeurs de chaque ligne, par valeur décroissante
+    (à égalité, la position la plus grande d'abord, comme argsort()[::-1]).
+    Sélection partielle : seuil de chaque ligne par np.partition, puis tri des seules
+    `top_n` candidates de la ligne : les valeurs au-dessus du seuil, complétées par les
+    dernières positions égales au seuil (une ligne de zéros n'en trie que `top_n`).
+    :return: (lignes, positions), ligne par ligne.
+    """
+    n_rows, n_cols = similarities.shape
+    top_n = min(top_n, n_cols)
+    if top_n <= 0 or n_rows == 0:
+        return np.empty(0, dtype=np.intp), np.empty(0, dtype=np.intp)
+    threshold = np.partition(similarities, n_cols - top_n, axis=1)[:, n_cols - top_n]
+    above = similarities > threshold[:, None]
+    tied = similarities == threshold[:, None]
+    missing = top_n - above.sum(axis=1)
+    # Égalités au seuil comptées depuis la fin de la ligne : on garde les dernières
+    tied_from_end = np.cumsum(tied[:, ::-1], axis=1)[:, ::-1]
+    candidates = above | (tied & (tied_from_end <= missing[:, None]))
+    rows, cols = np.nonzero(candidates)
+    order = np.lexsort((-cols, -similarities[rows, cols], rows))
+    return rows[order], cols[order]
+
+
+class InvertedIndex:
+    """
+    Listes inversées de la matrice TF-IDF des outils : pour chaque mot, les outils qui
+    le contiennent (triés) et leurs poids, ainsi que le poids maximal du mot.
+    """
+
+    # Marge sur les bornes, qui couvre les écarts d'arrondi entre ordres de sommation
+    BOUND_SLACK = 1e-9
+
+    def __init__(self, indptr, tools, weights, max_weights, tool_matrix):
+        self.indptr = indptr
+        self.tools = tools
+        self.weights = weights
+        self.max_weights = max_weights
+        self.tool_matrix = tool_matrix
+
+    def _kth_score(self, scores, candidates, top_n):
+        if len(candidates) < top_n:
+            return 0.0
+        return np.partition(scores[candidates], len(candidates) - top_n)[
+            len(candidates) - top_n
+        ]
+
+    def search(self, vector, top_n=10):
+        """
+        Top-n exact d'une requête (vecteur normé, une ligne CSR) : même résultat que
+        top_n_per_row sur les similarités avec tous les outils.
+        Les mots sont lus par contribution maximale décroissante (poids dans la requête
+        × poids maximal), en cumulant les scores des outils rencontrés. Dès que la
+        somme des bornes des mots restants passe sous le n-ième meilleur score, aucun
+        nouvel outil ne peut entrer dans le top-n : seuls les candidats encore capables
+        d'y entrer sont mis à jour avec les mots restants. Les candidats retenus sont
+        ensuite rescorés exactement.
+        :return: (positions des outils, similarités).
+        """
+        n_tools = self.tool_matrix.shape[0]
+        top_n = min(top_n, n_tools)
+        if top_n <= 0:
+            return np.empty(0, dtype=np.intp), np.empty(0)
+
+        terms, query = vector.indices, vector.data
+        bounds = query * self.max_weights[terms]
+        order = np.argsort(-bounds, kind="stable")
+        terms, query = terms[order], query[order]
+        # Borne de ce que peuvent encore apporter les mots après le j-ième
+        remaining = np.cumsum(bounds[order][::-1])[::-1]
+        remaining = np.append(remaining[1:], 0.0)
+
+        scores = np.zeros(n_tools)
+        seen = []
+        candidates = None
+        for term, weight, rest in zip(terms, query, remaining):
+            start, end = self.indptr[term], self.indptr[term + 1]
+            posting_tools = self.tools[start:end]
+            posting_weights = self.weights[start:end]
+            if candidates is None:
+                # Chaque outil apparaît au plus une fois par liste
+                scores[posting_tools] += weight * posting_weights
+                seen.append(posting_tools)
+                touched = np.unique(np.concatenate(seen))
+                seen = [touched]
+                threshold = self._kth_score(scores, touched, top_n)
+                if rest >= threshold - self.BOUND_SLACK:
+                    continue
+                candidates = touched
+            else:
+                found = np.searchsorted(posting_tools, candidates)
+                found = np.minimum(found, len(posting_tools) - 1)
+                hit = posting_tools[found] == candidates
+                scores[candidates[hit]] += weight * posting_weights[found[hit]]
+            # Écarter les candidats qui ne peuvent plus atteindre le n-ième score
+            threshold = self._kth_score(scores, candidates, top_n)
+            candidates = candidates[
+                scores[candidates] + rest >= threshold - self.BOUND_SLACK
+            ]
+        if candidates is None:
+            candidates = np.unique(np.concatenate(seen)) if seen else np.empty(0, int)
+
+        # Scores exacts des candidats (même calcul que ToolIndex.similarities)
+        candidates = candidates.astype(np.intp)
+        exact = (vector @ self.tool_matrix[candidates].T).toarray()
+        _, best = top_n_per_row(exact, top_n)
+        positions, similarities = candidates[best], exact[0, best]
+
+        # Moins de n outils partagent un mot avec la requête : compléter avec des
+        # outils de similarité nulle (position la plus grande d'abord)
+        missing = top_n - len(positions)
+        if missing > 0:
+            zeros = np.arange(n_tools - 1, -1, -1)[: missing + len(candidates)]
+            zeros = zeros[~np.isin(zeros, candidates)][:missing]
+            positions = np.concatenate([positions, zeros])
+            similarities = np.concatenate([similarities, np.zeros(len(zeros))])
+        return positions, similarities
+
+
+class ToolIndex:
+    """
+    Index TF-IDF des outils, relu par projection mémoire.
+    `version` est le hash du résumé des outils ayant servi à construire l'index.
+    """
+
+    def __init__(self, index_dir=TOOL_INDEX_DIR):
+        with open(os.path.join(index_dir, "meta.json"), "r", encoding="utf-8") as f:
+            self.meta = json.load(f)
+        arrays = {
+            name: np.load(os.path.join(index_dir, name + ".npy"), mmap_mode="r")
+            for name in ARRAY_FILES + POSTING_FILES
+        }
+        self.vocabulary = arrays["vocabulary"]
+        self.idf = arrays["idf"]
+        self.tool_matrix = sparse.csr_matrix(
+            (arrays["data"], arrays["indices"], arrays["indptr"]),
+            shape=tuple(self.meta["shape"]),
+            copy=False,
+        )
+        self.inverted = InvertedIndex(
+            arrays["postings_indptr"],
+            arrays["postings_tools"],
+            arrays["postings_weights"],
+            arrays["max_weights"],
+            self.tool_matrix,
+        )
+        self.tools = read_table(dataset_path(index_dir, "tools"), compact=False)
+        self.version = self.meta["source_digest"]
+
+    def transform(self, texts):
+        """Vecteurs TF-IDF normés (CSR, une ligne par texte) de textes quelconques."""
+        texts = pd.Series(list(texts), dtype="string").fillna("")
+        tokens = texts.str.lower().str.findall(TOKEN_PATTERN)
+        counts = tokens.str.len().to_numpy(dtype="int64")
+        words = np.asarray(tokens.explode().dropna().to_numpy(), dtype=str)
+        rows = np.repeat(np.arange(len(texts)), counts)
+
+        # Position de chaque mot dans le vocabulaire trié (mots inconnus ignorés)
+        positions = np.searchsorted(self.vocabulary, words)
+        positions = np.minimum(positions, len(self.vocabulary) - 1)
+        known = self.vocabulary[positions] == words
+        vectors = sparse.csr_matrix(
+            (np.ones(known.sum()), (rows[known], positions[known])),
+            shape=(len(texts), len(self.vocabulary)),
+        )
+        vectors.sum_duplicates()
+        vectors.data *= self.idf[vectors.indices]
+        norms = np.sqrt(vectors.multiply(vectors).sum(axis=1)).A1
+        norms[norms == 0] = 1.0
+        return sparse.csr_matrix(sparse.diags(1.0 / norms) @ vectors)
+
+    def similarities(self, vectors):
+        """Similarité cosinus (tableau dense lignes × outils) de vecteurs normés."""
+        return (vectors @ self.tool_matrix.T).toarray()
+
+    def top_n(self, vectors, top_n=10, block_cells=SIMILARITY_BLOCK_CELLS):
+        """
+        Meilleurs outils de chaque ligne de `vectors` : produit creux lignes × outils
+        par blocs de lignes (au plus `block_cells` similarités en mémoire à la fois).
+        :return: (lignes, positions des outils, similarités), ligne par ligne.
+        """
+        block_rows = max(1, block_cells // max(self.tool_matrix.shape[0], 1))
+        rows, positions, scores = [], [], []
+        for start in range(0, vectors.shape[0], block_rows):
+            similarities = self.similarities(vectors[start : start + block_rows])
+            hit_rows, hit_positions = top_n_per_row(similarities, top_n)
+            rows.append(hit_rows + start)
+            positions.append(hit_positions)
+            scores.append(similarities[hit_rows, hit_positions])
+        if not rows:
+            return np.empty(0, np.intp), np.empty(0, np.intp), np.empty(0)
+        return np.concatenate(rows), np.concatenate(positions), np.concatenate(scores)
+
+    def search(self, vectors, top_n=10):
+        """
+        Meilleurs outils de chaque ligne de `vectors` par les listes inversées
+        (InvertedIndex.search) : adapté à quelques requêtes sur un grand catalogue.
+        :return: (lignes, positions des outils, similarités), comme top_n.
+        """
+        rows, positions, scores = [], [], []
+        for row in range(vectors.shape[0]):
+            row_positions, row_scores = self.inverted.search(vectors[row], top_n)
+            rows.append(np.full(len(row_positions), row, dtype=np.intp))
+            positions.append(row_positions)
+            scores.append(row_scores)
+        if not rows:
+            return np.empty(0, np.intp), np.empty(0, np.intp), np.empty(0)
+        return np.concatenate(rows), np.concatenate(positions), np.concatenate(scores)
+
+
+def load_tool_index(
+    tools_dir=PROCESSED_DATA_DIR, index_dir=TOOL_INDEX_DIR, force=False
+):
+    """
+    Index des outils de `tools_dir`, reconstruit seulement si le résumé des outils a
+    changé depuis sa construction (ou si `force`).
+    """
+    source_path = find_dataset(tools_dir, TOOLS_DATASET)
+    digests = DigestCache()
+    source_digest = digests.get(source_path, ("sha256",))["sha256"]
+    digests.save()
+
+    expected = dict(index_params(), source_digest=source_digest)
+    try:
+        with open(os.path.join(index_dir, "meta.json"), "r", encoding="utf-8") as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        meta = {}
+    if force or any(meta.get(key) != value for key, value in expected.items()):
+        build_tool_index(
+            load_dataset(tools_dir, TOOLS_DATASET, compact=False),
+            index_dir,
+            source_digest=source_digest,
+        )
+    return ToolIndex(index_dir)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Construction de l'index des outils.")
+    parser.add_argument(
+        "--force", action="store_true", help="Reconstruire même si l'index est à jour"
+    )
+    args = parser.parse_args()
+    index = load_tool_index(force=args.force)
+    print(f"Index des outils prêt : {index.tool_matrix.shape[0]} outils")
@@ -5,39 +5,42 @@ import sys
 
 # Gestion dynamique des chemins
 ROOT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-sys.path.append(ROOT_DIR)
+if __package__ in (None, ""):
+    # Lancé comme script : la racine du projet n'est pas encore dans sys.path
+    sys.path.append(ROOT_DIR)
 
 # Import des chemins définis dans paths.py
 from paths import PROCESSED_DATA_DIR
+from src.utils.storage import find_dataset, read_table
 
 
 # Fonction pour charger les datasets
-def load_dataset(file_path):
+def load_dataset(directory, name):
     try:
-        return pd.read_csv(file_path)
-    except FileNotFoundError:
-        st.error(f"Fichier introuvable : {file_path}")
+        return read_table(find_dataset(directory, name))
+    except FileNotFoundError as e:
+        st.error(f"Fichier introuvable : {e}")
         return None
     except Exception as e:
-        st.error(f"Erreur lors du chargement de {file_path} : {e}")
+        st.error(f"Erreur lors du chargement de {name} : {e}")
         return None
 
 
-# Liste des datasets enrichis et summary avec chemins dynamiques
+# Liste des datasets enrichis et summary (nom sans extension : Parquet ou CSV)
 datasets_enriched = {
-    "Amazon Reviews": os.path.join(PROCESSED_DATA_DIR, "amazon_reviews_enriched.csv"),
-    "HR Dashboard": os.path.join(PROCESSED_DATA_DIR, "hr_dashboard_enriched.csv"),
-    "Project Tools": os.path.join(PROCESSED_DATA_DIR, "project_tools_enriched.csv"),
-    "Task Assignment": os.path.join(PROCESSED_DATA_DIR, "task_assignment_enriched.csv"),
-    "VM Cloud": os.path.join(PROCESSED_DATA_DIR, "vmCloud_enriched.csv"),
+    "Amazon Reviews": "amazon_reviews_enriched",
+    "HR Dashboard": "hr_dashboard_enriched",
+    "Project Tools": "project_tools_enriched",
+    "Task Assignment": "task_assignment_enriched",
+    "VM Cloud": "vmCloud_enriched",
 }
 
 datasets_summary = {
-    "Amazon Reviews": os.path.join(PROCESSED_DATA_DIR, "amazon_reviews_summary.csv"),
-    "HR Dashboard": os.path.join(PROCESSED_DATA_DIR, "hr_dashboard_summary.csv"),
-    "Project Tools": os.path.join(PROCESSED_DATA_DIR, "project_tools_summary.csv"),
-    "Task Assignment": os.path.join(PROCESSED_DATA_DIR, "task_assignment_summary.csv"),
-    "VM Cloud": os.path.join(PROCESSED_DATA_DIR, "vmcloud_summary.csv"),
+    "Amazon Reviews": "amazon_reviews_summary",
+    "HR Dashboard": "hr_dashboard_summary",
+    "Project Tools": "project_tools_summary",
+    "Task Assignment": "task_assignment_summary",
+    "VM Cloud": "vmcloud_summary",
 }
 
 # Interface utilisateur
@@ -49,17 +52,17 @@ if dataset_type == "Enrichi":
     selected_dataset = st.selectbox(
         "Sélectionnez un dataset enrichi :", list(datasets_enriched.keys())
     )
-    file_path = datasets_enriched[selected_dataset]
+    dataset_name = datasets_enriched[selected_dataset]
 else:
     selected_dataset = st.selectbox(
         "Sélectionnez un dataset résumé :", list(datasets_summary.keys())
     )
-    file_path = datasets_summary[selected_dataset]
+    dataset_name = datasets_summary[selected_dataset]
 
 # Chargement et affichage du dataset
-if file_path:
+if dataset_name:
     st.write(f"### Dataset sélectionné : {selected_dataset} ({dataset_type.lower()})")
-    dataset = load_dataset(file_path)
+    dataset = load_dataset(PROCESSED_DATA_DIR, dataset_name)
 
     if dataset is not None:
         st.write("Aperçu des données :")
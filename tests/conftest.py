@@ -0,0 +1,42 @@
+import os
+import sys
+
+import pytest
+
+# Racine du projet dans sys.path : les tests importent `paths` et `src.*`
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+
+@pytest.fixture
+def schema_dir(tmp_path, monkeypatch):
+    """Caches de schémas (types inférés, types compacts) dans un dossier temporaire."""
+    from src.preprocesing import type_inference
+    from src.utils import dtypes
+
+    directory = tmp_path / "schemas"
+    monkeypatch.setattr(type_inference, "SCHEMA_DIR", str(directory))
+    monkeypatch.setattr(dtypes, "SCHEMA_DIR", str(directory))
+    return directory
+
+
+@pytest.fixture
+def build_cache(tmp_path, monkeypatch):
+    """Cache incrémental du pipeline et cache des hash dans un dossier temporaire."""
+    from src.utils import build_cache, digests
+
+    directory = tmp_path / "cache"
+    monkeypatch.setattr(build_cache, "BUILD_CACHE_PATH", str(directory / "build.json"))
+    monkeypatch.setattr(digests, "DIGEST_CACHE_PATH", str(directory / "digests.json"))
+    return directory
+
+
+@pytest.fixture(autouse=True)
+def memory_log(tmp_path, monkeypatch):
+    """Historique mémoire (dtypes.report_memory) dans un dossier temporaire."""
+    from src.utils import dtypes
+
+    path = tmp_path / "cache" / "memory_usage.csv"
+    monkeypatch.setattr(dtypes, "MEMORY_LOG_PATH", str(path))
+    return path
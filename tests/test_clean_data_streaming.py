@@ -0,0 +1,46 @@
+import numpy as np
+import pandas as pd
+
+from src.preprocesing.clean_data import clean_data, clean_csv_chunked
+from src.utils.storage import write_table
+
+
+def make_source(path, rows=300, seed=0):
+    """CSV avec doublons (y compris entre blocs), colonne creuse et valeurs manquantes."""
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame(
+        {
+            "Product Id": rng.integers(0, 20, rows),
+            "Score": rng.integers(1, 6, rows).astype(float),
+            "Price": rng.uniform(1, 100, rows).round(2),
+            "Category": rng.choice(["a", "b", "c"], rows),
+            "Comment": rng.choice(["x", "y"], rows),
+            "Time": rng.integers(1_300_000_000, 1_400_000_000, rows),
+        }
+    )
+    df.loc[rng.random(rows) < 0.1, "Score"] = np.nan
+    df.loc[rng.random(rows) < 0.1, "Category"] = np.nan
+    # Colonne supprimée (plus de 40 % de valeurs manquantes)
+    df.loc[rng.random(rows) < 0.6, "Comment"] = np.nan
+    # Lignes supprimées (plus de 50 % de valeurs manquantes)
+    df.loc[rng.random(rows) < 0.05, ["Score", "Price", "Category", "Comment"]] = np.nan
+    # Doublons, répartis dans tout le fichier
+    df = pd.concat([df, df.sample(60, random_state=seed)], ignore_index=True)
+    df = df.sample(frac=1, random_state=seed).reset_index(drop=True)
+    df.to_csv(path, index=False)
+
+
+def test_chunked_output_matches_in_memory(tmp_path, schema_dir):
+    source = tmp_path / "source.csv"
+    make_source(source)
+
+    expected_path = tmp_path / "expected.csv"
+    write_table(clean_data(pd.read_csv(source)), str(expected_path))
+    streamed_path = tmp_path / "streamed.csv"
+    clean_csv_chunked(str(source), str(streamed_path), chunksize=37)
+
+    expected = pd.read_csv(expected_path)
+    streamed = pd.read_csv(streamed_path)
+    assert "comment" not in streamed.columns
+    assert len(streamed) < 360
+    pd.testing.assert_frame_equal(streamed, expected)
@@ -0,0 +1,25 @@
+import os
+
+from src.preprocesing import clean_data
+
+
+def clean_or_crash(name, file_path, streaming, chunksize):
+    """Remplace clean_source : le processus de "crash" meurt comme tué par l'OOM killer."""
+    if name == "crash":
+        os._exit(1)
+    if name == "failing":
+        raise ValueError("source invalide")
+    return f"{name}.parquet"
+
+
+def test_broken_pool_keeps_other_results(monkeypatch):
+    monkeypatch.setattr(clean_data, "clean_source", clean_or_crash)
+    sources = {name: f"/absent/{name}.csv" for name in ("a", "crash", "failing", "b")}
+
+    results = clean_data.clean_sources_parallel(sources, workers=1)
+
+    assert list(results) == list(sources)
+    assert results["a"] == {"output": "a.parquet"}
+    assert results["b"] == {"output": "b.parquet"}
+    assert results["crash"]["error"].startswith("BrokenProcessPool")
+    assert results["failing"] == {"error": "ValueError: source invalide"}
@@ -0,0 +1,19 @@
+import os
+
+import pandas as pd
+
+from src.utils.storage import load_dataset, save_dataset
+
+
+def test_loads_write_nothing(tmp_path, schema_dir, memory_log):
+    df = pd.DataFrame({"tool": ["jira", "trello"] * 50, "score": range(100)})
+    directory = str(tmp_path / "data")
+    save_dataset(df, directory, "tools", fmt="csv")
+    schemas = sorted(os.listdir(schema_dir))
+
+    loaded = load_dataset(directory, "tools", fmt="csv")
+    # Le schéma enregistré à l'écriture redonne les types compacts d'un CSV
+    assert loaded["tool"].dtype == "category"
+    assert loaded["score"].dtype == "int8"
+    assert sorted(os.listdir(schema_dir)) == schemas
+    assert not memory_log.exists()
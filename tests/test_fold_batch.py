@@ -0,0 +1,99 @@
+import pandas as pd
+import pandas.testing as tm
+import pytest
+
+from src.utils.storage import load_dataset, save_dataset
+from src.preprocesing import enrich_and_summarize as es
+
+
+def write_cleaned(directory):
+    save_dataset(
+        pd.DataFrame({"productid": ["a", "b", "a", "c"], "score": [5, 3, 4, 1]}),
+        directory,
+        "amazon_reviews_cleaned",
+    )
+    save_dataset(
+        pd.DataFrame(
+            {
+                "department": ["it", "hr"],
+                "productivity_(%)": [50.0, 80.0],
+                "satisfaction_rate_(%)": [60.0, 90.0],
+                "joining_date": ["2020-01-01", "2022-01-01"],
+            }
+        ),
+        directory,
+        "hr_dashboard_data_cleaned",
+    )
+    save_dataset(
+        pd.DataFrame({"final_selected_tool": ["Trello", "Jira"]}),
+        directory,
+        "project_tools_cleaned",
+    )
+    save_dataset(
+        pd.DataFrame({"category": ["dev", "ops"], "skill": ["python", "sql"]}),
+        directory,
+        "task_assignment_cleaned",
+    )
+    save_dataset(
+        pd.DataFrame(
+            {
+                "task_type": ["io", "compute", "io"],
+                "cpu_usage": [10.0, 80.0, 20.0],
+                "memory_usage": [30.0, 60.0, 40.0],
+                "network_traffic": [100.0, 5.0, 300.0],
+            }
+        ),
+        directory,
+        "vmCloud_data_cleaned",
+    )
+
+
+def results(directory):
+    return {
+        "summary": load_dataset(directory, "amazon_reviews_summary", compact=False),
+        "state": load_dataset(directory, "amazon_reviews_summary_state", compact=False),
+        "enriched": es.load_enriched("amazon_reviews", directory),
+    }
+
+
+def test_fold_then_run_matches_full_rebuild(tmp_path, schema_dir, build_cache):
+    directory = str(tmp_path / "clean")
+    write_cleaned(directory)
+    assert es.run(directory=directory)
+
+    batch = pd.DataFrame({"productid": ["b", "d"], "score": [5, 2]})
+    assert es.fold_batch("amazon_reviews", batch, "2024-06-01", directory)
+    # Le lot est enregistré dans le cache : pas de nouvelle exécution complète
+    assert not es.run(directory=directory)
+    folded = results(directory)
+    assert es.pending_batches("amazon_reviews", directory) == ["2024-06-01"]
+    assert len(folded["enriched"]) == 6
+    assert folded["enriched"]["avg_score"].tolist() == [4.5, 4, 4.5, 1, 4, 2]
+
+    with pytest.raises(ValueError, match="déjà intégré"):
+        es.fold_batch("amazon_reviews", batch, "2024-06-01", directory)
+
+    # L'exécution complète rejoue le journal et donne le même résultat
+    assert es.run(force=True, directory=directory)
+    assert es.pending_batches("amazon_reviews", directory) == []
+    rebuilt = results(directory)
+    for key in ("summary", "state"):
+        tm.assert_frame_equal(rebuilt[key], folded[key], check_dtype=False)
+    tm.assert_frame_equal(
+        rebuilt["enriched"].astype({"productid": str}),
+        folded["enriched"].astype({"productid": str}),
+        check_dtype=False,
+    )
+
+
+def test_malformed_batch_is_not_journaled(tmp_path, schema_dir, build_cache):
+    directory = str(tmp_path / "clean")
+    write_cleaned(directory)
+    es.run(directory=directory)
+
+    batch = pd.DataFrame({"score": [5, 2]})
+    with pytest.raises(ValueError, match="productid"):
+        es.fold_batch("amazon_reviews", batch, "sans-cle", directory)
+    assert es.journal_batches("amazon_reviews", directory) == []
+    # Le journal intact n'empêche pas une exécution complète
+    assert es.run(force=True, directory=directory)
@@ -0,0 +1,29 @@
+import pandas as pd
+
+from src.preprocesing.enrich_and_summarize import enrich_and_summarize_hr
+from src.utils.feature_engineering import experience_years
+
+
+def hr_dashboard():
+    return pd.DataFrame(
+        {
+            "department": ["it", "it", "hr"],
+            "productivity_(%)": [50, 70, 80],
+            "satisfaction_rate_(%)": [60, 40, 90],
+            "joining_date": ["2020-01-01", "2021-01-01", "2022-01-01"],
+        }
+    )
+
+
+def test_experience_as_of_reference_date():
+    _, summary = enrich_and_summarize_hr(hr_dashboard(), reference_date="2023-01-01")
+    experience = summary.set_index("department")["avg_experience"]
+    assert experience["hr"] == 365 / 365.0
+    assert experience["it"] == (1096 + 730) / 2 / 365.0
+
+
+def test_experience_defaults_to_today():
+    joining_date = pd.to_datetime(hr_dashboard()["joining_date"])
+    today = pd.Timestamp.today().normalize()
+    expected = (today - joining_date).dt.days / 365.0
+    pd.testing.assert_series_equal(experience_years(joining_date), expected)
@@ -0,0 +1,71 @@
+import numpy as np
+import pandas as pd
+import pandas.testing as tm
+
+from src.utils.aggregates import state_column
+from src.utils.out_of_core import aggregate_file, csv_byte_ranges
+from src.utils.storage import open_table_writer
+
+
+def frame(rows=500, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame(
+        {
+            "key": rng.choice(["a", "b", "c", "d", None], rows),
+            "x": rng.normal(size=rows).round(3),
+            "y": rng.integers(0, 100, rows).astype(float),
+            "text": "texte",
+        }
+    )
+    df.loc[rng.random(rows) < 0.1, "y"] = np.nan
+    # Texte libre sur plusieurs lignes, entre guillemets dans le CSV
+    df.loc[::7, "text"] = 'avis\nsur "plusieurs"\nlignes'
+    return df
+
+
+def expected_state(df):
+    grouped = df.groupby("key")[["x", "y"]]
+    expected = pd.DataFrame(index=grouped.sum().index)
+    for col in ["x", "y"]:
+        for stat, values in (
+            ("sum", grouped.sum()[col]),
+            ("count", grouped.count()[col]),
+            ("min", grouped.min()[col]),
+            ("max", grouped.max()[col]),
+        ):
+            expected[state_column(col, stat)] = values
+    return expected
+
+
+def check(path, df):
+    expected = expected_state(df)
+    for workers in (1, 3):
+        state = aggregate_file(path, "key", ["x", "y"], workers=workers, chunksize=37)
+        tm.assert_frame_equal(
+            state[expected.columns], expected, check_dtype=False, check_names=False
+        )
+
+
+def test_aggregate_csv_with_multiline_quoted_field(tmp_path):
+    df = frame()
+    path = str(tmp_path / "data.csv")
+    df.to_csv(path, index=False)
+    # Guillemets dans le corps : une seule plage, lue d'un seul tenant
+    assert len(csv_byte_ranges(path, 8)) == 1
+    check(path, df)
+
+    plain = df.drop(columns="text")
+    plain_path = str(tmp_path / "plain.csv")
+    plain.to_csv(plain_path, index=False)
+    assert len(csv_byte_ranges(plain_path, 8)) == 8
+    check(plain_path, plain)
+
+
+def test_aggregate_parquet_row_groups(tmp_path):
+    df = frame()
+    path = str(tmp_path / "data.parquet")
+    writer = open_table_writer(path)
+    for start in range(0, len(df), 60):
+        writer.write(df.iloc[start : start + 60])
+    writer.close()
+    check(path, df)
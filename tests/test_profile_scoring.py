@@ -0,0 +1,63 @@
+import numpy as np
+import pandas as pd
+import pandas.testing as tm
+
+from src.analysis import cloud_performance_analysis as cpa
+from src.utils.storage import open_table_writer
+
+PROFILES = {"default": cpa.DEFAULT_PROFILE}
+
+
+def metrics(rows=400, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame(
+        {
+            "vm_id": [f"vm-{i}" for i in range(rows)],
+            **{
+                col: rng.random(rows) * 100
+                for col in cpa.required_columns_performance
+                if col != "execution_time"
+            },
+            "execution_time": pd.Timestamp("2024-01-01")
+            + pd.to_timedelta(rng.integers(0, 10**6, rows), unit="s"),
+        }
+    )
+    return df[["vm_id"] + cpa.required_columns_performance]
+
+
+def expected_top(df, top_n):
+    scores = cpa.performance_scores(df.copy())
+    return scores.sort_values("performance_score", ascending=False).head(top_n)
+
+
+def check(result, expected):
+    assert result["vm_id"].tolist() == expected["vm_id"].tolist()
+    np.testing.assert_allclose(
+        result["performance_score"], expected["performance_score"], rtol=1e-5
+    )
+
+
+def test_default_profile_matches_performance_scores(tmp_path, monkeypatch):
+    df = metrics()
+    expected = expected_top(df, 15)
+    for chunk_rows in (7, 64, 1000):
+        monkeypatch.setattr(cpa, "SCORING_CHUNK_ROWS", chunk_rows)
+        check(cpa.score_profiles(df, PROFILES, top_n=15), expected)
+
+    path = str(tmp_path / "metrics.parquet")
+    writer = open_table_writer(path)
+    for start in range(0, len(df), 50):
+        writer.write(df.iloc[start : start + 50])
+    writer.close()
+    for chunksize in (13, 100, 1000):
+        check(cpa.score_profiles_file(path, PROFILES, 15, chunksize), expected)
+
+
+def test_top_n_zero_is_empty():
+    result = cpa.score_profiles(metrics(20), PROFILES, top_n=0)
+    assert result.empty
+    assert cpa.top_n_per_profile(np.ones((3, 5)), np.ones((3, 5)), 0).shape == (3, 0)
+    tm.assert_index_equal(
+        result.columns,
+        pd.Index(["profile", "rank", "vm_id", "performance_score"]),
+    )
@@ -0,0 +1,58 @@
+import numpy as np
+import pandas as pd
+import pandas.testing as tm
+
+from src.analysis.recommendation_engine import generate_recommendation_sets
+
+SENTIMENTS = ["positive", "Negative", "neutral", "absent"]
+THRESHOLDS = [0, 3, 8]
+
+
+def sentiments(rows=3000, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame(
+        {
+            "productid": rng.choice([f"p{i:03d}" for i in range(300)], rows),
+            # Peu de valeurs distinctes : nombreuses égalités de score et de critiques
+            "avg_score": rng.integers(1, 4, rows).astype(float),
+            "num_reviews": rng.integers(1, 4, rows),
+            "sentiment": rng.choice(["positive", "POSITIVE", "negative", "Neutral"], rows),
+        }
+    )
+    df.loc[rng.random(rows) < 0.05, "avg_score"] = np.nan
+    df.loc[rng.random(rows) < 0.02, "sentiment"] = None
+    return df
+
+
+def reference(df, sentiment, min_reviews):
+    """Ancien calcul : filtre, regroupement, seuil puis tri."""
+    filtered = df[df["sentiment"].str.lower() == sentiment.lower()]
+    summary = (
+        filtered.groupby("productid")
+        .agg(total_reviews=("num_reviews", "sum"), avg_score=("avg_score", "mean"))
+        .reset_index()
+    )
+    summary = summary[summary["total_reviews"] >= min_reviews]
+    return summary.sort_values(by=["avg_score", "total_reviews"], ascending=False)
+
+
+def test_recommendation_sets_match_reference():
+    df = sentiments()
+    boundary_ties = 0
+    for top_k in (None, 1, 10, 25):
+        results = generate_recommendation_sets(df, SENTIMENTS, THRESHOLDS, top_k)
+        for sentiment in SENTIMENTS:
+            for min_reviews in THRESHOLDS:
+                expected = reference(df, sentiment, min_reviews)
+                if top_k is not None and len(expected) > top_k:
+                    # Égalité au seuil du top_k : l'ordre du tri stable départage
+                    keys = expected[["avg_score", "total_reviews"]]
+                    boundary_ties += keys.iloc[top_k - 1].equals(keys.iloc[top_k])
+                    expected = expected.head(top_k)
+                result = results[sentiment, min_reviews]
+                tm.assert_frame_equal(
+                    result.astype({"productid": str}),
+                    expected[result.columns].reset_index(drop=True),
+                    check_dtype=False,
+                )
+    assert boundary_ties > 0
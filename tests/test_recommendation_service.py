@@ -0,0 +1,64 @@
+import asyncio
+
+import pandas as pd
+
+from src.api import recommendation_service as rs
+
+
+def make_service(monkeypatch):
+    """Service sans modèles chargés : classement de produits factice."""
+    monkeypatch.setattr(rs, "PRODUCT_CACHE_SIZE", 4)
+    service = rs.RecommendationService(window=0)
+    service.sentiments = object()
+
+    def rank_recommendations(summary, sentiments, thresholds, top_k):
+        if "broken" in sentiments:
+            raise RuntimeError("micro-lot en échec")
+        return {
+            (s, m): pd.DataFrame({"productid": [f"{s}-{m}"]})
+            for s in sentiments
+            for m in thresholds
+        }
+
+    service.rank_recommendations = rank_recommendations
+    return service
+
+
+async def request(port, raw):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(raw)
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    return response.split(b"\r\n", 1)[0].decode()
+
+
+def test_service_errors_and_product_cache(monkeypatch):
+    service = make_service(monkeypatch)
+
+    async def scenario():
+        server = await service.start(port=0)
+        port = server.sockets[0].getsockname()[1]
+        get = "GET /products?sentiment={}&min_reviews={} HTTP/1.1\r\n"
+        close = "Connection: close\r\n\r\n"
+        statuses = {
+            "broken": await request(port, (get.format("broken", 1) + close).encode()),
+            "bad_param": await request(
+                port, (get.format("positive", "x") + close).encode()
+            ),
+            "bad_length": await request(
+                port,
+                (get.format("positive", 1) + "Content-Length: abc\r\n\r\n").encode(),
+            ),
+        }
+        for min_reviews in range(10):
+            await request(port, (get.format("positive", min_reviews) + close).encode())
+        server.close()
+        return statuses
+
+    statuses = asyncio.run(scenario())
+    assert statuses["broken"] == "HTTP/1.1 500 Internal Server Error"
+    assert statuses["bad_param"] == "HTTP/1.1 400 Bad Request"
+    assert statuses["bad_length"] == "HTTP/1.1 400 Bad Request"
+    # Nombre de filtres gardés borné, quelle que soit la valeur de min_reviews
+    assert len(service.product_results.entries) == 4
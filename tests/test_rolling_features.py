@@ -0,0 +1,71 @@
+import numpy as np
+import pandas as pd
+import pandas.testing as tm
+
+from src.utils.storage import (
+    load_dataset,
+    save_dataset,
+    dataset_path,
+    open_table_writer,
+)
+from src.preprocesing import rolling_features as rf
+
+
+def metrics(rows=300, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame(
+        {
+            "vm_id": rng.choice(["vm-a", "vm-b", "vm-c", "vm-d"], rows),
+            "timestamp": pd.Timestamp("2024-01-01")
+            + pd.to_timedelta(rng.integers(0, 72 * 60, rows), unit="min"),
+            **{metric: rng.random(rows) * 100 for metric in rf.ROLLING_METRICS},
+        }
+    )
+
+
+def rolling(directory, chunksize):
+    rf.compute_rolling_features(directory, directory, chunksize=chunksize)
+    result = load_dataset(directory, rf.ROLLING_DATASET, compact=False)
+    # vm_id est une catégorie en mémoire (types compactés), du texte par blocs
+    return result.astype({"vm_id": str})
+
+
+def test_chunked_matches_in_memory(tmp_path, schema_dir):
+    for name, df in (
+        # Horodatages mélangés : les blocs ne peuvent pas être lus dans l'ordre
+        ("shuffled", metrics()),
+        ("ordered", metrics().sort_values(["vm_id", "timestamp"], ignore_index=True)),
+    ):
+        directory = str(tmp_path / name)
+        path = save_dataset(df, directory, rf.SOURCE_DATASET)
+        assert rf.chunks_in_order(path, chunksize=50) == (name == "ordered")
+        expected = rolling(directory, None)
+        tm.assert_frame_equal(rolling(directory, 50), expected, check_dtype=False)
+
+
+def test_empty_metrics_write_empty_output(tmp_path, schema_dir):
+    expected_columns = ["vm_id", "timestamp"] + rf.feature_columns()
+    directory = str(tmp_path)
+    path = save_dataset(metrics().iloc[:0], directory, rf.SOURCE_DATASET)
+    for chunksize in (None, 50):
+        result = rolling(directory, chunksize)
+        assert list(result.columns) == expected_columns
+        assert result.empty
+
+    # Répartition par VM d'un fichier sans ligne
+    output = dataset_path(directory, "partitioned")
+    writer = open_table_writer(output)
+    try:
+        rf._rolling_by_partition(
+            path,
+            writer,
+            directory,
+            {"windows": rf.ROLLING_WINDOWS, "halflife": rf.EWMA_HALFLIFE},
+            ["vm_id", "timestamp"] + rf.ROLLING_METRICS,
+            50,
+        )
+    finally:
+        writer.close()
+    result = load_dataset(directory, "partitioned", compact=False)
+    assert list(result.columns) == expected_columns
+    assert result.empty
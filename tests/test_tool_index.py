@@ -0,0 +1,14 @@
+import numpy as np
+
+from src.utils.tool_index import top_n_per_row
+
+
+def test_top_n_per_row_matches_argsort():
+    rng = np.random.default_rng(0)
+    similarities = rng.integers(0, 3, (6, 40)).astype(float)
+    similarities[0] = 0  # ligne sans aucun mot commun
+    rows, cols = top_n_per_row(similarities, 5)
+    expected = np.argsort(similarities, axis=1, kind="stable")[:, ::-1][:, :5]
+    assert (rows == np.repeat(np.arange(6), 5)).all()
+    assert (cols == expected.ravel()).all()
+    assert cols[:5].tolist() == [39, 38, 37, 36, 35]